@@ -1,6 +1,18 @@
+import argparse
+
+from backend import log_config
 from interface import window
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Neural network prototyping tool built on Keras.')
+    parser.add_argument('--log-level', default='debug', help='lowest level written to the log file, such as info')
+    parser.add_argument('--log-dir', default=log_config.LOG_DIR, help='directory of the log file')
+    parser.add_argument('--console-log-level', default=None, help='also print log records from this level on')
+    args = parser.parse_args()
+
+    log_config.configure(level=args.log_level, log_dir=args.log_dir, console_level=args.console_log_level)
     window.main()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,285 @@
+import os
+import json
+import logging
+
+from backend import cache, dataset, layers
+
+ARTIFACT_SUFFIXES = ('_model.h5', '_weights.h5', '_model.json')
+SCRIPT_SUFFIX = '_network.py'
+STATE_SUFFIX = '_training.json'
+
+logger = logging.getLogger('builder')
+
+
+def script_path(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (string) -> Path the network script of the canvas is written to
+    """
+    return os.path.join(properties['project_directory'], properties['canvas_name'] + SCRIPT_SUFFIX)
+
+
+def artifact_paths(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (list[string]) -> Paths the trained model, its weights and its architecture are saved to
+    """
+    return [os.path.join(properties['project_directory'], properties['canvas_name'] + suffix)
+            for suffix in ARTIFACT_SUFFIXES]
+
+
+def artifact_files(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (dict{'string': string}) -> Paths of the trained model files, by file name without the canvas name
+    """
+    suffixes = ARTIFACT_SUFFIXES + (STATE_SUFFIX,)
+    paths = artifact_paths(properties) + [state_path(properties)]
+    return {suffix.lstrip('_'): path for suffix, path in zip(suffixes, paths)}
+
+
+def state_path(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (string) -> Path to the description of how the saved model was trained
+    """
+    return os.path.join(properties['project_directory'], properties['canvas_name'] + STATE_SUFFIX)
+
+
+def save_state(properties, **state):
+    """
+    Record how the saved model of a canvas was trained, so training can later continue from it
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :param state: (dict{'string': object}) -> Values describing the training run, such as 'epoch' and 'architecture'
+    """
+    path = state_path(properties)
+    temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(temp_path, 'w') as fd:
+        json.dump(state, fd)
+    os.replace(temp_path, path)
+
+
+def load_state(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (dict{'string': object}) -> How the saved model was trained, with the model path under 'path', or None if
+                                         there is no saved model
+    """
+    try:
+        with open(state_path(properties), 'r') as fd:
+            state = json.load(fd)
+    except (IOError, OSError, ValueError):
+        return None
+
+    state['path'] = artifact_paths(properties)[0]
+    if not os.path.isfile(state['path']):
+        return None
+    return state
+
+
+def layer_spec(network_layers):
+    """
+    :param network_layers: (list[layers.GenericLayer]) -> Layers of a network
+    :return: (list[list]) -> Canonical description of the layers, with numbers typed in the GUI converted to numbers
+    """
+    spec = []
+    for layer in network_layers:
+        layer_properties = {}
+        for name, value in layer.layer_properties.items():
+            for cast in (int, float):
+                try:
+                    value = cast(str(value).strip())
+                    break
+                except ValueError:
+                    pass
+            layer_properties[name] = value
+        spec.append([type(layer).__name__, layer_properties])
+    return spec
+
+
+def network_spec(properties, network_layers=None):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :param network_layers: (list[layers.GenericLayer]) -> Layers of the network, created from the properties if not
+                                                          given
+    :return: (dict{'string': object}) -> Canonical description of the network and how it is trained
+    """
+    if network_layers is None:
+        network_layers = layers.create_layers(properties.get('layers', []))
+    return {
+        'layers': layer_spec(network_layers),
+        'optimizer': properties.get('optimizer'),
+        'loss': properties.get('loss'),
+        'metrics': list(properties.get('metrics', [])),
+        'epochs': int(properties.get('epochs', 1)),
+        'batch_size': properties.get('batch_size', dataset.DEFAULT_BATCH_SIZE),
+    }
+
+
+def script_batch_size(properties):
+    """
+    Batch size written into a network script. A script has no tuner, so 'auto' becomes the batch size the saved model
+    was trained with, which the tuner chose, or the default batch size until the model is trained.
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (int) -> Batch size
+    """
+    batch_size = properties.get('batch_size', dataset.DEFAULT_BATCH_SIZE)
+    if batch_size != 'auto':
+        return int(batch_size)
+    state = load_state(properties)
+    return int((state or {}).get('batch_size') or dataset.DEFAULT_BATCH_SIZE)
+
+
+def architecture_key(network_layers):
+    """
+    :param network_layers: (list[layers.GenericLayer]) -> Layers of a network
+    :return: (string) -> Hash identifying the architecture of the network
+    """
+    return cache.spec_key(layer_spec(network_layers))
+
+
+def transfer_weights(source, target):
+    """
+    Copy trained weights into the initial weights of a new model, layer by layer. Weights of the same shape are copied
+    whole. When a layer changed shape, as when a layer grew or shrank, the region both shapes share is copied and the
+    rest keeps its new initial values, so small design edits keep most of the training.
+    :param source: (list[list[numpy.ndarray]]) -> Weights of each layer with weights of the trained model
+    :param target: (list[list[numpy.ndarray]]) -> Initial weights of each layer with weights of the new model
+    :return: (list[list[numpy.ndarray]], int, int) -> Weights of the new model, then the number of layers copied whole
+                                                       and the number of layers copied in part
+    """
+    weights, copied, partial = [], 0, 0
+    for index, initial in enumerate(target):
+        trained = source[index] if index < len(source) else []
+        layer_weights = []
+        whole, shared = len(trained) == len(initial), False
+        for array_index, array in enumerate(initial):
+            array = array.copy()
+            old = trained[array_index] if array_index < len(trained) else None
+            if old is not None and old.ndim == array.ndim:
+                region = tuple(slice(0, min(old_size, new_size)) for old_size, new_size in zip(old.shape, array.shape))
+                array[region] = old[region]
+                shared = shared or array[region].size > 0
+                whole = whole and old.shape == array.shape
+            else:
+                whole = False
+            layer_weights.append(array)
+        weights.append(layer_weights)
+        if whole and initial:
+            copied += 1
+        elif shared:
+            partial += 1
+    return weights, copied, partial
+
+
+def save_artifacts(model, properties):
+    """
+    Save a trained model, its weights and its architecture to the project directory. Each file is written to a
+    temporary file first and renamed into place, so an interrupted save never leaves a half-written file behind.
+    :param model: (keras.models.Model) -> Trained model
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (list[string]) -> Paths of the saved files
+    """
+    model_path, weights_path, json_path = paths = artifact_paths(properties)
+    temp = '{0}.{1}.tmp'
+    model.save(temp.format(model_path, os.getpid()))
+    model.save_weights(temp.format(weights_path, os.getpid()))
+    with open(temp.format(json_path, os.getpid()), 'w') as json_file:
+        json_file.write(model.to_json())
+    for path in paths:
+        os.replace(temp.format(path, os.getpid()), path)
+    return paths
+
+
+class Network(object):
+    """
+    Neural network of a canvas, built in memory from its layers. The network has the same interface as a generated
+    network script, so the generated script is only needed to use the network outside of neuromatic. Building the model
+    from the canvas properties of each job means a long-lived training process never trains a stale design.
+
+    Attributes:
+        properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+        layers: (list[layers.GenericLayer]) -> Layers of the network
+        test_metrics: (dict{'string': float}) -> Loss and compiled metrics of the trained model on the test set, or None
+                                                 before training
+    """
+
+    def __init__(self, properties):
+        self.properties = properties
+        self.layers = layers.create_layers(properties.get('layers', []))
+        self.test_metrics = None
+        if not self.layers:
+            raise ValueError('Cannot train without a network')
+
+    @property
+    def architecture(self):
+        """
+        :return: (string) -> Hash identifying the architecture of the network, see `architecture_key`
+        """
+        return architecture_key(self.layers)
+
+    def build_model(self):
+        """
+        :return: (keras.models.Sequential) -> New compiled model
+        """
+        from keras.models import Sequential
+
+        model = Sequential([layer.build() for layer in self.layers])
+        model.compile(optimizer=self.properties['optimizer'],
+                      loss=self.properties['loss'],
+                      metrics=list(self.properties['metrics']))
+        return model
+
+    def warm_start(self, model, path):
+        """
+        Initialize a new model with the weights of a trained model of a different design, see `transfer_weights`
+        :param model: (keras.models.Model) -> New compiled model
+        :param path: (string) -> Saved trained model
+        :return: (int, int) -> Number of layers copied whole and number of layers copied in part
+        """
+        from keras.models import load_model
+
+        trained = load_model(path, compile=False)
+        source = [layer.get_weights() for layer in trained.layers if layer.weights]
+        target_layers = [layer for layer in model.layers if layer.weights]
+        weights, copied, partial = transfer_weights(source, [layer.get_weights() for layer in target_layers])
+        for layer, layer_weights in zip(target_layers, weights):
+            layer.set_weights(layer_weights)
+        return copied, partial
+
+    def train_neural_network(self, train_data, test_data, callbacks=None, resume_path=None, initial_epoch=0,
+                             warm_start_path=None):
+        """
+        Train and evaluate the model, then save it to the project directory
+        :param train_data: (iterator) -> Endless stream of training batches, with one epoch of `len(train_data)` batches
+        :param test_data: (iterator) -> Endless stream of test batches, with `len(test_data)` batches in the test set
+        :param callbacks: (list[keras.callbacks.Callback]) -> Callbacks called while training
+        :param resume_path: (string) -> Checkpoint the model, with its optimizer state, is restored from
+        :param initial_epoch: (int) -> Epoch training starts from
+        :param warm_start_path: (string) -> Trained model of a different design the new model's weights start from
+        :return: (float) -> Model accuracy on the test set
+        """
+        from keras.models import load_model
+        from keras.utils import to_categorical
+
+        model = load_model(resume_path) if resume_path else self.build_model()
+        if warm_start_path and not resume_path:
+            copied, partial = self.warm_start(model, warm_start_path)
+            logger.info('Warm start: {0} layers copied, {1} partially reinitialized'.format(copied, partial))
+
+        train_steps, test_steps = len(train_data), len(test_data)
+        if self.properties['loss'] != 'sparse_categorical_crossentropy':
+            # Batches only hold a subset of the labels, so the number of classes comes from the output layer
+            num_classes = int(self.layers[-1].layer_properties.get('size'))
+            train_data = ((X, to_categorical(y, num_classes)) for X, y in train_data)
+            test_data = ((X, to_categorical(y, num_classes)) for X, y in test_data)
+        # Progress is reported to the GUI by the progress callback, not printed to stdout. The streams already prefetch,
+        # so Keras reads them on the training thread rather than through an enqueuer thread of its own, which keeps
+        # their wait times those of the training loop.
+        model.fit_generator(train_data, steps_per_epoch=train_steps, epochs=int(self.properties['epochs']),
+                            initial_epoch=initial_epoch, callbacks=callbacks, verbose=0, workers=0)
+        score = model.evaluate_generator(test_data, steps=test_steps, workers=0)
+        self.test_metrics = {name: float(value) for name, value in zip(model.metrics_names, score)}
+
+        save_artifacts(model, self.properties)
+        return score[1]
@@ -0,0 +1,555 @@
+import os
+import json
+import time
+import contextlib
+import shutil
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where the lock is a byte range lock, see `_try_lock`
+    fcntl = None
+    import msvcrt
+
+from backend import dataset, parallel_csv, profiler
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.neuromatic', 'datasets')
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+DEFAULT_ARTIFACT_DIR = os.path.join(os.path.expanduser('~'), '.neuromatic', 'artifacts')
+DEFAULT_MAX_ARTIFACT_BYTES = 2 * 1024 ** 3
+
+TEMP_ENTRY_TIMEOUT = 24 * 60 * 60
+
+FEATURES_FILE = 'features.npy'
+LABELS_FILE = 'labels.npy'
+METADATA_FILE = 'metadata.json'
+PROFILE_SUFFIX = '.profile.json'
+STAT_SUFFIX = '.stat.json'
+LOCK_SUFFIX = '.lock'
+LOCK_POLL_INTERVAL = 0.1
+LOCK_TIMEOUT = 60 * 60
+
+
+def fingerprint(data_path, block_size=1 << 20):
+    """
+    Identify the contents of a data file
+    :param data_path: (string) -> Path to the data file
+    :param block_size: (int) -> Number of bytes hashed at a time
+    :return: (dict{'string': object}) -> Absolute path, size, modification time and SHA-1 of the file
+    """
+    stat = os.stat(data_path)
+    content_hash = hashlib.sha1()
+    with open(data_path, 'rb') as fd:
+        for block in iter(lambda: fd.read(block_size), b''):
+            content_hash.update(block)
+
+    return {
+        'path': os.path.abspath(data_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'sha1': content_hash.hexdigest(),
+    }
+
+
+class WaitCanceled(Exception):
+    """
+    Raised when a job is canceled while it waits for another process to cache the same data file
+    """
+    pass
+
+
+def _try_lock(fd):
+    """
+    Take an exclusive lock on an open file without waiting. The operating system releases the lock when the process
+    holding it exits, however it exits, so a killed process never leaves a file locked.
+    :param fd: (int) -> Open file descriptor
+    :return: (boolean) -> True if the lock was taken
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def fingerprint_key(data_fingerprint):
+    """
+    Convert a file fingerprint into a cache key
+    :param data_fingerprint: (dict{'string': object}) -> Fingerprint returned by `fingerprint`
+    :return: (string) -> Hex digest identifying the fingerprint
+    """
+    text = json.dumps(data_fingerprint, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def spec_key(spec):
+    """
+    Convert a specification into a cache key. The specification is serialized canonically, so equal specifications
+    have equal keys whatever the order of their keys.
+    :param spec: (dict{'string': object}) -> JSON serializable specification
+    :return: (string) -> Hex digest identifying the specification
+    """
+    text = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _read_metadata(entry):
+    with open(os.path.join(entry, METADATA_FILE), 'r') as fd:
+        return json.load(fd)
+
+
+def _write_json(path, values):
+    # A temp file per process, as several processes may write the same file at once, such as when jobs loading the same
+    # entry all update its last use time
+    temp_file = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(temp_file, 'w') as fd:
+        json.dump(values, fd)
+    os.replace(temp_file, path)
+
+
+def _write_metadata(entry, metadata):
+    _write_json(os.path.join(entry, METADATA_FILE), metadata)
+
+
+class DatasetCache(object):
+    """
+    Stores parsed training data as memory-mappable `.npy` arrays so a CSV file is only parsed from text once.
+    Uncompressed files are parsed in parallel; compressed files are decompressed and parsed as a single stream.
+
+    Each entry is a directory named after the fingerprint key of the source file holding the feature matrix, the label
+    vector and a JSON metadata sidecar. Entries are evicted when they have not been used for `max_age` seconds, then
+    least recently used first until the cache is smaller than `max_bytes`.
+
+    Dataset profiles are small JSON files next to the entries, named after the fingerprint key of the source file. They
+    do not depend on the feature type and are evicted by age only. Each profile is indexed by the path, size and
+    modification time of its source file in another small JSON file, so `cached_profile` finds it without reading the
+    source file.
+
+    Attributes:
+        cache_dir: (string) -> Directory holding the cache entries
+        max_bytes: (int) -> Maximum total size of the cache
+        max_age: (float) -> Maximum number of seconds since an entry was last used
+        num_workers: (int) -> Number of processes used to parse a CSV file, 1 to parse in this process
+        logger: (logging.Logger) -> Cache logger
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 num_workers=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.num_workers = num_workers or os.cpu_count()
+        self.logger = logging.getLogger('cache')
+
+        self.__fingerprints = {}
+
+    def load(self, data_path, feature_dtype='auto', status=None, cancel=None):
+        """
+        Load cached arrays for a data file, parsing and caching the file first if needed
+        :param data_path: (string) -> Path to the CSV file, optionally compressed
+        :param feature_dtype: (string) -> Type used to store the features, or 'auto' to infer the narrowest safe type
+        :param status: (function) -> Optional function passed progress messages
+        :param cancel: (multiprocessing.Event) -> Optional event that raises `WaitCanceled` when set while waiting for
+                                                  another process to cache the file
+        :return: (numpy.memmap, numpy.memmap) -> Read-only features and label vector. The features are a matrix, or a
+                                                 record array with one field per column when the column types differ,
+                                                 see `dataset.features_dtype`
+        """
+        data_fingerprint = self.fingerprint(data_path)
+        entry = os.path.join(self.cache_dir, fingerprint_key(dict(data_fingerprint, feature_dtype=feature_dtype)))
+
+        if not os.path.isfile(os.path.join(entry, METADATA_FILE)):
+            with self.__lock(entry, cancel):
+                # Another process may have cached the file while this one waited, as when sweep trials start together
+                if not os.path.isfile(os.path.join(entry, METADATA_FILE)):
+                    self.logger.info('Caching {0}'.format(data_path))
+                    self.__store(data_path, entry, data_fingerprint, feature_dtype, status)
+        else:
+            self.logger.debug('Cache hit for {0}'.format(data_path))
+
+        metadata = _read_metadata(entry)
+        metadata['last_used'] = time.time()
+        _write_metadata(entry, metadata)
+        self.evict(keep=entry)
+
+        features = np.load(os.path.join(entry, FEATURES_FILE), mmap_mode='r')
+        labels = np.load(os.path.join(entry, LABELS_FILE), mmap_mode='r')
+        return features, labels
+
+    def profile(self, data_path, status=None):
+        """
+        Load the cached profile of a data file, profiling the file first if needed
+        :param data_path: (string) -> Path to the CSV file, optionally compressed
+        :param status: (function) -> Optional function passed progress messages
+        :return: (profiler.DatasetProfile) -> Profile of the file
+        """
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        data_fingerprint = self.fingerprint(data_path)
+        profile_key = fingerprint_key(data_fingerprint) + PROFILE_SUFFIX
+        profile_path = os.path.join(self.cache_dir, profile_key)
+
+        if os.path.isfile(profile_path):
+            self.logger.debug('Profile cache hit for {0}'.format(data_path))
+            with open(profile_path, 'r') as fd:
+                data_profile = profiler.DatasetProfile.from_dict(json.load(fd))
+            os.utime(profile_path)
+        else:
+            self.logger.info('Profiling {0}'.format(data_path))
+            if status:
+                status('Profiling data...\n')
+            data_profile = profiler.profile_csv(data_path)
+            _write_json(profile_path, data_profile.to_dict())
+
+        stat_fingerprint = {name: data_fingerprint[name] for name in ('path', 'size', 'mtime')}
+        _write_json(os.path.join(self.cache_dir, fingerprint_key(stat_fingerprint) + STAT_SUFFIX),
+                    {'profile': profile_key})
+        return data_profile
+
+    def cached_profile(self, data_path):
+        """
+        Load the cached profile of a data file without reading the file, so it can be called from the GUI thread. The
+        file is identified by its path, size and modification time only, see `profile`.
+        :param data_path: (string) -> Path to the CSV file, optionally compressed
+        :return: (profiler.DatasetProfile) -> Profile of the file, or None if the file was not profiled since it last
+                                              changed
+        """
+        try:
+            stat = os.stat(data_path)
+            stat_fingerprint = {'path': os.path.abspath(data_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+            stat_path = os.path.join(self.cache_dir, fingerprint_key(stat_fingerprint) + STAT_SUFFIX)
+            with open(stat_path, 'r') as fd:
+                profile_path = os.path.join(self.cache_dir, json.load(fd)['profile'])
+            with open(profile_path, 'r') as fd:
+                data_profile = profiler.DatasetProfile.from_dict(json.load(fd))
+            os.utime(stat_path)
+            os.utime(profile_path)
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+        return data_profile
+
+    def evict(self, keep=None):
+        """
+        Remove stale entries, then least recently used entries until the cache fits in `max_bytes`
+        :param keep: (string) -> Path to an entry that is in use and must not be removed
+        """
+        entries = []
+        for key in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            entry = os.path.join(self.cache_dir, key)
+            if key.endswith((PROFILE_SUFFIX, STAT_SUFFIX)):
+                if time.time() - os.path.getmtime(entry) > self.max_age:
+                    os.remove(entry)
+                continue
+            if key.endswith(('.tmp', LOCK_SUFFIX)) and time.time() - os.path.getmtime(entry) < TEMP_ENTRY_TIMEOUT:
+                # Entry is still being written by another process
+                continue
+            try:
+                entries.append((_read_metadata(entry), entry))
+            except (IOError, OSError, ValueError):
+                # Unfinished or corrupt entries are never loaded, so they can always be removed
+                if os.path.isdir(entry):
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    os.remove(entry)
+
+        now = time.time()
+        entries.sort(key=lambda item: item[0]['last_used'])
+        total_bytes = sum(metadata['bytes'] for metadata, _ in entries)
+        for metadata, entry in entries:
+            if entry == keep:
+                continue
+            if now - metadata['last_used'] > self.max_age or total_bytes > self.max_bytes:
+                self.logger.debug('Evicting {0}'.format(entry))
+                shutil.rmtree(entry, ignore_errors=True)
+                total_bytes -= metadata['bytes']
+
+    def __store(self, data_path, entry, data_fingerprint, feature_dtype, status):
+        """
+        Parse a CSV file in chunks into the arrays of a new cache entry. The entry is written to a temporary directory
+        and renamed into place so a partially written entry is never loaded.
+
+        Every column is stored in the narrowest type that holds it without loss, the features as a record array with
+        one field per column when their types differ, unless a feature type is declared. Values too large for a declared
+        type are an error, and values it rounds are reported.
+        :param data_path: (string) -> Path to the CSV file
+        :param entry: (string) -> Path to the cache entry directory
+        :param data_fingerprint: (dict{'string': object}) -> Fingerprint of the CSV file
+        :param feature_dtype: (string) -> Type used to store the features, or 'auto'
+        :param status: (function) -> Optional function passed progress messages
+        """
+        start_time = time.time()
+        reader = None
+        columns = dataset.read_columns(data_path)
+        if self.num_workers > 1 and not dataset.is_compressed(data_path):
+            # The parsed ranges are as large as the entry, so they are kept with the cache rather than in /tmp
+            reader = parallel_csv.ParallelCsvReader(data_path, self.num_workers, temp_dir=self.cache_dir)
+            num_rows, column_dtypes = reader.scan()
+            stats = reader.stats
+        else:
+            num_rows, stats = dataset.scan_stats(data_path)
+            column_dtypes = dataset.stats_dtypes(stats, len(columns))
+
+        try:
+            label_dtype = column_dtypes[0]
+            if feature_dtype == 'auto':
+                feature_dtype = dataset.features_dtype(column_dtypes[1:])
+            else:
+                feature_dtype = np.dtype(feature_dtype)
+                self.__check_feature_dtype(feature_dtype, column_dtypes[1:], stats, status)
+
+            temp_entry = '{0}.{1}.tmp'.format(entry, os.getpid())
+            os.makedirs(temp_entry)
+            features_path = os.path.join(temp_entry, FEATURES_FILE)
+            labels_path = os.path.join(temp_entry, LABELS_FILE)
+            features = np.lib.format.open_memmap(features_path, mode='w+', dtype=feature_dtype,
+                                                 shape=dataset.feature_shape(num_rows, feature_dtype, len(columns) - 1))
+            labels = np.lib.format.open_memmap(labels_path, mode='w+', dtype=label_dtype, shape=(num_rows,))
+
+            if reader:
+                del features, labels
+                reader.read_into(features_path, labels_path)
+            else:
+                offset = 0
+                with dataset.open_data(data_path) as fd:
+                    for chunk in pd.read_csv(fd, chunksize=dataset.DEFAULT_CHUNK_SIZE):
+                        values = chunk.values
+                        dataset.write_features(features, offset, values[:, 1:])
+                        labels[offset:offset + len(values)] = values[:, 0]
+                        offset += len(values)
+                features.flush()
+                labels.flush()
+                del features, labels
+        finally:
+            if reader:
+                # Parsed ranges left if the types do not fit or parsing fails
+                reader.close()
+
+        elapsed = time.time() - start_time
+        message = 'Parsed {0:.1f} MB at {1:.1f} MB/s'.format(data_fingerprint['size'] / 1e6,
+                                                             data_fingerprint['size'] / 1e6 / max(elapsed, 1e-6))
+        self.logger.info(message)
+        if status:
+            status(message + '\n')
+
+        _write_metadata(temp_entry, {
+            'fingerprint': data_fingerprint,
+            'columns': columns,
+            'column_dtypes': [str(dtype) for dtype in column_dtypes],
+            'feature_dtype': str(feature_dtype),
+            'label_dtype': str(label_dtype),
+            'rows': num_rows,
+            'bytes': sum(os.path.getsize(os.path.join(temp_entry, name)) for name in (FEATURES_FILE, LABELS_FILE)),
+            'created': time.time(),
+            'last_used': time.time(),
+        })
+
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.rename(temp_entry, entry)
+
+    def __check_feature_dtype(self, feature_dtype, column_dtypes, stats, status):
+        """
+        Check that the feature columns fit in a declared type
+        :param feature_dtype: (numpy.dtype) -> Declared feature type
+        :param column_dtypes: (list[numpy.dtype]) -> Narrowest safe type of each feature column
+        :param stats: (tuple(numpy.ndarray)) -> Summary of the columns returned by `dataset.merge_stats`, or None
+        :param status: (function) -> Optional function passed progress messages
+        """
+        if all(np.can_cast(dtype, feature_dtype) for dtype in column_dtypes) or stats is None:
+            return
+        if feature_dtype.kind in 'iu':
+            raise ValueError('Training data does not fit in declared feature type {0}'.format(feature_dtype))
+
+        feature_stats = [column[1:] for column in stats]
+        largest = np.fmax.reduce(np.abs(np.r_[feature_stats[0], feature_stats[1]]), initial=0.0)
+        if largest > np.finfo(feature_dtype).max:
+            raise ValueError('Training data does not fit in declared feature type {0}, values reach {1:g}'.format(
+                feature_dtype, largest))
+        num_rounded = np.count_nonzero(~dataset.exact_columns(feature_stats, feature_dtype))
+        if num_rounded:
+            message = '{0} feature columns are rounded by declared feature type {1}'.format(num_rounded, feature_dtype)
+            self.logger.warning(message)
+            if status:
+                status(message + '\n')
+
+    @contextlib.contextmanager
+    def __lock(self, entry, cancel=None):
+        """
+        Hold an exclusive lock on a cache entry across processes, so a file is parsed only once when several training
+        jobs need it at the same time. The lock is released by the operating system if its holder dies, as when a
+        worker that does not stop is terminated, so waiting for it only lasts as long as the holder is parsing.
+        :param entry: (string) -> Path to the cache entry directory
+        :param cancel: (multiprocessing.Event) -> Optional event that stops the wait when set
+        """
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+        lock_path = entry + LOCK_SUFFIX
+        deadline = time.time() + LOCK_TIMEOUT
+        while True:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+            try:
+                while not _try_lock(fd):
+                    if cancel is not None and cancel.is_set():
+                        raise WaitCanceled('Canceled while waiting for the data to be cached by another job')
+                    if time.time() > deadline:
+                        raise TimeoutError('Timed out waiting for the data to be cached by another job')
+                    time.sleep(LOCK_POLL_INTERVAL)
+                try:
+                    # The holder removes the lock file when it is done, so a waiter may have locked a removed file
+                    if os.path.samestat(os.fstat(fd), os.stat(lock_path)):
+                        break
+                except FileNotFoundError:
+                    pass
+                _unlock(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+            os.close(fd)
+        try:
+            os.utime(lock_path)
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                # Windows cannot remove a file other processes have open; the next holder removes it
+                pass
+            _unlock(fd)
+            os.close(fd)
+
+    def fingerprint(self, data_path):
+        """
+        Fingerprint a data file, hashing it again only if its size or modification time changed since the last call
+        :param data_path: (string) -> Path to the data file
+        :return: (dict{'string': object}) -> Fingerprint of the file, see `fingerprint`
+        """
+        stat = os.stat(data_path)
+        stat_key = (os.path.abspath(data_path), stat.st_size, stat.st_mtime)
+        if stat_key not in self.__fingerprints:
+            self.__fingerprints[stat_key] = fingerprint(data_path)
+        return self.__fingerprints[stat_key]
+
+
+class ArtifactCache(object):
+    """
+    Content-addressed store of generated network scripts and trained models, so an unchanged canvas is neither
+    regenerated nor retrained.
+
+    Each entry is a directory named after the key of the specification that produced its files, see `spec_key`,
+    holding a copy of each file and a JSON metadata sidecar with the size and SHA-1 of every file and the score of a
+    trained model. Entries are evicted least recently used first until the cache is smaller than `max_bytes`.
+
+    Attributes:
+        cache_dir: (string) -> Directory holding the cache entries
+        max_bytes: (int) -> Maximum total size of the cache
+        logger: (logging.Logger) -> Cache logger
+    """
+
+    def __init__(self, cache_dir=DEFAULT_ARTIFACT_DIR, max_bytes=DEFAULT_MAX_ARTIFACT_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger('cache')
+
+    def restore(self, key, paths):
+        """
+        Copy the files of an entry to where they are used. A file that already holds the cached contents is left as it
+        is, so restoring an unchanged project writes nothing.
+        :param key: (string) -> Key of the entry
+        :param paths: (dict{'string': string}) -> Path each cached file is copied to, by file name
+        :return: (dict{'string': object}) -> Metadata of the entry, or None if it is not cached
+        """
+        entry = os.path.join(self.cache_dir, key)
+        try:
+            metadata = _read_metadata(entry)
+        except (IOError, OSError, ValueError):
+            return None
+        if not set(paths).issubset(metadata['files']):
+            return None
+
+        for name, path in paths.items():
+            cached = metadata['files'][name]
+            if os.path.isfile(path) and os.path.getsize(path) == cached['bytes'] and \
+                    fingerprint(path)['sha1'] == cached['sha1']:
+                continue
+            temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+            shutil.copyfile(os.path.join(entry, name), temp_path)
+            os.replace(temp_path, path)
+
+        self.logger.debug('Artifact cache hit for {0}'.format(key))
+        metadata['last_used'] = time.time()
+        _write_metadata(entry, metadata)
+        return metadata
+
+    def store(self, key, paths, score=None, spec=None):
+        """
+        Copy files into a new entry, replacing any entry with the same key. The entry is written to a temporary
+        directory and renamed into place so a partially written entry is never restored.
+        :param key: (string) -> Key of the entry
+        :param paths: (dict{'string': string}) -> Path of each file to cache, by file name
+        :param score: (float) -> Optional score of a trained model
+        :param spec: (dict{'string': object}) -> Optional specification the key was made from, kept for reference
+        """
+        entry = os.path.join(self.cache_dir, key)
+        temp_entry = '{0}.{1}.tmp'.format(entry, os.getpid())
+        os.makedirs(temp_entry)
+        files = {}
+        for name, path in paths.items():
+            shutil.copyfile(path, os.path.join(temp_entry, name))
+            files[name] = {'bytes': os.path.getsize(path), 'sha1': fingerprint(path)['sha1']}
+
+        _write_metadata(temp_entry, {
+            'files': files,
+            'score': score,
+            'spec': spec,
+            'bytes': sum(item['bytes'] for item in files.values()),
+            'created': time.time(),
+            'last_used': time.time(),
+        })
+        if os.path.isdir(entry):
+            shutil.rmtree(entry)
+        os.rename(temp_entry, entry)
+        self.evict(keep=entry)
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits in `max_bytes`
+        :param keep: (string) -> Path to an entry that must not be removed
+        """
+        entries = []
+        for key in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            entry = os.path.join(self.cache_dir, key)
+            if key.endswith('.tmp') and time.time() - os.path.getmtime(entry) < TEMP_ENTRY_TIMEOUT:
+                # Entry is still being written
+                continue
+            try:
+                entries.append((_read_metadata(entry), entry))
+            except (IOError, OSError, ValueError):
+                shutil.rmtree(entry, ignore_errors=True)
+
+        entries.sort(key=lambda item: item[0]['last_used'])
+        total_bytes = sum(metadata['bytes'] for metadata, _ in entries)
+        for metadata, entry in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            self.logger.debug('Evicting {0}'.format(entry))
+            shutil.rmtree(entry, ignore_errors=True)
+            total_bytes -= metadata['bytes']
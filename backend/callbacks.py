@@ -0,0 +1,177 @@
+import time
+
+from keras.callbacks import Callback
+
+from backend import checkpoint, progress, ring_buffer, training
+
+
+class CheckpointCallback(Callback):
+    """
+    Saves the model, including its optimizer state, to a checkpoint directory as training runs.
+
+    Attributes:
+        directory: (string) -> Checkpoint directory
+        policy: (checkpoint.CheckpointPolicy) -> Decides when to save
+        details: (dict{'string': object}) -> Extra values stored with every checkpoint
+        send: (function) -> Optional function passed status messages
+    """
+
+    def __init__(self, directory, policy, details=None, send=None):
+        super(CheckpointCallback, self).__init__()
+        self.directory = directory
+        self.policy = policy
+        self.details = details or {}
+        self.send = send
+        self.__epochs_done = policy.last_epoch
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.__epochs_done = epoch
+
+    def on_batch_end(self, batch, logs=None):
+        if self.policy.time_due():
+            self.__save()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.__epochs_done = epoch + 1
+        if self.policy.epoch_due(self.__epochs_done):
+            self.__save()
+
+    def __save(self):
+        checkpoint.save(self.model.save, self.directory, self.__epochs_done, **self.details)
+        self.policy.saved(self.__epochs_done)
+        if self.send:
+            self.send('Checkpoint saved after {0} epochs\n'.format(self.__epochs_done))
+
+
+class CancelCallback(Callback):
+    """
+    Stops training at the end of the batch during which the cancel event was set. The metrics of the epoch so far are
+    reported and, if a checkpoint directory is given, the partially trained model is saved as a checkpoint so training
+    can be resumed from it.
+
+    Attributes:
+        cancel: (multiprocessing.Event) -> Event set to cancel training
+        directory: (string) -> Checkpoint directory the partially trained model is saved to, or None to not save it
+        details: (dict{'string': object}) -> Extra values stored with the checkpoint
+        send: (function) -> Optional function passed status messages
+    """
+
+    def __init__(self, cancel, directory=None, details=None, send=None, initial_epoch=0):
+        super(CancelCallback, self).__init__()
+        self.cancel = cancel
+        self.directory = directory
+        self.details = details or {}
+        self.send = send
+        self.__initial_epoch = initial_epoch
+        self.__epochs_done = initial_epoch
+        self.__metrics = progress.RunningMetrics()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.__epochs_done = epoch
+        self.__metrics = progress.RunningMetrics()
+
+    def on_batch_end(self, batch, logs=None):
+        self.__metrics.add(logs or {})
+        if self.cancel.is_set():
+            raise training.TrainingCanceled(self.stop())
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.__epochs_done = epoch + 1
+
+    def metrics(self):
+        """
+        :return: (dict{'string': float}) -> Mean of each metric over the batches of the current epoch so far
+        """
+        return self.__metrics.means()
+
+    def stop(self):
+        """
+        Save the partially trained model, if enabled, and describe where training stopped
+        :return: (string) -> Cancellation message with the metrics so far
+        """
+        message = 'Training canceled in epoch {0} after {1} batches'.format(self.__epochs_done + 1,
+                                                                             self.__metrics.batches)
+        metrics = self.metrics()
+        if metrics:
+            message += ' ({0})'.format(', '.join('{0}: {1:.4f}'.format(name, value)
+                                                 for name, value in sorted(metrics.items())))
+
+        trained = self.__metrics.batches > 0 or self.__epochs_done > self.__initial_epoch
+        if self.directory is not None and self.model is not None and trained:
+            # Resuming restarts the interrupted epoch with the weights trained so far
+            checkpoint.save(self.model.save, self.directory, self.__epochs_done, **self.details)
+            if self.send:
+                self.send('Partially trained model saved, resume to continue from epoch {0}\n'.format(
+                    self.__epochs_done + 1))
+        return message
+
+
+class ProgressCallback(Callback):
+    """
+    Reports training progress as typed progress messages: the running metrics, throughput and estimated time left after
+    every batch, and the metrics of every epoch. Batch messages are throttled, see `progress.ThrottledSender`, so tiny
+    batches do not flood the pipe to the GUI. The metrics of every batch, unthrottled, can also be recorded, such as in
+    a shared memory ring buffer, see `ring_buffer.MetricsRing`.
+
+    Attributes:
+        send: (progress.ThrottledSender) -> Sends the progress messages
+        record: (function) -> Optional function passed the metrics of every batch as keyword arguments
+    """
+
+    def __init__(self, send, interval=progress.DEFAULT_INTERVAL, record=None):
+        super(ProgressCallback, self).__init__()
+        self.send = progress.ThrottledSender(send, interval)
+        self.record = record
+        self.__metrics = progress.RunningMetrics()
+        self.__start_time = None
+        self.__epoch_start_time = None
+        self.__first_epoch = None
+        self.__epoch = 0
+
+    def on_train_begin(self, logs=None):
+        self.__start_time = time.monotonic()
+        self.__first_epoch = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        if self.__first_epoch is None:
+            self.__first_epoch = epoch
+        self.__epoch = epoch
+        self.__epoch_start_time = time.monotonic()
+        self.__metrics = progress.RunningMetrics()
+
+    def on_batch_end(self, batch, logs=None):
+        logs = logs or {}
+        self.__metrics.add(logs)
+        if self.record is not None:
+            self.record(time=time.time(), epoch=self.__epoch + 1, step=self.__metrics.batches, loss=logs.get('loss'),
+                        accuracy=logs.get('acc', logs.get('accuracy')), samples_per_second=self.__throughput(),
+                        rss=ring_buffer.rss_bytes())
+        steps = self.params.get('steps')
+        self.send(progress.batch(self.__epoch + 1, self.params.get('epochs'), self.__metrics.batches, steps,
+                                 self.__metrics.means(), self.__throughput(), self.__eta()))
+
+    def on_epoch_end(self, epoch, logs=None):
+        # Keras' epoch logs include validation metrics, which the running means do not
+        metrics = {name: float(value) for name, value in (logs or {}).items() if name not in ('batch', 'size')}
+        self.send(progress.epoch(epoch + 1, self.params.get('epochs'), metrics or self.__metrics.means(),
+                                 self.__throughput(), self.__eta(), time.monotonic() - self.__epoch_start_time))
+
+    def on_train_end(self, logs=None):
+        self.send.flush()
+
+    def __throughput(self):
+        """
+        :return: (float) -> Samples trained per second in the current epoch
+        """
+        return self.__metrics.samples / max(time.monotonic() - self.__epoch_start_time, 1e-9)
+
+    def __eta(self):
+        """
+        :return: (float) -> Seconds until training ends at the pace of this run so far, or None if unknown
+        """
+        steps, epochs = self.params.get('steps'), self.params.get('epochs')
+        if not steps or not epochs:
+            return None
+        done = (self.__epoch - self.__first_epoch) * steps + self.__metrics.batches
+        remaining = (epochs - self.__epoch) * steps - self.__metrics.batches
+        return (time.monotonic() - self.__start_time) / max(done, 1) * remaining
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import shutil
+
+DEFAULT_EVERY_EPOCHS = 1
+DEFAULT_EVERY_MINUTES = 30
+
+STATE_FILE = 'checkpoint.json'
+MODEL_FILE = 'epoch{0:05d}.h5'
+KEEP_CHECKPOINTS = 2
+
+
+def checkpoint_dir(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (string) -> Directory holding the checkpoints of the canvas
+    """
+    return os.path.join(properties['project_directory'], '{0}_checkpoints'.format(properties['canvas_name']))
+
+
+def latest(directory):
+    """
+    Find the latest complete checkpoint
+    :param directory: (string) -> Checkpoint directory
+    :return: (dict{'string': object}) -> Checkpoint state, with the model path under 'path', or None if there is none
+    """
+    try:
+        with open(os.path.join(directory, STATE_FILE), 'r') as fd:
+            state = json.load(fd)
+    except (IOError, OSError, ValueError):
+        return None
+
+    state['path'] = os.path.join(directory, state['file'])
+    if not os.path.isfile(state['path']):
+        return None
+    return state
+
+
+def save(save_model, directory, epoch, **details):
+    """
+    Write a checkpoint atomically. The model is saved to a temporary file and renamed into place, then the state file
+    is replaced to point at it, so an interruption at any point leaves the previous checkpoint usable. Only the newest
+    `KEEP_CHECKPOINTS` model files are kept.
+    :param save_model: (function) -> Saves the model, including its optimizer state, to the path it is passed
+    :param directory: (string) -> Checkpoint directory
+    :param epoch: (int) -> Number of epochs to resume from
+    :param details: (dict{'string': object}) -> Extra values stored in the checkpoint state
+    :return: (string) -> Path to the saved model
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    file_name = MODEL_FILE.format(epoch)
+    path = os.path.join(directory, file_name)
+    temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    save_model(temp_path)
+    os.replace(temp_path, path)
+
+    state = dict(details, epoch=epoch, file=file_name, saved=time.time())
+    temp_state = '{0}.{1}.tmp'.format(os.path.join(directory, STATE_FILE), os.getpid())
+    with open(temp_state, 'w') as fd:
+        json.dump(state, fd)
+    os.replace(temp_state, os.path.join(directory, STATE_FILE))
+
+    model_files = sorted(name for name in os.listdir(directory) if name.startswith('epoch') and name.endswith('.h5'))
+    for name in model_files[:-KEEP_CHECKPOINTS]:
+        if name != file_name:
+            os.remove(os.path.join(directory, name))
+    return path
+
+
+def clear(directory):
+    """
+    Remove every checkpoint, once training has finished
+    :param directory: (string) -> Checkpoint directory
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class CheckpointPolicy(object):
+    """
+    Decides when to save a checkpoint: every `every_epochs` epochs, or once `every_minutes` have passed since the last
+    checkpoint. The time is checked after every batch, so long epochs are checkpointed too. A checkpoint taken within an
+    epoch resumes from the start of that epoch with the weights trained so far.
+
+    Attributes:
+        every_epochs: (int) -> Epochs between checkpoints, 0 to not checkpoint by epoch
+        every_minutes: (float) -> Minutes between checkpoints, 0 to not checkpoint by time
+        last_epoch: (int) -> Epoch of the last checkpoint
+        last_time: (float) -> Time of the last checkpoint
+    """
+
+    def __init__(self, every_epochs=DEFAULT_EVERY_EPOCHS, every_minutes=DEFAULT_EVERY_MINUTES, initial_epoch=0):
+        self.every_epochs = int(every_epochs)
+        self.every_minutes = float(every_minutes)
+        self.last_epoch = initial_epoch
+        self.last_time = time.time()
+
+    @property
+    def enabled(self):
+        return self.every_epochs > 0 or self.every_minutes > 0
+
+    def epoch_due(self, epochs_done):
+        """
+        :param epochs_done: (int) -> Number of complete epochs
+        :return: (boolean) -> True if a checkpoint should be saved at the end of this epoch
+        """
+        by_epoch = self.every_epochs > 0 and epochs_done - self.last_epoch >= self.every_epochs
+        return by_epoch or self.time_due()
+
+    def time_due(self):
+        """
+        :return: (boolean) -> True if a checkpoint should be saved because enough time has passed
+        """
+        return self.every_minutes > 0 and time.time() - self.last_time >= self.every_minutes * 60
+
+    def saved(self, epochs_done):
+        """
+        Record that a checkpoint was saved
+        :param epochs_done: (int) -> Number of complete epochs when the checkpoint was saved
+        """
+        self.last_epoch = epochs_done
+        self.last_time = time.time()
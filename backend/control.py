@@ -1,60 +1,21 @@
 import os
 import re
-import time
-import shutil
+import atexit
+import random
 import logging
-import pandas as pd
-import multiprocessing
 
-from sklearn.model_selection import train_test_split
+from backend import layers, dataset, cache, builder, prefetch, progress, scheduler, sweep, cross_validation, training, \
+    checkpoint, threads, tuner
 
-from backend import layers
-
-# Configure logging
-LOG_TO_FILE = True
-log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
-log_file = 'neuromatic_{0}.log'.format(time.strftime('%m%d%Y_%H%M%S'))
-
-if not os.path.isdir(log_dir):
-    os.makedirs(log_dir)
-if LOG_TO_FILE:
-    logging.basicConfig(level=logging.DEBUG,
-                        format='[%(asctime)s][%(name)-12s][%(levelname)-8s] %(message)s',
-                        datefmt='%H%M%S',
-                        filename=os.path.join(log_dir, log_file),
-                        filemode='w')
-else:
-    logging.basicConfig(level=logging.DEBUG)
+# Part of the key of cached network scripts, so scripts cached by an older version are not restored after the
+# generated code changes
+SCRIPT_VERSION = 4
 
 
 class NetworkException(Exception):
     pass
 
 
-class ControlProcess(multiprocessing.Process):
-
-    def __init__(self, target, args):
-        super(ControlProcess, self).__init__(target=target, args=args)
-        self.daemon = True
-
-    def start(self):
-        """
-        Override Process.start() to prevent exceptions when attempting to start a process twice
-        """
-        try:
-            super(ControlProcess, self).start()
-        except AssertionError as error:
-            if str(error) != 'cannot start a process twice':
-                raise error
-
-    def terminate(self):
-        """
-        Override Process.terminate() to prevent exceptions if stopped process is terminated
-        """
-        if self.is_alive():
-            super(ControlProcess, self).terminate()
-
-
 class Control(object):
     """
     Controls the backend using properties passed from the GUI.
@@ -64,20 +25,23 @@ class Control(object):
         logger: (logging.Logger) -> System logger
         canvas_properties: (dict{'string': dict}) -> All canvas and layer properties passed from the GUI
         layers: (list[Layers]) -> Stores ordered list of Layers
+        dataset_cache: (cache.DatasetCache) -> Binary cache of parsed training data
+        artifact_cache: (cache.ArtifactCache) -> Content-addressed cache of generated network scripts
+        scheduler: (scheduler.JobScheduler) -> Runs training jobs on long-lived training workers
+        active_sweep: (sweep.Sweep) -> Current or last hyperparameter sweep, or None
+        active_cross_validation: (cross_validation.CrossValidation) -> Current or last cross-validation, or None
+        message_latency: (progress.LatencyMeter) -> Delay of the progress messages of the current training run
 
         PRIVATE
         __can_generate: (boolean) -> Determines if a network script can be generated
-        __can_train: (boolean) -> Determines if a model has been generated and can be trained
-        __training_process: (multiprocessing.Process) -> Current training process
+        __can_train: (boolean) -> Determines if the network can be trained on the training data
         __add_text: (function) -> Status box "add_text" function for logging to the GUI
+        __progress_listeners: (list[function]) -> Functions passed every progress message
+        __metrics_listeners: (list[function]) -> Functions passed the per-batch metrics read from the training workers
+        __profile_jobs: (dict{'string': scheduler.Job}) -> Last job queued to profile each data file
     """
 
-    LAYER_TYPES = {
-        'input': layers.InputLayer,
-        'hidden': layers.DenseLayer,
-        'dropout': layers.DropoutLayer,
-        'output': layers.DenseLayer,
-    }
+    LAYER_TYPES = layers.LAYER_TYPES
 
     def __init__(self):
         """
@@ -91,10 +55,19 @@ class Control(object):
         self.__can_generate = False
         self.__can_train = False
 
-        self.__training_process = None
-        self.__create_new_process()
+        self.scheduler = scheduler.JobScheduler()
+        atexit.register(self.scheduler.stop)
+        self.active_sweep = None
+        self.active_cross_validation = None
+        self.message_latency = progress.LatencyMeter()
+
+        self.dataset_cache = cache.DatasetCache()
+        self.artifact_cache = cache.ArtifactCache()
 
         self.__add_text = None
+        self.__progress_listeners = []
+        self.__metrics_listeners = []
+        self.__profile_jobs = {}
 
     @property
     def can_generate(self):
@@ -140,7 +113,7 @@ class Control(object):
         self.__can_generate = True
         self.__can_train = True
 
-        if 'csv' not in os.path.splitext(self.canvas_properties['data_path'])[1]:
+        if not dataset.is_supported(self.canvas_properties['data_path']):
             self.__log_status('Invalid data file type', 'error')
             self.__can_train = False
 
@@ -156,6 +129,52 @@ class Control(object):
         elif int(self.canvas_properties['epochs']) <= 0:
             self.__log_status('Epochs must be > 0', 'warning')
             self.canvas_properties['epochs'] = '1'
+        if 'streaming' not in self.canvas_properties:
+            self.canvas_properties['streaming'] = False
+        prefetch_defaults = (('prefetch_depth', prefetch.DEFAULT_DEPTH), ('prefetch_workers', prefetch.DEFAULT_WORKERS))
+        for key, default in prefetch_defaults:
+            if key not in self.canvas_properties:
+                self.canvas_properties[key] = default
+            elif int(self.canvas_properties[key]) <= 0:
+                self.__log_status('{0} must be > 0'.format(key), 'warning')
+                self.canvas_properties[key] = default
+        checkpoint_defaults = (('checkpoint_epochs', checkpoint.DEFAULT_EVERY_EPOCHS),
+                               ('checkpoint_minutes', checkpoint.DEFAULT_EVERY_MINUTES))
+        for key, default in checkpoint_defaults:
+            if key not in self.canvas_properties:
+                self.canvas_properties[key] = default
+            elif float(self.canvas_properties[key]) < 0:
+                self.__log_status('{0} must be >= 0'.format(key), 'warning')
+                self.canvas_properties[key] = default
+        try:
+            self.canvas_properties['batch_size'] = tuner.parse_batch_size(
+                self.canvas_properties.get('batch_size', dataset.DEFAULT_BATCH_SIZE))
+        except ValueError:
+            self.__log_status('Batch size must be > 0 or auto', 'warning')
+            self.canvas_properties['batch_size'] = dataset.DEFAULT_BATCH_SIZE
+        for key in ('intra_op_threads', 'inter_op_threads'):
+            if key not in self.canvas_properties:
+                self.canvas_properties[key] = 0
+            elif int(self.canvas_properties[key]) < 0:
+                self.__log_status('{0} must be >= 0'.format(key), 'warning')
+                self.canvas_properties[key] = 0
+        try:
+            cpus = threads.parse_cpus(self.canvas_properties.get('cpu_affinity', ''))
+        except ValueError as error:
+            self.__log_status(str(error), 'warning')
+            cpus = []
+        if not set(cpus).issubset(threads.available_cpus()):
+            self.__log_status('CPU affinity must be within CPUs {0}'.format(
+                threads.format_cpus(threads.available_cpus())), 'warning')
+            cpus = []
+        self.canvas_properties['cpu_affinity'] = threads.format_cpus(cpus)
+        if 'save_on_cancel' not in self.canvas_properties:
+            self.canvas_properties['save_on_cancel'] = True
+        if 'feature_dtype' not in self.canvas_properties:
+            self.canvas_properties['feature_dtype'] = 'auto'
+        elif self.canvas_properties['feature_dtype'] not in dataset.FEATURE_DTYPES:
+            self.__log_status('Invalid feature type: {0}'.format(self.canvas_properties['feature_dtype']), 'warning')
+            self.canvas_properties['feature_dtype'] = 'auto'
 
         # Initialize layers
         for index, layer in enumerate(self.canvas_properties['layers']):
@@ -180,146 +199,382 @@ class Control(object):
             self.__log_status('Invalid network configuration: network must start with input Layer', 'error')
             self.__can_generate = False
 
+        if self.__can_generate and self.__can_train:
+            self.__check_data()
+
+    def __check_data(self):
+        """
+        Check the network design against a profile of the training data so a mismatch is reported before training
+        starts. Profiling reads the whole data file, so it never runs on the GUI thread: the first check of a data file
+        queues a job that profiles it and reports any problem through the progress pipe, and later checks use the
+        cached profile, found from the size and modification time of the file alone. Training is not held back while
+        the data is profiled, as training jobs check the design themselves before reading the data, see
+        `training.train`.
+        """
+        data_path = self.canvas_properties['data_path']
+        if not os.path.isfile(data_path):
+            return
+
+        data_profile = self.dataset_cache.cached_profile(data_path)
+        if data_profile is None:
+            job = self.__profile_jobs.get(data_path)
+            if job is None or not job.active:
+                self.__log_status('Profiling data in the background', 'debug', suppress=True)
+                self.__profile_jobs[data_path] = self.scheduler.submit(self.canvas_properties, name='profile',
+                                                                       overrides={'profile': True})
+            return
+
+        problems, missing_features = training.check_data(self.canvas_properties, data_profile)
+        for problem in problems:
+            self.__log_status(problem, 'error')
+        if problems:
+            self.__can_train = False
+        if missing_features:
+            self.__log_status('{0} feature values are missing'.format(missing_features), 'warning')
+
     def generate_network(self):
         """
-        Write the Python file containing the Keras neural network
+        Write the Python file containing the Keras neural network, to use the network outside of neuromatic. Training
+        builds the network from the canvas layers and does not need the file.
         """
         if not self.__can_generate:
             self.__log_status('Generation error', 'error')
             return
         self.__log_status('\nGenerating network...', 'info')
 
-        file_name = os.path.join(self.canvas_properties['project_directory'],
-                                 '{0}_network.py'.format(self.canvas_properties['canvas_name']))
+        # The script saves the model next to itself, so its path is part of the specification
+        file_name = builder.script_path(self.canvas_properties)
+        spec = dict(builder.network_spec(self.canvas_properties, self.layers),
+                    batch_size=builder.script_batch_size(self.canvas_properties),
+                    script_version=SCRIPT_VERSION,
+                    script=file_name)
+        key = cache.spec_key(spec)
+        paths = {'network.py': file_name}
+        try:
+            if self.artifact_cache.restore(key, paths) is not None:
+                self.__log_status('Network unchanged', 'info')
+                return
+        except (IOError, OSError) as error:
+            self.__log_status('Unable to read the artifact cache: {0}'.format(error), 'warning', suppress=True)
+
+        self.write_network(self.canvas_properties, self.layers)
+        try:
+            self.artifact_cache.store(key, paths, spec=spec)
+        except (IOError, OSError) as error:
+            self.__log_status('Unable to cache the network: {0}'.format(error), 'warning', suppress=True)
+        self.__log_status('Network generated', 'info')
+
+    def write_network(self, properties, network_layers=None):
+        """
+        Write the network script for a set of canvas properties. `train_neural_network` trains on the batch streams
+        of neuromatic, and `train_on_arrays` on whole arrays in batches of BATCH_SIZE, see `builder.script_batch_size`.
+        :param properties: (dict{'string': object}) -> Canvas properties
+        :param network_layers: (list[Layers]) -> Layers of the network, created from the properties if not given
+        :return: (string) -> Path to the network script
+        """
+        if network_layers is None:
+            network_layers = layers.create_layers(properties['layers'])
+
+        file_name = builder.script_path(properties)
         with open(file_name, 'w') as fd:
             # Imports
             fd.write('import h5py\n')
-            fd.write('from keras.models import Sequential\n')
+            fd.write('from keras.models import Sequential, load_model\n')
             fd.write('from keras.layers import InputLayer, Dense, Dropout\n')
             fd.write('from keras.utils import to_categorical\n\n')
 
-            fd.write('def train_neural_network(X_train, y_train, X_test, y_test):\n')
+            # Batch size of train_on_arrays; the batch streams of neuromatic are already batched
+            fd.write('BATCH_SIZE = {0}\n\n\n'.format(builder.script_batch_size(properties)))
 
             # Model creation and adding layers
+            fd.write('def build_model():\n')
             fd.write('\tmodel = Sequential([\n')
-            for layer in self.layers:
+            for layer in network_layers:
                 layer.write_lines(fd)
             fd.write('\t])\n\n')
 
             # Model compilation and training
-            fd.write('\tmodel.compile(optimizer=\'{0}\', '.format(self.canvas_properties['optimizer']))
-            fd.write('loss=\'{0}\', '.format(self.canvas_properties['loss']))
+            fd.write('\tmodel.compile(optimizer=\'{0}\', '.format(properties['optimizer']))
+            fd.write('loss=\'{0}\', '.format(properties['loss']))
             fd.write('metrics=[')
-            for metric in self.canvas_properties['metrics']:
+            for metric in properties['metrics']:
                 fd.write('\'{0}\','.format(metric))
-            fd.write('\t])\n\n')
-
-            if self.canvas_properties['loss'] != 'sparse_categorical_crossentropy':
-                fd.write('\ty_train = to_categorical(y_train)\n')
-                fd.write('\ty_test = to_categorical(y_test)\n')
-            fd.write('\tmodel.fit(X_train, y_train, epochs={0})\n'.format(self.canvas_properties['epochs']))
-            fd.write('\tscore = model.evaluate(X_test, y_test, batch_size=128)\n\n')
+            fd.write('\t])\n')
+            fd.write('\treturn model\n\n\n')
 
             # Saving model
-            fd.write('\tmodel.save(\'{0}\')\n'.format(os.path.join(self.canvas_properties['project_directory'],
-                                                                   self.canvas_properties['canvas_name'] + '_model.h5')))
-            fd.write('\tmodel.save_weights(\'{0}\')\n'.format(os.path.join(self.canvas_properties['project_directory'],
-                                                                           self.canvas_properties['canvas_name'] + '_weights.h5')))
+            fd.write('def save_model(model):\n')
+            fd.write('\tmodel.save(\'{0}\')\n'.format(os.path.join(properties['project_directory'],
+                                                                   properties['canvas_name'] + '_model.h5')))
+            fd.write('\tmodel.save_weights(\'{0}\')\n'.format(os.path.join(properties['project_directory'],
+                                                                           properties['canvas_name'] + '_weights.h5')))
             fd.write('\tmodel_json = model.to_json()\n')
-            fd.write('\twith open(\'{0}\', \'w\') as json_file:\n'.format(os.path.join(self.canvas_properties['project_directory'],
-                                                                                       self.canvas_properties['canvas_name'] + '_model.json')))
-            fd.write('\t\tjson_file.write(model_json)\n\n')
+            fd.write('\twith open(\'{0}\', \'w\') as json_file:\n'.format(os.path.join(properties['project_directory'],
+                                                                                       properties['canvas_name'] + '_model.json')))
+            fd.write('\t\tjson_file.write(model_json)\n\n\n')
+
+            # Batches only hold a subset of the labels, so the number of classes comes from the output layer
+            categorical = properties['loss'] != 'sparse_categorical_crossentropy'
+            num_classes = network_layers[-1].layer_properties.get('size')
+
+            fd.write('def train_neural_network(train_data, test_data, callbacks=None, resume_path=None, initial_epoch=0):\n')
+            fd.write('\tmodel = build_model()\n\n')
+
+            # Resuming restores the weights and optimizer state saved in a checkpoint
+            fd.write('\tif resume_path:\n')
+            fd.write('\t\tmodel = load_model(resume_path)\n\n')
+
+            # Training and evaluation on batch streams
+            fd.write('\ttrain_steps, test_steps = len(train_data), len(test_data)\n')
+            if categorical:
+                fd.write('\ttrain_data = ((X, to_categorical(y, {0})) for X, y in train_data)\n'.format(num_classes))
+                fd.write('\ttest_data = ((X, to_categorical(y, {0})) for X, y in test_data)\n'.format(num_classes))
+            # The streams already prefetch, so they are read on the training thread, see `prefetch.PrefetchStream`
+            fd.write('\tmodel.fit_generator(train_data, steps_per_epoch=train_steps, epochs={0}, '
+                     'initial_epoch=initial_epoch, callbacks=callbacks, workers=0)\n'.format(properties['epochs']))
+            fd.write('\tscore = model.evaluate_generator(test_data, steps=test_steps, workers=0)\n\n')
+            fd.write('\tsave_model(model)\n')
+            fd.write('\treturn score[1]\n\n\n')
+
+            # Training and evaluation on whole arrays, to use the script outside of neuromatic
+            fd.write('def train_on_arrays(X_train, y_train, X_test, y_test, callbacks=None):\n')
+            fd.write('\tmodel = build_model()\n\n')
+            if categorical:
+                fd.write('\ty_train = to_categorical(y_train, {0})\n'.format(num_classes))
+                fd.write('\ty_test = to_categorical(y_test, {0})\n'.format(num_classes))
+            fd.write('\tmodel.fit(X_train, y_train, batch_size=BATCH_SIZE, epochs={0}, '
+                     'callbacks=callbacks)\n'.format(properties['epochs']))
+            fd.write('\tscore = model.evaluate(X_test, y_test, batch_size=BATCH_SIZE)\n\n')
+            fd.write('\tsave_model(model)\n')
+            fd.write('\treturn score[1]\n')
+
+        return file_name
 
-            fd.write('\treturn score[1]')
+    @property
+    def training(self):
+        """
+        :return: (boolean) -> True while a training job is queued or running
+        """
+        return self.scheduler.active
 
-        # Create local copy of network to import when training
-        shutil.copy(file_name, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'network.py'))
+    def start_worker(self):
+        """
+        Start a training worker in the background so Keras is already imported when training starts. The workers of
+        the other job slots start when jobs first need them.
+        """
+        self.__log_status('Starting training worker', 'debug', suppress=True)
+        self.scheduler.start()
 
-        self.__log_status('Network generated', 'info')
+    def stop_worker(self):
+        """
+        Stop the training workers, canceling every job
+        """
+        self.scheduler.stop()
 
-    def __train_network(self, connection):
+    def train_in_new_thread(self):
         """
-        Train the created neural network
-        :param connection: (multiprocess.Pipe) -> Child connection to the parent process
+        Queue a training job for the training workers. This prevents the main process (GUI) from stalling while
+        training happens. Jobs run in the order they are queued, several at once on machines with enough cores.
+
+        A network trained before with the same specification and data is not trained again: the job restores its model
+        files from the artifact cache and reports its accuracy. The job, not the GUI, reads the data file to identify
+        it, see `training.training_spec`.
+        :return: (scheduler.Job) -> The queued job, or None if the network cannot be trained
         """
-        try:
-            from backend import network
-        except ImportError:
-            connection.send('Cannot train without a network\n')
-            return
+        if not self.__can_generate or not self.__can_train:
+            self.__log_status('Training error', 'error')
+            return None
 
-        # Read in training data
-        connection.send('Reading data...\n')
-        training_data = pd.read_csv(self.canvas_properties['data_path'])
-        y_data = training_data.ix[:,0]
-        X_data = training_data.ix[:,1:]
-        X_train, X_test, y_train, y_test = train_test_split(X_data,
-                                                            y_data,
-                                                            train_size=float(self.canvas_properties['training_size']),
-                                                            shuffle=True)
+        self.__log_status('\nQueueing training job', 'debug')
+        return self.scheduler.submit(self.canvas_properties, overrides={'use_artifact_cache': True})
 
-        try:
-            connection.send('Training network...\n')
-            score = network.train_neural_network(X_train, y_train, X_test, y_test)
+    def resume_training(self):
+        """
+        Queue a training job that continues from the latest checkpoint of the canvas, with the same train/test split
+        :return: (scheduler.Job) -> The queued job, or None if there is nothing to resume
+        """
+        if not self.__can_generate or not self.__can_train:
+            self.__log_status('Training error', 'error')
+            return None
 
-            # Test network
-            connection.send('Network trained\n\n')
-            connection.send('Model accuracy: {0}\n'.format(round(score, 3)))
-        except (ValueError, AttributeError) as error:
-            connection.send('An error occurred while training:\n')
-            connection.send(str(error))
+        state = checkpoint.latest(checkpoint.checkpoint_dir(self.canvas_properties))
+        if state is None:
+            self.__log_status('No checkpoint to resume from', 'error')
+            return None
 
-        connection.close()
+        self.__log_status('\nQueueing training job from epoch {0}'.format(state['epoch']), 'debug')
+        return self.scheduler.submit(dict(self.canvas_properties, resume=True))
 
-    def train_in_new_thread(self):
+    def continue_training(self):
         """
-        Start a training process. This prevents the main process (GUI) from stalling while training
-        happens
+        Queue a training job that continues from the trained model of the canvas, or its latest checkpoint, and trains
+        only the epochs beyond those already trained. Layers whose shape changed since are partially reinitialized.
+        :return: (scheduler.Job) -> The queued job, or None if there is nothing to continue from
         """
-        if not self.__can_train:
+        if not self.__can_generate or not self.__can_train:
             self.__log_status('Training error', 'error')
-            return
+            return None
+
+        try:
+            state = training.warm_start_source(self.canvas_properties)
+        except ValueError as error:
+            self.__log_status(str(error), 'error')
+            return None
+        if int(self.canvas_properties['epochs']) <= state['epoch']:
+            self.__log_status('Epochs must be more than the {0} epochs already trained'.format(state['epoch']), 'error')
+            return None
+
+        self.__log_status('\nQueueing training job from epoch {0}'.format(state['epoch']), 'debug')
+        return self.scheduler.submit(self.canvas_properties, overrides={'warm_start': True})
+
+    def calibrate_threads(self):
+        """
+        Queue a job that times the network with several TensorFlow thread settings on a sample of the
+        training data, and reports the fastest setting for this machine
+        :return: (scheduler.Job) -> The queued job, or None if the network cannot be trained
+        """
+        if not self.__can_generate or not self.__can_train:
+            self.__log_status('Calibration error', 'error')
+            return None
+
+        self.__log_status('\nQueueing thread calibration', 'debug')
+        return self.scheduler.submit(self.canvas_properties, name='calibration', overrides={'calibrate': True})
 
-        if not self.__training_process.is_alive():
-            self.__log_status('\nStarting training process', 'debug')
-            try:
-                # Create a new process if one has already been run
-                self.__training_process.join()
-                self.__create_new_process()
-                self.__training_process.start()
-            except AssertionError as error:
-                if str(error) == 'can only join a started process':
-                    self.__training_process.start()
+    def start_sweep(self, grid, reduction=sweep.DEFAULT_REDUCTION):
+        """
+        Start a hyperparameter sweep of the current canvas. Every combination of the grid is trained, and losing
+        combinations are stopped early by successive halving.
+        :param grid: (dict{'string': list}) -> Values of each swept canvas property, or layer property written as
+                                               layers.<index>.<property>
+        :param reduction: (int) -> Factor the number of trials shrinks by from one round to the next
+        :return: (sweep.Sweep) -> The started sweep, or None if the canvas cannot be trained
+        """
+        if not self.__can_generate or not self.__can_train:
+            self.__log_status('Sweep error', 'error')
+            return None
+        if self.active_sweep is not None and not self.active_sweep.finished:
+            self.__log_status('A sweep is already running', 'error')
+            return None
+
+        try:
+            new_sweep = sweep.Sweep(self.__seeded_properties(), grid, self.scheduler, reduction)
+        except (IndexError, KeyError, ValueError) as error:
+            self.__log_status('Invalid sweep: {0}'.format(error), 'error')
+            return None
+
+        self.__log_status('\nStarting sweep of {0} configurations'.format(len(new_sweep.trials)), 'info')
+        self.active_sweep = new_sweep
+        self.active_sweep.start()
+        return self.active_sweep
+
+    def start_cross_validation(self, num_folds=cross_validation.DEFAULT_FOLDS):
+        """
+        Start a k-fold cross-validation of the current canvas. The folds are trained in parallel and the mean and
+        standard deviation of their accuracies are reported.
+        :param num_folds: (int) -> Number of folds
+        :return: (cross_validation.CrossValidation) -> The started cross-validation, or None if the canvas cannot be
+                                                       trained
+        """
+        if not self.__can_generate or not self.__can_train:
+            self.__log_status('Cross-validation error', 'error')
+            return None
+        if self.active_cross_validation is not None and not self.active_cross_validation.finished:
+            self.__log_status('A cross-validation is already running', 'error')
+            return None
+
+        try:
+            new_cross_validation = cross_validation.CrossValidation(self.__seeded_properties(), num_folds,
+                                                                    self.scheduler)
+        except (KeyError, ValueError) as error:
+            self.__log_status('Invalid cross-validation: {0}'.format(error), 'error')
+            return None
+
+        self.active_cross_validation = new_cross_validation
+        self.active_cross_validation.start()
+        return self.active_cross_validation
+
+    def __seeded_properties(self):
+        """
+        Copy the canvas properties with a random seed if they have none. The jobs of a sweep or cross-validation create
+        the shared train/test split or fold assignment themselves, reading the data file off the GUI thread, and with a
+        common seed every job that creates it creates the same one.
+        :return: (dict{'string': object}) -> Canvas properties with a seed
+        """
+        properties = dict(self.canvas_properties)
+        if properties.get('seed') is None:
+            properties['seed'] = random.randrange(2 ** 31)
+        return properties
 
     def terminate_training(self):
         """
-        Terminate the current training process if there is one running
+        Cancel every queued and running training job and any running sweep or cross-validation. Running jobs stop at
+        the end of their current batch; the training workers keep running.
         """
-        if self.__training_process.is_alive():
-            # Terminate process and create a new one
+        if self.active_sweep is not None and not self.active_sweep.finished:
+            self.active_sweep.cancel()
+        if self.active_cross_validation is not None and not self.active_cross_validation.finished:
+            self.active_cross_validation.cancel()
+        if self.scheduler.active:
             self.__log_status('Training canceled\n', 'debug')
-            self.__training_process.terminate()
-            self.__create_new_process()
+            self.scheduler.cancel()
 
-    def __create_new_process(self):
+    def check_pipe(self):
+        """
+        Checks the training workers for progress messages and starts queued jobs when workers are free.
+        :return: (string) -> Status text of the messages if any have been sent
+        """
+        messages = self.scheduler.poll()
+        if self.active_sweep is not None:
+            messages.extend(self.active_sweep.poll())
+        if self.active_cross_validation is not None:
+            messages.extend(self.active_cross_validation.poll())
+
+        # Workers write a batch's metrics before sending its message, so reading them after polling passes listeners
+        # the metrics of every batch before its message
+        if self.__metrics_listeners:
+            samples = self.scheduler.read_metrics()
+            if samples is not None and len(samples):
+                for listener in self.__metrics_listeners:
+                    listener(samples)
+
+        status = []
+        for message in messages:
+            self.message_latency.add(message)
+            for listener in self.__progress_listeners:
+                listener(message)
+            text = progress.format_message(message)
+            if text:
+                status.append(text)
+        if self.message_latency.count and not self.scheduler.active:
+            self.__log_status(self.message_latency.summary(), 'debug', suppress=True)
+            self.message_latency = progress.LatencyMeter()
+        if status:
+            return ''.join(status)
+
+    def wait_for_messages(self, timeout=None):
         """
-        Create a new training process to replace one that have already been used
+        Block until the training workers have a message for `check_pipe`, or the timeout passes. Safe to call from a
+        thread other than the one calling `check_pipe`.
+        :param timeout: (float) -> Maximum number of seconds to wait, or None to wait until a message arrives
+        :return: (boolean) -> True if a message is waiting
         """
-        self.__log_status('Creating new process', 'debug', suppress=True)
-        self.parent_conn, child_conn = multiprocessing.Pipe()
-        self.__training_process = ControlProcess(target=self.__train_network, args=(child_conn,))
+        return self.scheduler.wait(timeout)
 
-    def check_pipe(self):
+    def add_progress_listener(self, listener):
+        """
+        Pass every progress message from the training workers, including the batch and epoch metrics that are not shown
+        as status text, to a function as `check_pipe` collects them
+        :param listener: (function) -> Function passed each message, see `progress`
+        """
+        self.__progress_listeners.append(listener)
+
+    def add_metrics_listener(self, listener):
         """
-        Checks the pipe between the main process and the training process for any messages.
-        :return: (string) -> Status message if one has been sent
+        Pass the metrics of every training batch to a function as `check_pipe` reads them from the shared memory buffers
+        of the training workers. Unlike progress messages, batch metrics are not throttled.
+        :param listener: (function) -> Function passed a numpy record array of samples, see `ring_buffer.FIELDS`
         """
-        if self.parent_conn.poll():
-            try:
-                status = self.parent_conn.recv()
-                return status
-            except EOFError:
-                pass
+        self.__metrics_listeners.append(listener)
 
     def __log_status(self, msg, level='info', suppress=False):
         """
@@ -0,0 +1,150 @@
+import os
+import copy
+import logging
+
+import numpy as np
+import pandas as pd
+
+from backend import scheduler
+
+DEFAULT_FOLDS = 5
+RESULTS_SUFFIX = '_cv.csv'
+
+
+class CrossValidation(object):
+    """
+    K-fold cross-validation of a canvas. The rows of the dataset are assigned to `num_folds` folds once, and one job per
+    fold trains the network on the other folds and tests it on the held out fold, so every row is tested exactly once.
+    The mean and standard deviation of the fold accuracies, losses and other compiled metrics are a steadier measure of
+    a design than the metrics of one random split.
+
+    Folds are queued as jobs on the job scheduler, so they run on the training workers, each with its share of the
+    cores. The scheduler runs as many jobs at once as it has slots, by default one per `scheduler.MIN_THREADS_PER_JOB`
+    cores (see `scheduler.default_slots`), so on machines with fewer than twice that many cores the folds run one after
+    another. The parsed dataset is cached once and memory mapped by every worker, and each job only holds the row
+    indices of its fold. When every fold has finished, the fold metrics are written to `<canvas name>_cv.csv` in the
+    project directory.
+
+    Like the scheduler, the cross-validation is advanced by calling `poll`.
+
+    Attributes:
+        properties: (dict{'string': object}) -> Canvas properties of the validated design
+        num_folds: (int) -> Number of folds
+        jobs: (list[scheduler.Job]) -> Training job of each fold, once started
+        finished: (boolean) -> True once every fold has finished or the cross-validation was canceled
+        results_path: (string) -> Path to the fold results table
+        logger: (logging.Logger) -> Cross-validation logger
+    """
+
+    def __init__(self, properties, num_folds, job_scheduler):
+        """
+        :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+        :param num_folds: (int) -> Number of folds, at least 2
+        :param job_scheduler: (scheduler.JobScheduler) -> Scheduler the folds run on
+        """
+        if int(num_folds) < 2:
+            raise ValueError('Number of folds must be at least 2')
+        self.properties = copy.deepcopy(properties)
+        self.num_folds = int(num_folds)
+        self.jobs = []
+        self.finished = False
+        self.results_path = os.path.join(self.properties['project_directory'],
+                                         self.properties['canvas_name'] + RESULTS_SUFFIX)
+        self.logger = logging.getLogger('cross_validation')
+
+        self.__scheduler = job_scheduler
+        self.__messages = []
+
+    @property
+    def scores(self):
+        """
+        :return: (list[float]) -> Accuracy of each finished fold, None for folds that failed or have not finished
+        """
+        return [job.score if job.state == scheduler.DONE else None for job in self.jobs]
+
+    @property
+    def fold_metrics(self):
+        """
+        :return: (list[dict{'string': float}]) -> Test metrics of each finished fold, with its accuracy under
+                                                  'accuracy', None for folds that failed or have not finished
+        """
+        return [dict(job.metrics or {}, accuracy=job.score) if job.state == scheduler.DONE else None
+                for job in self.jobs]
+
+    @property
+    def metric_names(self):
+        """
+        :return: (list[string]) -> Names of the metrics reported by any fold, accuracy and loss first
+        """
+        names = set(name for metrics in self.fold_metrics if metrics for name in metrics)
+        return sorted(names, key=lambda name: ({'accuracy': 0, 'loss': 1}.get(name, 2), name))
+
+    def start(self):
+        """
+        Queue the job of every fold
+        """
+        num_slots = min(self.num_folds, self.__scheduler.num_slots)
+        self.__message('Cross-validating with {0} folds, {1} at a time'.format(self.num_folds, num_slots))
+        if num_slots == 1:
+            self.__message('Folds run one at a time with fewer than {0} cores, see scheduler.default_slots'.format(
+                2 * scheduler.MIN_THREADS_PER_JOB))
+        for fold in range(self.num_folds):
+            self.jobs.append(self.__scheduler.submit(self.fold_properties(fold), name='fold {0}'.format(fold + 1)))
+
+    def cancel(self):
+        """
+        Cancel the folds that have not finished
+        """
+        for job in self.jobs:
+            if job.active:
+                self.__scheduler.cancel(job.id)
+        self.finished = True
+
+    def poll(self):
+        """
+        Report the results once every fold has finished
+        :return: (list[string]) -> Status messages
+        """
+        if not self.finished and self.jobs and all(not job.active for job in self.jobs):
+            self.finished = True
+            self.write_results()
+            fold_metrics = [metrics for metrics in self.fold_metrics if metrics is not None]
+            if fold_metrics:
+                summary = []
+                for name in self.metric_names:
+                    values = [metrics[name] for metrics in fold_metrics if metrics.get(name) is not None]
+                    summary.append('{0} {1:.3f} +/- {2:.3f}'.format(name, np.mean(values), np.std(values)))
+                self.__message('Cross-validation finished: {0} over {1} of {2} folds'.format(
+                    ', '.join(summary), len(fold_metrics), self.num_folds))
+            else:
+                self.__message('Cross-validation failed: no fold finished')
+            self.__message('Cross-validation results saved to {0}'.format(self.results_path))
+
+        messages, self.__messages = self.__messages, []
+        return messages
+
+    def write_results(self):
+        """
+        Write the test metrics of each fold to the results table
+        """
+        rows = [dict(metrics or {}, fold=fold + 1) for fold, metrics in enumerate(self.fold_metrics)]
+        columns = ['fold'] + (self.metric_names or ['accuracy'])
+        temp_path = '{0}.{1}.tmp'.format(self.results_path, os.getpid())
+        pd.DataFrame(rows, columns=columns).to_csv(temp_path, index=False)
+        os.replace(temp_path, self.results_path)
+
+    def fold_properties(self, fold):
+        """
+        :param fold: (int) -> Fold held out for testing
+        :return: (dict{'string': object}) -> Canvas properties the job of the fold trains with
+        """
+        properties = copy.deepcopy(self.properties)
+        properties['canvas_name'] = '{0}_fold{1}'.format(self.properties['canvas_name'], fold + 1)
+        properties['split_name'] = self.properties.get('split_name', self.properties['canvas_name'])
+        properties['fold'] = fold
+        properties['num_folds'] = self.num_folds
+        return properties
+
+    def __message(self, message):
+        self.logger.info(message)
+        self.__messages.append(message + '\n')
@@ -0,0 +1,454 @@
+import os
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import numpy as np
+import numpy.lib.recfunctions as rfn
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CHUNK_SIZE = 10000
+
+FEATURE_DTYPES = ['auto', 'uint8', 'int8', 'uint16', 'int16', 'int32', 'float16', 'float32', 'float64']
+INTEGER_DTYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32, np.int64]
+
+DATA_EXTENSIONS = ['.csv', '.csv.zip', '.csv.gz', '.csv.bz2', '.csv.xz']
+DECOMPRESSORS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+def is_supported(data_path):
+    """
+    :param data_path: (string) -> Path to a data file
+    :return: (boolean) -> True if the file is a CSV file, optionally compressed
+    """
+    return data_path.lower().endswith(tuple(DATA_EXTENSIONS))
+
+
+def is_compressed(data_path):
+    """
+    :param data_path: (string) -> Path to a data file
+    :return: (boolean) -> True if the file has to be decompressed to be read
+    """
+    return not data_path.lower().endswith('.csv')
+
+
+def open_data(data_path):
+    """
+    Open a data file for reading. Compressed files are decompressed as they are read, so no decompressed copy is ever
+    written to disk. A zip archive is read from its first CSV member.
+    :param data_path: (string) -> Path to a CSV file, optionally compressed
+    :return: (file object) -> Binary file object, to be closed by the caller
+    """
+    extension = os.path.splitext(data_path)[1].lower()
+    if extension == '.zip':
+        with zipfile.ZipFile(data_path) as archive:
+            members = [name for name in archive.namelist()
+                       if name.lower().endswith('.csv') and not name.startswith('__MACOSX')]
+            if not members:
+                raise ValueError('No CSV file found in {0}'.format(data_path))
+            # The member keeps the archive's file open after the archive is closed
+            return archive.open(members[0])
+    elif extension in DECOMPRESSORS:
+        return DECOMPRESSORS[extension](data_path, 'rb')
+    return open(data_path, 'rb')
+
+
+def read_columns(data_path):
+    """
+    :param data_path: (string) -> Path to a CSV file, optionally compressed
+    :return: (list[string]) -> Column names from the header line
+    """
+    with open_data(data_path) as fd:
+        return list(pd.read_csv(fd, nrows=0).columns)
+
+
+def count_rows(data_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Count the data rows in a CSV file without loading it into memory
+    :param data_path: (string) -> Path to the CSV file
+    :param chunk_size: (int) -> Number of rows parsed at a time
+    :return: (int) -> Number of rows, excluding the header
+    """
+    num_rows = 0
+    with open_data(data_path) as fd:
+        for chunk in pd.read_csv(fd, chunksize=chunk_size, usecols=[0]):
+            num_rows += len(chunk)
+    return num_rows
+
+
+def narrowest_dtype(minimum, maximum, integral, float32_exact):
+    """
+    Find the smallest type that holds every value of a column without loss
+    :param minimum: (float) -> Smallest value in the column
+    :param maximum: (float) -> Largest value in the column
+    :param integral: (boolean) -> True if every value is a whole number
+    :param float32_exact: (boolean) -> True if every value is exactly representable as a float32
+    :return: (numpy.dtype) -> Narrowest safe type
+    """
+    if integral:
+        for dtype in INTEGER_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= minimum and maximum <= info.max:
+                return np.dtype(dtype)
+    if float32_exact:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def column_stats(values):
+    """
+    Summarize the columns of a block of rows for type inference
+    :param values: (numpy.ndarray) -> Block of rows
+    :return: (tuple(numpy.ndarray)) -> Per-column minimum, maximum, whether every value is whole and whether every value
+                                       is exactly representable as a float32
+    """
+    values = values.astype(np.float64)
+    return (np.fmin.reduce(values, axis=0),
+            np.fmax.reduce(values, axis=0),
+            np.all(values == np.round(values), axis=0),
+            np.all((values.astype(np.float32) == values) | np.isnan(values), axis=0))
+
+
+def merge_stats(stats, other):
+    """
+    Combine the column summaries of two blocks of rows
+    :param stats: (tuple(numpy.ndarray)) -> Summary returned by `column_stats`, or None
+    :param other: (tuple(numpy.ndarray)) -> Summary returned by `column_stats`
+    :return: (tuple(numpy.ndarray)) -> Summary of both blocks
+    """
+    if stats is None:
+        return other
+    return np.fmin(stats[0], other[0]), np.fmax(stats[1], other[1]), stats[2] & other[2], stats[3] & other[3]
+
+
+def stats_dtypes(stats, num_columns):
+    """
+    :param stats: (tuple(numpy.ndarray)) -> Summary of every row returned by `merge_stats`, or None if there are no rows
+    :param num_columns: (int) -> Number of columns
+    :return: (list[numpy.dtype]) -> Narrowest safe type of each column
+    """
+    if stats is None:
+        return [np.dtype(np.float64)] * num_columns
+    return [narrowest_dtype(*column) for column in zip(*stats)]
+
+
+def exact_columns(stats, dtype):
+    """
+    :param stats: (tuple(numpy.ndarray)) -> Summary of every row returned by `merge_stats`
+    :param dtype: (numpy.dtype) -> Floating point type
+    :return: (numpy.ndarray) -> Per-column True if every value is exactly representable in the type
+    """
+    dtype = np.dtype(dtype)
+    magnitude = np.fmax(np.abs(stats[0]), np.abs(stats[1]))
+    # Whole numbers are exact up to 2 ** (mantissa bits + 1)
+    exact = stats[2] & ~(magnitude > 2.0 ** (np.finfo(dtype).nmant + 1))
+    if dtype.itemsize >= np.dtype(np.float32).itemsize:
+        exact |= stats[3]
+    return exact | (dtype.itemsize >= np.dtype(np.float64).itemsize)
+
+
+def features_dtype(column_dtypes):
+    """
+    Type of a feature array that stores every column in its own type
+    :param column_dtypes: (list[numpy.dtype]) -> Type of each feature column
+    :return: (numpy.dtype) -> The type shared by every column, for a (rows, columns) matrix, or a packed record type
+                              with one field per column, named f0, f1, ..., for a (rows,) array
+    """
+    if len(set(column_dtypes)) <= 1:
+        return np.dtype(column_dtypes[0] if column_dtypes else np.float64)
+    return np.dtype([('f{0}'.format(i), dtype) for i, dtype in enumerate(column_dtypes)])
+
+
+def feature_shape(num_rows, dtype, num_columns):
+    """
+    :param num_rows: (int) -> Number of rows
+    :param dtype: (numpy.dtype) -> Type returned by `features_dtype`
+    :param num_columns: (int) -> Number of feature columns
+    :return: (tuple(int)) -> Shape of the feature array
+    """
+    return (num_rows,) if dtype.names else (num_rows, num_columns)
+
+
+def num_feature_columns(features):
+    """
+    :param features: (numpy.ndarray) -> Feature matrix, or record array with one field per column
+    :return: (int) -> Number of feature columns
+    """
+    return len(features.dtype.names) if features.dtype.names else features.shape[1]
+
+
+def write_features(features, offset, values):
+    """
+    Store rows of parsed values, converting each column to its type
+    :param features: (numpy.ndarray) -> Feature array shaped by `feature_shape`
+    :param offset: (int) -> First row written
+    :param values: (numpy.ndarray) -> Parsed feature values, one column per feature
+    """
+    if features.dtype.names:
+        values = rfn.unstructured_to_structured(np.ascontiguousarray(values), dtype=features.dtype)
+    features[offset:offset + len(values)] = values
+
+
+def to_float32(features):
+    """
+    :param features: (numpy.ndarray) -> Rows of a feature matrix, or of a record array with one field per column
+    :return: (numpy.ndarray) -> float32 matrix of the features
+    """
+    if features.dtype.names:
+        return rfn.structured_to_unstructured(features, dtype=np.float32)
+    return features.astype(np.float32)
+
+
+def scan_stats(data_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Count the rows of a CSV file and summarize its columns for type inference in a single pass
+    :param data_path: (string) -> Path to the CSV file
+    :param chunk_size: (int) -> Number of rows parsed at a time
+    :return: (int, tuple(numpy.ndarray)) -> Number of rows, excluding the header, and the summary returned by
+                                            `merge_stats`, or None if there are no rows
+    """
+    num_rows = 0
+    stats = None
+    with open_data(data_path) as fd:
+        for chunk in pd.read_csv(fd, chunksize=chunk_size):
+            num_rows += len(chunk)
+            stats = merge_stats(stats, column_stats(chunk.values))
+    return num_rows, stats
+
+
+def scan_dtypes(data_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Count the rows of a CSV file and infer the narrowest safe type of every column in a single pass
+    :param data_path: (string) -> Path to the CSV file
+    :param chunk_size: (int) -> Number of rows parsed at a time
+    :return: (int, list[numpy.dtype]) -> Number of rows, excluding the header, and the type of each column
+    """
+    num_rows, stats = scan_stats(data_path, chunk_size)
+    return num_rows, stats_dtypes(stats, len(read_columns(data_path)))
+
+
+def split_indices(num_rows, training_size, seed=None):
+    """
+    Randomly assign each row of a dataset to the training or test set
+    :param num_rows: (int) -> Number of rows in the dataset
+    :param training_size: (float) -> Proportion of rows used for training
+    :param seed: (int) -> Optional random seed
+    :return: (numpy.ndarray, numpy.ndarray) -> Shuffled training and test row indices
+    """
+    num_train = int(np.floor(num_rows * float(training_size)))
+    indices = np.random.RandomState(seed).permutation(num_rows)
+    return indices[:num_train], indices[num_train:]
+
+
+def load_split(split_path, num_rows, training_size, seed=None):
+    """
+    Load the train/test split saved for a project, or create and save a new one if there is none or it was made for a
+    different number of rows or training size
+    :param split_path: (string) -> Path to the `.npz` file holding the split
+    :param num_rows: (int) -> Number of rows in the dataset
+    :param training_size: (float) -> Proportion of rows used for training
+    :param seed: (int) -> Optional random seed used when creating a new split
+    :return: (numpy.ndarray, numpy.ndarray) -> Training and test row indices
+    """
+    if os.path.isfile(split_path):
+        with np.load(split_path) as split:
+            if int(split['num_rows']) == num_rows and float(split['training_size']) == float(training_size):
+                return split['train'], split['test']
+
+    train, test = split_indices(num_rows, training_size, seed)
+    temp_path = '{0}.{1}.tmp'.format(split_path, os.getpid())
+    with open(temp_path, 'wb') as fd:
+        np.savez(fd, train=train, test=test, num_rows=num_rows, training_size=float(training_size))
+    os.replace(temp_path, split_path)
+    return train, test
+
+
+def fold_assignment(num_rows, num_folds, seed=None):
+    """
+    Randomly assign each row of a dataset to one of `num_folds` folds of nearly equal size
+    :param num_rows: (int) -> Number of rows in the dataset
+    :param num_folds: (int) -> Number of folds, at least 2
+    :param seed: (int) -> Optional random seed
+    :return: (numpy.ndarray) -> Fold of each row
+    """
+    if not 2 <= num_folds <= num_rows:
+        raise ValueError('Number of folds must be between 2 and the number of rows ({0})'.format(num_rows))
+    assignment = np.empty(num_rows, dtype=np.int32)
+    assignment[np.random.RandomState(seed).permutation(num_rows)] = np.arange(num_rows) % num_folds
+    return assignment
+
+
+def load_folds(folds_path, num_rows, num_folds, seed=None):
+    """
+    Load the fold assignment saved for a project, or create and save a new one if there is none or it was made for a
+    different number of rows or folds. Creating the assignment once lets every fold's job train on the same folds.
+    :param folds_path: (string) -> Path to the `.npz` file holding the fold assignment
+    :param num_rows: (int) -> Number of rows in the dataset
+    :param num_folds: (int) -> Number of folds
+    :param seed: (int) -> Optional random seed used when creating a new assignment
+    :return: (numpy.ndarray) -> Fold of each row
+    """
+    if os.path.isfile(folds_path):
+        with np.load(folds_path) as folds:
+            if len(folds['assignment']) == num_rows and int(folds['num_folds']) == num_folds:
+                return folds['assignment']
+
+    assignment = fold_assignment(num_rows, num_folds, seed)
+    temp_path = '{0}.{1}.tmp'.format(folds_path, os.getpid())
+    with open(temp_path, 'wb') as fd:
+        np.savez(fd, assignment=assignment, num_folds=num_folds)
+    os.replace(temp_path, folds_path)
+    return assignment
+
+
+def fold_rows(assignment, fold):
+    """
+    :param assignment: (numpy.ndarray) -> Fold of each row, see `fold_assignment`
+    :param fold: (int) -> Fold held out for testing
+    :return: (numpy.ndarray, numpy.ndarray) -> Training and test row indices
+    """
+    return np.flatnonzero(assignment != fold), np.flatnonzero(assignment == fold)
+
+
+def indices_mask(indices, num_rows):
+    """
+    :param indices: (numpy.ndarray) -> Row indices
+    :param num_rows: (int) -> Number of rows in the dataset
+    :return: (numpy.ndarray) -> Boolean mask, True for the given rows
+    """
+    mask = np.zeros(num_rows, dtype=bool)
+    mask[indices] = True
+    return mask
+
+
+class ArrayBatchStream(object):
+    """
+    Streams (features, labels) batches for Keras `fit_generator` from a subset of the rows of a feature matrix. The
+    subset is a list of row indices, so the training and test sets share one underlying array or memmap and each batch
+    is gathered only when it is requested. Features are converted to float32 one batch at a time. Iteration never ends;
+    one epoch is `len(stream)` batches and the rows are reshuffled between epochs.
+
+    Attributes:
+        features: (numpy.ndarray) -> Feature matrix of the whole dataset, or record array with one field per column
+        labels: (numpy.ndarray) -> Label vector of the whole dataset
+        indices: (numpy.ndarray) -> Rows that belong to this stream
+        batch_size: (int) -> Number of rows per batch
+        shuffle: (boolean) -> Shuffle the rows between epochs
+    """
+
+    def __init__(self, features, labels, indices, batch_size=DEFAULT_BATCH_SIZE, shuffle=True):
+        self.features = features
+        self.labels = labels
+        self.indices = np.array(indices)
+        self.batch_size = int(batch_size)
+        self.shuffle = shuffle
+
+        self.__batch = 0
+        if self.shuffle:
+            np.random.shuffle(self.indices)
+
+    def __len__(self):
+        """
+        :return: (int) -> Number of batches in one epoch
+        """
+        return int(np.ceil(len(self.indices) / float(self.batch_size)))
+
+    def __getitem__(self, index):
+        """
+        Gather one batch. Rows are read in ascending order, which keeps memmap reads sequential.
+        :param index: (int) -> Batch number within the epoch
+        :return: (numpy.ndarray, numpy.ndarray) -> Features and labels of the batch
+        """
+        rows = np.sort(self.indices[index * self.batch_size:(index + 1) * self.batch_size])
+        return to_float32(self.features[rows]), self.labels[rows]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        batch = self[self.__batch]
+        self.__batch += 1
+        if self.__batch == len(self):
+            self.__batch = 0
+            self.on_epoch_end()
+        return batch
+
+    def on_epoch_end(self):
+        """
+        Reshuffle the rows between epochs
+        """
+        if self.shuffle:
+            np.random.shuffle(self.indices)
+
+
+class CsvBatchStream(object):
+    """
+    Streams (features, labels) batches from a CSV file for Keras `fit_generator`. The file is read, and decompressed if
+    needed, in bounded chunks so peak memory is proportional to the chunk and batch size, not the size of the dataset.
+    Iteration never ends; one epoch is `len(stream)` batches.
+
+    Attributes:
+        data_path: (string) -> Path to the CSV file, optionally compressed, labels in the first column
+        mask: (numpy.ndarray) -> Boolean mask selecting the rows that belong to this stream
+        batch_size: (int) -> Number of rows per batch
+        chunk_size: (int) -> Number of rows read from the file at a time
+        shuffle: (boolean) -> Shuffle rows within each chunk
+        num_samples: (int) -> Number of rows selected by the mask
+    """
+
+    def __init__(self, data_path, mask, batch_size=DEFAULT_BATCH_SIZE, chunk_size=DEFAULT_CHUNK_SIZE, shuffle=True):
+        self.data_path = data_path
+        self.mask = mask
+        self.batch_size = int(batch_size)
+        self.chunk_size = int(chunk_size)
+        self.shuffle = shuffle
+        self.num_samples = int(np.count_nonzero(mask))
+
+        self.__batches = self.__generate()
+
+    def __len__(self):
+        """
+        :return: (int) -> Number of batches in one epoch
+        """
+        return int(np.ceil(self.num_samples / float(self.batch_size)))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.__batches)
+
+    def __generate(self):
+        while True:
+            for batch in self.epoch():
+                yield batch
+
+    def epoch(self):
+        """
+        Read through the file once
+        :return: (generator) -> Yields (features, labels) tuples
+        """
+        pending = None
+        offset = 0
+        with open_data(self.data_path) as fd:
+            for chunk in pd.read_csv(fd, chunksize=self.chunk_size):
+                values = chunk.values
+                selected = values[self.mask[offset:offset + len(values)]]
+                offset += len(values)
+
+                if self.shuffle:
+                    np.random.shuffle(selected)
+                pending = selected if pending is None else np.concatenate((pending, selected))
+
+                while len(pending) >= self.batch_size:
+                    yield pending[:self.batch_size, 1:].astype(np.float32), pending[:self.batch_size, 0]
+                    pending = pending[self.batch_size:]
+
+        if pending is not None and len(pending):
+            yield pending[:, 1:].astype(np.float32), pending[:, 0]
@@ -0,0 +1,101 @@
+import numpy as np
+
+DEFAULT_BUCKETS = 1024
+
+
+class MinMaxSeries(object):
+    """
+    Streaming min/max decimation of a series of values, such as the loss of every training batch. Values are summarized
+    in at most `capacity` buckets of `width` consecutive values, each keeping the minimum, maximum and mean of its
+    values. When the buckets are full, neighbouring buckets are merged and the width doubles, so memory and the cost of
+    drawing the series stay constant however many values are added, while every spike still shows in the minimum or
+    maximum of its bucket.
+
+    Values are numbered in the order they were added, from 0. NaN values are skipped but keep their number.
+
+    Attributes:
+        capacity: (int) -> Maximum number of buckets, even
+        width: (int) -> Number of values summarized in each bucket
+        count: (int) -> Number of values added
+    """
+
+    def __init__(self, capacity=DEFAULT_BUCKETS):
+        """
+        :param capacity: (int) -> Maximum number of buckets, rounded up to an even number
+        """
+        self.capacity = int(capacity) + int(capacity) % 2
+        self.width = 1
+        self.count = 0
+        self.__mins = np.full(self.capacity, np.inf)
+        self.__maxs = np.full(self.capacity, -np.inf)
+        self.__sums = np.zeros(self.capacity)
+        self.__sizes = np.zeros(self.capacity, dtype=np.int64)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.__sizes))
+
+    def add(self, values):
+        """
+        :param values: (float or numpy.ndarray) -> Values to append to the series
+        """
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        while len(values):
+            room = self.capacity * self.width - self.count
+            if room <= 0:
+                self.__merge()
+                continue
+            chunk, values = values[:room], values[room:]
+            numbers = self.count + np.arange(len(chunk))
+            self.count += len(chunk)
+            keep = ~np.isnan(chunk)
+            chunk, numbers = chunk[keep], numbers[keep]
+            if not len(chunk):
+                continue
+
+            buckets = numbers // self.width
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            used = buckets[starts]
+            self.__mins[used] = np.minimum(self.__mins[used], np.minimum.reduceat(chunk, starts))
+            self.__maxs[used] = np.maximum(self.__maxs[used], np.maximum.reduceat(chunk, starts))
+            self.__sums[used] += np.add.reduceat(chunk, starts)
+            self.__sizes[used] += np.diff(np.r_[starts, len(chunk)])
+
+    def buckets(self):
+        """
+        :return: (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray) -> Position of the middle of every bucket
+                                                                                  holding a value, in value numbers, and
+                                                                                  the minimum, maximum and mean of its
+                                                                                  values
+        """
+        used = np.flatnonzero(self.__sizes)
+        positions = (used + 0.5) * self.width - 0.5
+        return positions, self.__mins[used], self.__maxs[used], self.__sums[used] / self.__sizes[used]
+
+    def clear(self):
+        """
+        Remove every value
+        """
+        self.width = 1
+        self.count = 0
+        self.__reset(0)
+
+    def __merge(self):
+        """
+        Merge each pair of neighbouring buckets, halving the number of buckets used
+        """
+        half = self.capacity // 2
+        self.__mins[:half] = np.minimum(self.__mins[0::2], self.__mins[1::2])
+        self.__maxs[:half] = np.maximum(self.__maxs[0::2], self.__maxs[1::2])
+        self.__sums[:half] = self.__sums[0::2] + self.__sums[1::2]
+        self.__sizes[:half] = self.__sizes[0::2] + self.__sizes[1::2]
+        self.__reset(half)
+        self.width *= 2
+
+    def __reset(self, start):
+        """
+        Empty the buckets from `start` on
+        """
+        self.__mins[start:] = np.inf
+        self.__maxs[start:] = -np.inf
+        self.__sums[start:] = 0.0
+        self.__sizes[start:] = 0
@@ -12,12 +12,20 @@ class GenericLayer(ABC):
 
     Adding a new layer:
         1. Create a new layer class that inherits from GenericLayer
-        2. Import the class into `control.py` and add it to the `LAYER_TYPES` dict
+        2. Add the class to the `LAYER_TYPES` dict at the bottom of this file
         3. Add the available properties that can be set in the GUI
     """
     def __init__(self, properties):
         self.layer_properties = properties
 
+    @abstractmethod
+    def build(self):
+        """
+        Creates the Keras layer. Keras is imported here so that the layers can be used without it.
+        :return: (keras.layers.Layer) -> The layer
+        """
+        pass
+
     @abstractmethod
     def write_lines(self, fd):
         """
@@ -38,6 +46,10 @@ class InputLayer(GenericLayer):
     def __init__(self, properties):
         super(InputLayer, self).__init__(properties)
 
+    def build(self):
+        from keras import layers
+        return layers.InputLayer(input_shape=(int(self.layer_properties['dimensions']),))
+
     def write_lines(self, fd):
         line = '\t\tInputLayer(input_shape=({0},)),\n'.format(self.layer_properties['dimensions'])
         fd.write(line)
@@ -53,6 +65,10 @@ class DenseLayer(GenericLayer):
     def __init__(self, properties):
         super(DenseLayer, self).__init__(properties)
 
+    def build(self):
+        from keras import layers
+        return layers.Dense(int(self.layer_properties['size']), activation=self.layer_properties['activation'])
+
     def write_lines(self, fd):
         line = '\t\tDense({0}, activation=\'{1}\'),\n'.format(self.layer_properties['size'],
                                                               self.layer_properties['activation'])
@@ -68,6 +84,26 @@ class DropoutLayer(GenericLayer):
     def __init__(self, properties):
         super(DropoutLayer, self).__init__(properties)
 
+    def build(self):
+        from keras import layers
+        return layers.Dropout(float(self.layer_properties['percentage']))
+
     def write_lines(self, fd):
         line = '\t\tDropout({0}),\n'.format(self.layer_properties['percentage'])
         fd.write(line)
+
+LAYER_TYPES = {
+    'input': InputLayer,
+    'hidden': DenseLayer,
+    'dropout': DropoutLayer,
+    'output': DenseLayer,
+}
+
+
+def create_layers(layer_properties):
+    """
+    :param layer_properties: (list[dict{'string': object}]) -> Properties of each canvas slot
+    :return: (list[GenericLayer]) -> Layers of the network, skipping empty slots
+    """
+    return [LAYER_TYPES[properties['type']](properties) for properties in layer_properties
+            if properties['type'] in LAYER_TYPES]
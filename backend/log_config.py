@@ -0,0 +1,139 @@
+import os
+import gzip
+import atexit
+import shutil
+import logging
+import logging.handlers
+import multiprocessing
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+LOG_FILE = 'neuromatic.log'
+LOG_FORMAT = '[%(asctime)s][%(processName)-12s][%(name)-12s][%(levelname)-8s] %(message)s'
+DATE_FORMAT = '%H%M%S'
+
+DEFAULT_LEVEL = logging.DEBUG
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+_queue = None
+_listener = None
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating log file handler that compresses the rotated files with gzip, as `<file>.1.gz` to `<file>.<count>.gz`.
+    """
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        """
+        :param filename: (string) -> Path to the log file
+        :param max_bytes: (int) -> Size at which the log file is rotated
+        :param backup_count: (int) -> Number of rotated files kept
+        """
+        super(CompressingRotatingFileHandler, self).__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                                                             encoding='utf-8', delay=True)
+        self.namer = lambda name: name + '.gz'
+        self.rotator = self.__compress
+
+    @staticmethod
+    def __compress(source, destination):
+        with open(source, 'rb') as source_file, gzip.open(destination, 'wb') as destination_file:
+            shutil.copyfileobj(source_file, destination_file)
+        os.remove(source)
+
+
+def parse_level(level):
+    """
+    :param level: (int or string) -> Logging level, such as logging.INFO or 'info'
+    :return: (int) -> Logging level
+    """
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError('Unknown log level: {0}'.format(level))
+    return value
+
+
+def configure(level=DEFAULT_LEVEL, log_dir=LOG_DIR, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT,
+              console_level=None):
+    """
+    Send the log records of this process, and of the training workers started after this call, through a queue to a
+    listener thread that writes them to a rotating log file, so no process waits on the disk to log. Called once by the
+    application entry point; later calls replace the previous configuration.
+    :param level: (int or string) -> Lowest level logged
+    :param log_dir: (string) -> Directory of the log file
+    :param max_bytes: (int) -> Size at which the log file is rotated and compressed
+    :param backup_count: (int) -> Number of rotated log files kept
+    :param console_level: (int or string) -> Lowest level also printed to the console, or None to not print
+    """
+    global _queue, _listener
+    shutdown()
+    os.makedirs(log_dir, exist_ok=True)
+    level = parse_level(level)
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+
+    handlers = [CompressingRotatingFileHandler(os.path.join(log_dir, LOG_FILE), max_bytes, backup_count)]
+    if console_level is not None:
+        console = logging.StreamHandler()
+        console.setLevel(parse_level(console_level))
+        handlers.append(console)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # A process queue, so the training workers can log to the same listener
+    _queue = multiprocessing.Queue()
+    _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    configure_worker(_queue, level)
+    atexit.unregister(shutdown)
+    atexit.register(shutdown)
+
+
+def configure_worker(queue, level=DEFAULT_LEVEL):
+    """
+    Send the log records of this process to the listener of the application, see `configure`. Called by processes
+    started by the application, such as the training workers.
+    :param queue: (multiprocessing.Queue) -> Queue returned by `log_queue` in the application process
+    :param level: (int or string) -> Lowest level logged
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(queue))
+    root.setLevel(parse_level(level))
+
+
+def log_queue():
+    """
+    :return: (multiprocessing.Queue) -> Queue the log records of every process are sent through, or None if logging
+                                        is not configured
+    """
+    return _queue
+
+
+def set_level(level, name=None):
+    """
+    Change the lowest level logged. Training workers keep the level they were started with.
+    :param level: (int or string) -> Lowest level logged
+    :param name: (string) -> Logger to change, such as 'scheduler', or None for every logger
+    """
+    logging.getLogger(name).setLevel(parse_level(level))
+
+
+def shutdown():
+    """
+    Write the queued log records and stop the listener
+    """
+    global _queue, _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is _queue:
+            root.removeHandler(handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _queue.close()
+    _queue = _listener = None
@@ -0,0 +1,171 @@
+import io
+import os
+import shutil
+import tempfile
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from backend import dataset
+
+DEFAULT_RANGE_SIZE = 64 * 1024 ** 2
+
+
+def split_ranges(data_path, num_ranges):
+    """
+    Split the data rows of a CSV file into byte ranges that start and end on line boundaries
+    :param data_path: (string) -> Path to the CSV file
+    :param num_ranges: (int) -> Target number of ranges
+    :return: (list[tuple(int, int)]) -> Start and end offset of each range, excluding the header line
+    """
+    size = os.path.getsize(data_path)
+    with open(data_path, 'rb') as fd:
+        fd.readline()
+        start = fd.tell()
+
+        boundaries = [start]
+        for index in range(1, num_ranges):
+            fd.seek(start + (size - start) * index // num_ranges)
+            fd.readline()
+            if boundaries[-1] < fd.tell() < size:
+                boundaries.append(fd.tell())
+        boundaries.append(size)
+
+    return [(begin, end) for begin, end in zip(boundaries[:-1], boundaries[1:]) if end > begin]
+
+
+def _parse_range(data_path, start, end):
+    """
+    Parse the rows in a byte range of a CSV file
+    :param data_path: (string) -> Path to the CSV file
+    :param start: (int) -> Offset of the first byte of the range
+    :param end: (int) -> Offset one past the last byte of the range
+    :return: (numpy.ndarray) -> Parsed rows
+    """
+    with open(data_path, 'rb') as fd:
+        fd.seek(start)
+        data = fd.read(end - start)
+    try:
+        return pd.read_csv(io.BytesIO(data), header=None).values
+    except pd.errors.EmptyDataError:
+        # Range only holds blank lines
+        return np.empty((0, 0))
+
+
+def _scan_range(task):
+    data_path, start, end, range_path = task
+    values = _parse_range(data_path, start, end)
+    if not len(values):
+        return 0, None
+    np.save(range_path, values)
+    return len(values), dataset.column_stats(values)
+
+
+def _read_range(task):
+    range_path, offset, features_path, labels_path = task
+    values = np.load(range_path, mmap_mode='r')
+
+    features = np.load(features_path, mmap_mode='r+')
+    labels = np.load(labels_path, mmap_mode='r+')
+    dataset.write_features(features, offset, values[:, 1:])
+    labels[offset:offset + len(values)] = values[:, 0]
+    features.flush()
+    labels.flush()
+    del values
+    os.remove(range_path)
+
+
+class ParallelCsvReader(object):
+    """
+    Parses a numeric CSV file on several cores. The file is split at line boundaries into byte ranges, and a process
+    pool parses each range once, into a temporary `.npy` file, then copies it into its rows of a preallocated `.npy`
+    memmap, so the parsed data is never sent between processes. The result is identical to parsing the file with
+    `pd.read_csv`.
+
+    Reading takes two steps: `scan` parses every range, counting its rows and summarizing its columns, which fixes the
+    shape, type and row offsets of the output arrays, then `read_into` fills them from the parsed ranges. `close`
+    removes the parsed ranges if `read_into` is not called.
+
+    Attributes:
+        data_path: (string) -> Path to the CSV file, labels in the first column
+        num_workers: (int) -> Number of parsing processes
+        columns: (list[string]) -> Column names from the header line
+        ranges: (list[tuple(int, int)]) -> Byte range of each parsing task
+        range_rows: (list[int]) -> Number of rows in each range, set by `scan`
+        stats: (tuple(numpy.ndarray)) -> Summary of the columns returned by `dataset.merge_stats`, set by `scan`
+        temp_dir: (string) -> Directory the parsed ranges are written to, or None for the system temporary directory
+    """
+
+    def __init__(self, data_path, num_workers=None, range_size=DEFAULT_RANGE_SIZE, temp_dir=None):
+        self.data_path = data_path
+        self.num_workers = num_workers or os.cpu_count()
+        self.columns = dataset.read_columns(data_path)
+        self.temp_dir = temp_dir
+
+        # Use more ranges than workers so a range, not a worker's share of the file, bounds each process's memory
+        num_ranges = max(self.num_workers, int(np.ceil(os.path.getsize(data_path) / float(range_size))))
+        self.ranges = split_ranges(data_path, num_ranges)
+        self.range_rows = None
+        self.stats = None
+        self.__range_dir = None
+
+    def scan(self):
+        """
+        Parse every range, counting the rows and inferring the narrowest safe type of every column
+        :return: (int, list[numpy.dtype]) -> Number of rows, excluding the header, and the type of each column
+        """
+        self.close()
+        self.__range_dir = tempfile.mkdtemp(prefix='ranges.', suffix='.tmp', dir=self.temp_dir)
+        results = self.__map(_scan_range, [(self.data_path, start, end, self.__range_path(index))
+                                           for index, (start, end) in enumerate(self.ranges)])
+
+        self.range_rows = [num_rows for num_rows, _ in results]
+        self.stats = None
+        for _, range_stats in results:
+            if range_stats is not None:
+                self.stats = dataset.merge_stats(self.stats, range_stats)
+        return sum(self.range_rows), dataset.stats_dtypes(self.stats, len(self.columns))
+
+    def read_into(self, features_path, labels_path):
+        """
+        Copy the parsed file into preallocated arrays, then remove the parsed ranges
+        :param features_path: (string) -> Path to a `.npy` file shaped by `dataset.feature_shape` for the features
+        :param labels_path: (string) -> Path to a `.npy` file shaped (rows,) for the labels
+        """
+        if self.__range_dir is None:
+            self.scan()
+
+        offsets = np.cumsum([0] + self.range_rows[:-1])
+        tasks = [(self.__range_path(index), int(offset), features_path, labels_path)
+                 for index, (offset, num_rows) in enumerate(zip(offsets, self.range_rows)) if num_rows]
+        try:
+            self.__map(_read_range, tasks)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Remove the parsed ranges
+        """
+        if self.__range_dir is not None:
+            shutil.rmtree(self.__range_dir, ignore_errors=True)
+            self.__range_dir = None
+
+    def __range_path(self, index):
+        return os.path.join(self.__range_dir, '{0}.npy'.format(index))
+
+    def __map(self, function, tasks):
+        """
+        Run parsing tasks in the process pool, or in this process when there is only one
+        """
+        if self.num_workers > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(min(self.num_workers, len(tasks)))
+            try:
+                results = pool.map(function, tasks, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [function(task) for task in tasks]
+        return results
@@ -0,0 +1,169 @@
+import time
+import queue
+import threading
+
+DEFAULT_DEPTH = 4
+DEFAULT_WORKERS = 1
+
+
+class StreamStopped(Exception):
+    pass
+
+
+class PrefetchStream(object):
+    """
+    Prepares batches ahead of the training loop. Background threads gather and convert batches from a batch stream
+    into a bounded queue, so reading the next batch from disk overlaps with training on the current one. Numpy and the
+    pandas parser release the GIL for most of their work, so threads are enough to overlap it.
+
+    Indexable streams, such as `dataset.ArrayBatchStream`, are gathered by any number of workers. Batches within an
+    epoch may then arrive in a different order than the stream's index order, but the set of batches is unchanged.
+    Other streams, such as `dataset.CsvBatchStream`, are read in order by a single worker.
+
+    Reading from a stopped stream, or one whose cancel event is set, raises `StreamStopped`, so training can be aborted
+    at the next batch.
+
+    The stall and first batch times are measured in the thread that reads the stream. They describe the training loop
+    when Keras reads the stream on the training thread, with `workers=0`; Keras' own enqueuer thread would otherwise
+    read ahead of training and hide the waits.
+
+    Attributes:
+        stream: (object) -> Batch stream
+        indexable: (boolean) -> True if the stream supports indexing and `on_epoch_end`
+        depth: (int) -> Maximum number of batches waiting in the queue
+        num_workers: (int) -> Number of background threads
+        stall_time: (float) -> Total seconds the consumer waited for a batch
+        batches: (int) -> Number of batches consumed
+        first_batch_time: (float) -> Time the first batch was consumed, or None
+        cancel: (threading.Event) -> Optional event that stops the stream when set
+    """
+
+    def __init__(self, stream, depth=DEFAULT_DEPTH, num_workers=DEFAULT_WORKERS, cancel=None):
+        self.stream = stream
+        self.cancel = cancel
+        self.depth = max(1, int(depth))
+        self.indexable = hasattr(stream, '__getitem__')
+        self.num_workers = max(1, int(num_workers)) if self.indexable else 1
+        self.stall_time = 0.0
+        self.batches = 0
+        self.first_batch_time = None
+
+        self.__queue = queue.Queue(maxsize=self.depth)
+        self.__lock = threading.Lock()
+        self.__next_index = 0
+        self.__epoch_done = threading.Condition(self.__lock)
+        self.__finished = 0
+        self.__stopped = threading.Event()
+        self.__threads = []
+
+    def __len__(self):
+        """
+        :return: (int) -> Number of batches in one epoch
+        """
+        return len(self.stream)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.__threads:
+            self.start()
+
+        start_time = time.time()
+        while True:
+            if self.__stopped.is_set() or (self.cancel is not None and self.cancel.is_set()):
+                raise StreamStopped('Batch stream stopped')
+            try:
+                batch = self.__queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        self.stall_time += time.time() - start_time
+        self.batches += 1
+        if self.first_batch_time is None:
+            self.first_batch_time = time.time()
+
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    def start(self):
+        """
+        Start the background threads
+        """
+        for _ in range(self.num_workers):
+            thread = threading.Thread(target=self.__work)
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+    def stop(self):
+        """
+        Stop the background threads. Batches already in the queue are discarded.
+        """
+        self.__stopped.set()
+        with self.__lock:
+            self.__epoch_done.notify_all()
+        while not self.__queue.empty():
+            self.__queue.get_nowait()
+
+    @property
+    def mean_stall(self):
+        """
+        :return: (float) -> Average seconds the consumer waited per batch
+        """
+        return self.stall_time / self.batches if self.batches else 0.0
+
+    def __claim(self):
+        """
+        Take the next batch index. Once every batch of an epoch has been claimed, workers wait until all of them have
+        been queued before the stream is reshuffled for the next epoch.
+        :return: (int) -> Batch index, or None if the stream was stopped
+        """
+        with self.__lock:
+            while self.__next_index >= len(self.stream) and not self.__stopped.is_set():
+                self.__epoch_done.wait()
+            if self.__stopped.is_set():
+                return None
+            index = self.__next_index
+            self.__next_index += 1
+            return index
+
+    def __release(self):
+        """
+        Mark a claimed batch as queued and start the next epoch after the last one
+        """
+        with self.__lock:
+            self.__finished += 1
+            if self.__finished == len(self.stream):
+                self.stream.on_epoch_end()
+                self.__finished = 0
+                self.__next_index = 0
+                self.__epoch_done.notify_all()
+
+    def __work(self):
+        while not self.__stopped.is_set():
+            if self.indexable:
+                index = self.__claim()
+                if index is None:
+                    return
+                try:
+                    batch = self.stream[index]
+                except Exception as error:
+                    batch = error
+            else:
+                try:
+                    batch = next(self.stream)
+                except Exception as error:
+                    batch = error
+
+            while not self.__stopped.is_set():
+                try:
+                    self.__queue.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+            # Only queued batches count towards the epoch, so no batch of the next epoch is queued before this one
+            if self.indexable:
+                self.__release()
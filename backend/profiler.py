@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from backend import dataset
+
+MAX_LABELS = 10000
+
+
+class DatasetProfile(object):
+    """
+    Summary statistics of a dataset, used to check a network design against the data before training.
+
+    Attributes:
+        num_rows: (int) -> Number of data rows
+        columns: (list[string]) -> Column names, labels first
+        minimum: (numpy.ndarray) -> Per-column minimum, ignoring NaNs
+        maximum: (numpy.ndarray) -> Per-column maximum, ignoring NaNs
+        mean: (numpy.ndarray) -> Per-column mean, ignoring NaNs
+        std: (numpy.ndarray) -> Per-column population standard deviation, ignoring NaNs
+        nan_counts: (numpy.ndarray) -> Per-column number of NaNs
+        labels: (list[float]) -> Sorted distinct label values, or None if there are more than `MAX_LABELS`
+        labels_integral: (boolean) -> True if every label is a whole number, or None if unknown
+    """
+
+    def __init__(self, num_rows, columns, minimum, maximum, mean, std, nan_counts, labels, labels_integral=None):
+        self.num_rows = num_rows
+        self.columns = columns
+        self.minimum = np.asarray(minimum, dtype=np.float64)
+        self.maximum = np.asarray(maximum, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.nan_counts = np.asarray(nan_counts, dtype=np.int64)
+        self.labels = labels
+        if labels_integral is None and labels is not None:
+            # Profiles cached before integrality was recorded
+            labels_integral = all(label == int(label) for label in labels)
+        self.labels_integral = labels_integral
+
+    @property
+    def num_features(self):
+        return len(self.columns) - 1
+
+    @property
+    def label_cardinality(self):
+        """
+        :return: (int) -> Number of distinct labels, or None if there are too many to count
+        """
+        return None if self.labels is None else len(self.labels)
+
+    def to_dict(self):
+        return {
+            'num_rows': self.num_rows,
+            'columns': self.columns,
+            'minimum': self.minimum.tolist(),
+            'maximum': self.maximum.tolist(),
+            'mean': self.mean.tolist(),
+            'std': self.std.tolist(),
+            'nan_counts': self.nan_counts.tolist(),
+            'labels': self.labels,
+            'labels_integral': self.labels_integral,
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**values)
+
+    def check_design(self, input_dimensions, output_size):
+        """
+        Check that a network design fits the data. The generated network one-hot encodes or indexes the output layer
+        with the labels, so labels must be whole numbers from 0 to the output size - 1. Only the range and integrality
+        of the labels are checked, so any number of distinct labels can be checked.
+        :param input_dimensions: (int) -> Input layer dimensions
+        :param output_size: (int) -> Size of the last layer, or None if the last layer has no size
+        :return: (list[string]) -> Description of every problem found, empty if the design fits
+        """
+        problems = []
+        if int(input_dimensions) != self.num_features:
+            problems.append('Input layer dimensions ({0}) do not match the number of features in the data ({1})'.format(
+                input_dimensions, self.num_features))
+
+        if self.nan_counts[0]:
+            problems.append('{0} labels are missing'.format(self.nan_counts[0]))
+        elif self.labels_integral is False:
+            problems.append('Labels must be whole numbers to classify')
+        elif output_size is not None and (self.minimum[0] < 0 or self.maximum[0] >= int(output_size)):
+            problems.append('Output layer size ({0}) is too small for labels from {1:g} to {2:g}'.format(
+                output_size, self.minimum[0], self.maximum[0]))
+        return problems
+
+
+def profile_csv(data_path, chunk_size=dataset.DEFAULT_CHUNK_SIZE):
+    """
+    Profile a CSV file in a single pass, holding one chunk in memory at a time. Means and variances are combined across
+    chunks with the parallel algorithm of Chan et al., which stays numerically stable for large files.
+    :param data_path: (string) -> Path to the CSV file, optionally compressed, labels in the first column
+    :param chunk_size: (int) -> Number of rows parsed at a time
+    :return: (DatasetProfile) -> Profile of the file
+    """
+    columns = dataset.read_columns(data_path)
+    num_columns = len(columns)
+
+    num_rows = 0
+    count = np.zeros(num_columns)
+    mean = np.zeros(num_columns)
+    m2 = np.zeros(num_columns)
+    minimum = np.full(num_columns, np.nan)
+    maximum = np.full(num_columns, np.nan)
+    nan_counts = np.zeros(num_columns, dtype=np.int64)
+    labels = set()
+    labels_integral = True
+
+    with dataset.open_data(data_path) as fd:
+        for chunk in pd.read_csv(fd, chunksize=chunk_size):
+            values = chunk.values.astype(np.float64)
+            nan = np.isnan(values)
+            num_rows += len(values)
+            nan_counts += nan.sum(axis=0)
+            minimum = np.fmin(minimum, np.fmin.reduce(values, axis=0))
+            maximum = np.fmax(maximum, np.fmax.reduce(values, axis=0))
+
+            chunk_count = (~nan).sum(axis=0)
+            chunk_sum = np.where(nan, 0.0, values).sum(axis=0)
+            chunk_mean = np.divide(chunk_sum, chunk_count, out=np.zeros(num_columns), where=chunk_count > 0)
+            chunk_m2 = np.where(nan, 0.0, (values - chunk_mean) ** 2).sum(axis=0)
+
+            total = count + chunk_count
+            delta = chunk_mean - mean
+            weight = np.divide(chunk_count, total, out=np.zeros(num_columns), where=total > 0)
+            mean = mean + delta * weight
+            m2 = m2 + chunk_m2 + delta ** 2 * count * weight
+            count = total
+
+            label_values = values[~nan[:, 0], 0]
+            labels_integral = labels_integral and bool(np.all(label_values == np.round(label_values)))
+            if labels is not None:
+                labels.update(label_values.tolist())
+                if len(labels) > MAX_LABELS:
+                    labels = None
+
+    std = np.sqrt(np.divide(m2, count, out=np.full(num_columns, np.nan), where=count > 0))
+    mean = np.where(count > 0, mean, np.nan)
+    return DatasetProfile(num_rows, columns, minimum, maximum, mean, std, nan_counts,
+                          None if labels is None else sorted(labels), labels_integral)
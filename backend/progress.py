@@ -0,0 +1,248 @@
+import time
+import collections
+
+# Message types. A plain string is a TEXT message; every other message is a dictionary with its type under 'type' and
+# the time it was created under 'time'.
+TEXT = 'text'
+PHASE = 'phase'
+BATCH = 'batch'
+EPOCH = 'epoch'
+ERROR = 'error'
+
+# Training phases
+READING = 'reading'
+TUNING = 'tuning'
+CALIBRATING = 'calibrating'
+TRAINING = 'training'
+DONE = 'done'
+
+DEFAULT_INTERVAL = 0.25
+LATENCY_SAMPLES = 1000
+
+
+def phase(name, text=None):
+    """
+    :param name: (string) -> Phase training entered, such as READING or TRAINING
+    :param text: (string) -> Optional status text describing the phase
+    :return: (dict{'string': object}) -> Phase message
+    """
+    return {'type': PHASE, 'time': time.time(), 'phase': name, 'text': text}
+
+
+def batch(epoch, epochs, step, steps, metrics, samples_per_second, eta):
+    """
+    :param epoch: (int) -> Epoch being trained, counted from 1
+    :param epochs: (int) -> Last epoch, or None if unknown
+    :param step: (int) -> Batches trained in this epoch so far
+    :param steps: (int) -> Batches per epoch, or None if unknown
+    :param metrics: (dict{'string': float}) -> Mean of each metric over the epoch so far
+    :param samples_per_second: (float) -> Training throughput in this epoch so far
+    :param eta: (float) -> Estimated seconds until training ends, or None if unknown
+    :return: (dict{'string': object}) -> Batch message
+    """
+    return {'type': BATCH, 'time': time.time(), 'epoch': epoch, 'epochs': epochs, 'step': step, 'steps': steps,
+            'metrics': metrics, 'samples_per_second': samples_per_second, 'eta': eta}
+
+
+def epoch(epoch, epochs, metrics, samples_per_second, eta, seconds):
+    """
+    :param epoch: (int) -> Epoch that ended, counted from 1
+    :param epochs: (int) -> Last epoch, or None if unknown
+    :param metrics: (dict{'string': float}) -> Metrics of the epoch
+    :param samples_per_second: (float) -> Training throughput of the epoch
+    :param eta: (float) -> Estimated seconds until training ends, or None if unknown
+    :param seconds: (float) -> Duration of the epoch
+    :return: (dict{'string': object}) -> Epoch message
+    """
+    return {'type': EPOCH, 'time': time.time(), 'epoch': epoch, 'epochs': epochs, 'metrics': metrics,
+            'samples_per_second': samples_per_second, 'eta': eta, 'seconds': seconds}
+
+
+def error(text):
+    """
+    :param text: (string) -> Description of the error
+    :return: (dict{'string': object}) -> Error message
+    """
+    return {'type': ERROR, 'time': time.time(), 'text': text}
+
+
+def message_type(message):
+    """
+    :param message: (string or dict{'string': object}) -> Progress message
+    :return: (string) -> Type of the message
+    """
+    return TEXT if isinstance(message, str) else message['type']
+
+
+def format_duration(seconds):
+    """
+    :param seconds: (float) -> Duration
+    :return: (string) -> The duration written as H:MM:SS, or M:SS under an hour
+    """
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return '{0}:{1:02d}:{2:02d}'.format(hours, minutes, seconds) if hours else '{0}:{1:02d}'.format(minutes, seconds)
+
+
+def format_message(message):
+    """
+    Convert a message into text for the status box
+    :param message: (string or dict{'string': object}) -> Progress message. A 'label' set by the scheduler is put in
+                                                          front of the text.
+    :return: (string) -> Status text, or None for messages that are not shown as text, such as batch messages
+    """
+    kind = message_type(message)
+    if kind == TEXT:
+        return message
+    if kind in (PHASE, ERROR):
+        text = message.get('text')
+    elif kind == EPOCH:
+        text = 'Epoch {0}{1}'.format(message['epoch'], '/{0}'.format(message['epochs']) if message['epochs'] else '')
+        text += ''.join(' - {0}: {1:.4f}'.format(name, value) for name, value in sorted(message['metrics'].items()))
+        text += ' - {0:.0f} samples/s'.format(message['samples_per_second'])
+        if message['eta']:
+            text += ' - ETA {0}'.format(format_duration(message['eta']))
+        text += '\n'
+    else:
+        text = None
+    if not text:
+        return None
+    if not text.endswith('\n'):
+        text += '\n'
+    return '{0} {1}'.format(message['label'], text) if message.get('label') else text
+
+
+class RunningMetrics(object):
+    """
+    Mean of the metrics Keras reports for each batch, weighted by the size of the batch.
+
+    Attributes:
+        batches: (int) -> Number of batches added
+        samples: (int) -> Number of samples in the batches added
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.samples = 0
+        self.__totals = {}
+
+    def add(self, logs):
+        """
+        :param logs: (dict{'string': object}) -> Logs Keras passes to `on_batch_end`
+        """
+        size = logs.get('size', 1)
+        self.batches += 1
+        self.samples += size
+        for name, value in logs.items():
+            if name not in ('batch', 'size'):
+                self.__totals[name] = self.__totals.get(name, 0.0) + float(value) * size
+
+    def means(self):
+        """
+        :return: (dict{'string': float}) -> Mean of each metric over the batches added
+        """
+        return {name: total / self.samples for name, total in self.__totals.items()} if self.samples else {}
+
+
+class ThrottledSender(object):
+    """
+    Sends progress messages through a function, sending at most one batch message every `interval` seconds. Each batch
+    message holds the running metrics of its epoch, so a newer one replaces a held back one. The latest held back batch
+    message is sent before any other message, keeping messages in order, or by `flush`.
+
+    Attributes:
+        send: (function) -> Function the messages are passed to, such as the `send` of a pipe connection
+        interval: (float) -> Minimum number of seconds between two batch messages
+        sent: (int) -> Number of messages sent
+        coalesced: (int) -> Number of batch messages replaced by a newer one
+    """
+
+    def __init__(self, send, interval=DEFAULT_INTERVAL, clock=time.monotonic):
+        self.send = send
+        self.interval = interval
+        self.sent = 0
+        self.coalesced = 0
+
+        self.__clock = clock
+        self.__last_batch = None
+        self.__pending = None
+
+    def __call__(self, message):
+        if message_type(message) == BATCH:
+            now = self.__clock()
+            if self.__last_batch is not None and now - self.__last_batch < self.interval:
+                if self.__pending is not None:
+                    self.coalesced += 1
+                self.__pending = message
+                return
+            self.__last_batch = now
+            if self.__pending is not None:
+                self.coalesced += 1
+                self.__pending = None
+        else:
+            self.flush()
+        self.__send(message)
+
+    def flush(self):
+        """
+        Send the held back batch message, if any
+        """
+        if self.__pending is not None:
+            message, self.__pending = self.__pending, None
+            self.__send(message)
+
+    def __send(self, message):
+        self.send(message)
+        self.sent += 1
+
+
+class LatencyMeter(object):
+    """
+    Measures the delay from a typed message being created in a training worker to it being handled by the GUI. Text
+    messages carry no creation time and are not measured.
+
+    Attributes:
+        count: (int) -> Number of messages measured
+        maximum: (float) -> Longest delay in seconds
+        recent: (collections.deque) -> Delays of the latest `LATENCY_SAMPLES` messages
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.maximum = 0.0
+        self.recent = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.__total = 0.0
+
+    def add(self, message, now=None):
+        """
+        :param message: (string or dict{'string': object}) -> Progress message that was just handled
+        :param now: (float) -> Time the message was handled, defaults to the current time
+        """
+        if message_type(message) == TEXT:
+            return
+        seconds = max(0.0, (now if now is not None else time.time()) - message['time'])
+        self.count += 1
+        self.maximum = max(self.maximum, seconds)
+        self.recent.append(seconds)
+        self.__total += seconds
+
+    @property
+    def mean(self):
+        return self.__total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """
+        :param percent: (float) -> Percentile, from 0 to 100
+        :return: (float) -> Delay in seconds that the given percent of the recent messages did not exceed
+        """
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))]
+
+    def summary(self):
+        """
+        :return: (string) -> Mean, 95th percentile and maximum delay
+        """
+        return 'Message latency: mean {0:.1f} ms, p95 {1:.1f} ms, max {2:.1f} ms over {3} messages'.format(
+            self.mean * 1000, self.percentile(95) * 1000, self.maximum * 1000, self.count)
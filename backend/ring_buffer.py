@@ -0,0 +1,305 @@
+import os
+import sys
+import mmap
+import time
+import glob
+import argparse
+import tempfile
+import itertools
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+    from multiprocessing import resource_tracker
+except ImportError:
+    # Python before 3.8, where buffers are memory mapped files, see `FileMemory`
+    shared_memory = None
+    resource_tracker = None
+
+FIELDS = ('time', 'job', 'epoch', 'step', 'loss', 'accuracy', 'samples_per_second', 'rss')
+DEFAULT_CAPACITY = 4096
+NAME_PREFIX = 'neuromatic_metrics'
+SHARED_MEMORY_DIR = '/dev/shm'
+
+MAGIC = 0x4E4D5242
+VERSION = 1
+FIELD_NAME_BYTES = 32
+# Magic, version, capacity and number of fields as uint32, then the number of samples written as uint64
+HEADER_BYTES = 24
+
+_names = itertools.count(1)
+
+
+def rss_bytes():
+    """
+    :return: (float) -> Resident memory of this process in bytes, or NaN if it cannot be read
+    """
+    try:
+        with open('/proc/self/statm') as fd:
+            return float(int(fd.read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    # The peak rather than the current size, in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return float(peak if sys.platform == 'darwin' else peak * 1024)
+
+
+def segment_size(capacity, num_fields):
+    """
+    :param capacity: (int) -> Number of samples the buffer holds
+    :param num_fields: (int) -> Number of values in a sample
+    :return: (int) -> Bytes of shared memory used by a buffer
+    """
+    return HEADER_BYTES + num_fields * FIELD_NAME_BYTES + capacity * (num_fields + 1) * 8
+
+
+def memory_dir():
+    """
+    :return: (string) -> Directory of the files backing the buffers, where shared memory is visible as files
+    """
+    return SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir()
+
+
+def find_buffers():
+    """
+    :return: (list[string]) -> Names of the metrics buffers of every running Neuromatic process, where shared memory
+                                is visible as files
+    """
+    paths = glob.glob(os.path.join(memory_dir(), NAME_PREFIX + '_*'))
+    return sorted(os.path.basename(path) for path in paths)
+
+
+class FileMemory(object):
+    """
+    Memory mapped file used as the shared memory block of a buffer before Python 3.8, with the interface of
+    `multiprocessing.shared_memory.SharedMemory` used by `MetricsRing`. The file is kept in `memory_dir`, so on Linux it
+    lives in memory like a shared memory block, and other processes attach to it by name in the same way.
+
+    Attributes:
+        name: (string) -> Name of the file
+        buf: (memoryview) -> Contents of the file
+    """
+
+    def __init__(self, name, create=False, size=0):
+        """
+        :param name: (string) -> Name of the file in `memory_dir`
+        :param create: (boolean) -> True to create a new file of `size` bytes, False to open an existing one
+        :param size: (int) -> Size of a new file
+        """
+        self.name = name
+        self.__path = os.path.join(memory_dir(), name)
+        with open(self.__path, 'x+b' if create else 'r+b') as fd:
+            if create:
+                fd.truncate(size)
+            self.__map = mmap.mmap(fd.fileno(), 0)
+        self.buf = memoryview(self.__map)
+
+    def close(self):
+        self.buf.release()
+        self.__map.close()
+
+    def unlink(self):
+        os.remove(self.__path)
+
+
+class MetricsRing(object):
+    """
+    Fixed size ring buffer of numeric training samples in shared memory, or in a memory mapped file before Python 3.8,
+    see `FileMemory`. A training worker writes a sample after every
+    batch and any number of processes read them, without locks and without serializing each sample: the GUI on every
+    refresh tick, and headless monitors through `python -m backend.ring_buffer`.
+
+    There must be a single writer. A sample is written to slot `n % capacity`, where `n` is the number of samples
+    written so far, and published by incrementing `n`. Each slot also stores the sample number it holds, set to -1 while
+    the slot is being written, so a reader that copied a slot while it was overwritten can tell and drop the sample.
+    Readers keep their own position; a reader that falls more than `capacity` samples behind skips the samples that
+    were overwritten and counts them in `dropped`.
+
+    Missing values are stored as NaN. Samples are returned as numpy record arrays with one float64 field per name in
+    `fields`.
+
+    Attributes:
+        name: (string) -> Name of the shared memory block, used to attach to the buffer from another process
+        capacity: (int) -> Number of samples held
+        fields: (tuple(string)) -> Names of the values of a sample
+        owner: (boolean) -> True for the buffer that created the shared memory block and removes it in `unlink`
+        dropped: (int) -> Samples this reader missed because they were overwritten before being read
+    """
+
+    def __init__(self, memory, owner):
+        """
+        Use `create` or `attach` instead
+        :param memory: (multiprocessing.shared_memory.SharedMemory or FileMemory) -> Shared memory block holding the
+                                                                                   buffer
+        :param owner: (boolean) -> True if this buffer created the block
+        """
+        self.name = memory.name
+        self.owner = owner
+        self.dropped = 0
+
+        self.__memory = memory
+        header = np.ndarray((4,), dtype=np.uint32, buffer=memory.buf)
+        if header[0] != MAGIC or header[1] != VERSION:
+            raise ValueError('{0} is not a metrics buffer'.format(memory.name))
+        self.capacity, num_fields = int(header[2]), int(header[3])
+        names = np.ndarray((num_fields,), dtype='S{0}'.format(FIELD_NAME_BYTES), buffer=memory.buf,
+                           offset=HEADER_BYTES)
+        self.fields = tuple(name.decode('ascii') for name in names)
+        self.__dtype = np.dtype([(field, np.float64) for field in self.fields])
+        self.__count = np.ndarray((1,), dtype=np.uint64, buffer=memory.buf, offset=16)
+        self.__slots = np.ndarray((self.capacity, num_fields + 1), dtype=np.float64, buffer=memory.buf,
+                                  offset=HEADER_BYTES + num_fields * FIELD_NAME_BYTES)
+        # New readers start at the oldest sample still held
+        self.__position = max(0, self.written - self.capacity)
+
+    @classmethod
+    def create(cls, name=None, capacity=DEFAULT_CAPACITY, fields=FIELDS):
+        """
+        :param name: (string) -> Name of the shared memory block, defaults to a name unique to this process
+        :param capacity: (int) -> Number of samples held
+        :param fields: (tuple(string)) -> Names of the values of a sample
+        :return: (MetricsRing) -> New, empty buffer
+        """
+        name = name or '{0}_{1}_{2}'.format(NAME_PREFIX, os.getpid(), next(_names))
+        size = segment_size(capacity, len(fields))
+        if shared_memory is None:
+            memory = FileMemory(name, create=True, size=size)
+        else:
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        memory.buf[:HEADER_BYTES] = np.array([MAGIC, VERSION, capacity, len(fields), 0, 0], dtype=np.uint32).tobytes()
+        names = np.ndarray((len(fields),), dtype='S{0}'.format(FIELD_NAME_BYTES), buffer=memory.buf,
+                           offset=HEADER_BYTES)
+        names[:] = [field.encode('ascii') for field in fields]
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        :param name: (string) -> Name of an existing buffer
+        :return: (MetricsRing) -> Buffer sharing the memory of the named buffer, reading from its oldest sample
+        """
+        if shared_memory is None:
+            return cls(FileMemory(name), owner=False)
+        # Only the creator removes the block; otherwise the resource tracker of a monitor would remove it on exit
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python before 3.13 always tracks the block
+            memory = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        return cls(memory, owner=False)
+
+    def __reduce__(self):
+        # Processes started with spawn attach to the block instead of copying it
+        return MetricsRing.attach, (self.name,)
+
+    @property
+    def written(self):
+        """
+        :return: (int) -> Number of samples written since the buffer was created
+        """
+        return int(self.__count[0])
+
+    def write(self, **values):
+        """
+        Add a sample, overwriting the oldest one once the buffer is full. Only one process may write.
+        :param values: (dict{'string': float}) -> Value of each field, missing fields are stored as NaN
+        """
+        sample = np.full(len(self.fields) + 1, np.nan)
+        for i, field in enumerate(self.fields):
+            value = values.get(field)
+            if value is not None:
+                sample[i + 1] = value
+        count = self.written
+        slot = self.__slots[count % self.capacity]
+        slot[0] = -1.0
+        slot[1:] = sample[1:]
+        slot[0] = count
+        self.__count[0] = count + 1
+
+    def read(self):
+        """
+        :return: (numpy.recarray) -> Samples written since the last read by this buffer, oldest first
+        """
+        end = self.written
+        start = max(self.__position, end - self.capacity)
+        self.dropped += start - self.__position
+        self.__position = end
+        if start == end:
+            return np.recarray((0,), dtype=self.__dtype)
+
+        numbers = np.arange(start, end)
+        slots = numbers % self.capacity
+        samples = self.__slots[slots]
+        # Samples overwritten while they were copied no longer hold their number
+        valid = (samples[:, 0] == numbers) & (self.__slots[slots, 0] == numbers)
+        self.dropped += int(len(valid) - np.count_nonzero(valid))
+        values = np.ascontiguousarray(samples[valid, 1:])
+        return values.view(self.__dtype).reshape(-1).view(np.recarray)
+
+    def close(self):
+        """
+        Stop using the buffer in this process
+        """
+        # Views into the block must be released before it can be closed
+        self.__count = self.__slots = None
+        self.__memory.close()
+
+    def unlink(self):
+        """
+        Close the buffer and, if this process created it, remove the shared memory block
+        """
+        self.close()
+        if self.owner and isinstance(self.__memory, FileMemory):
+            self.__memory.unlink()
+        elif self.owner:
+            # A forked process attaching to the block may have unregistered it from the tracker shared with this one
+            resource_tracker.register(self.__memory._name, 'shared_memory')
+            self.__memory.unlink()
+
+
+def format_sample(name, sample):
+    """
+    :param name: (string) -> Name of the buffer the sample was read from
+    :param sample: (numpy.record) -> Sample read from a buffer
+    :return: (string) -> Line of text describing the sample
+    """
+    values = ' '.join('{0}={1:.6g}'.format(field, sample[field]) for field in sample.dtype.names
+                      if field != 'time' and not np.isnan(sample[field]))
+    return '{0} {1} {2}'.format(time.strftime('%H:%M:%S', time.localtime(sample['time'])), name, values)
+
+
+def main(argv=None):
+    """
+    Headless monitor printing the samples of metrics buffers as they are written
+    """
+    parser = argparse.ArgumentParser(description='Print the training metrics of running Neuromatic workers.')
+    parser.add_argument('names', nargs='*', help='metrics buffers to read, defaults to every buffer found')
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between reads')
+    args = parser.parse_args(argv)
+
+    names = args.names or find_buffers()
+    if not names:
+        parser.error('no metrics buffers found, pass their names')
+    buffers = {name: MetricsRing.attach(name) for name in names}
+    try:
+        while True:
+            for name, ring in buffers.items():
+                for sample in ring.read():
+                    print(format_sample(name, sample))
+            sys.stdout.flush()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for ring in buffers.values():
+            ring.close()
+
+
+if __name__ == '__main__':
+    main()
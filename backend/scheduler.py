@@ -0,0 +1,286 @@
+import os
+import copy
+import time
+import logging
+import itertools
+import multiprocessing.connection
+
+import numpy as np
+
+from backend import progress, threads, worker
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = worker.DONE
+FAILED = worker.FAILED
+CANCELED = worker.CANCELED
+
+MIN_THREADS_PER_JOB = 4
+CANCEL_TIMEOUT = 30.0
+
+
+def default_slots(num_cores=None):
+    """
+    :param num_cores: (int) -> Number of available cores, defaults to the number of cores of this machine
+    :return: (int) -> Number of jobs run at once, so that each job has at least `MIN_THREADS_PER_JOB` cores
+    """
+    return max(1, (num_cores or os.cpu_count()) // MIN_THREADS_PER_JOB)
+
+
+def thread_counts(num_cores, num_jobs):
+    """
+    Divide the cores between jobs running at the same time
+    :param num_cores: (int) -> Number of available cores
+    :param num_jobs: (int) -> Number of jobs sharing the cores
+    :return: (int, int) -> TensorFlow intra-op and inter-op thread counts for each job
+    """
+    intra_op_threads = max(1, num_cores // max(1, num_jobs))
+    inter_op_threads = 2 if intra_op_threads >= MIN_THREADS_PER_JOB else 1
+    return intra_op_threads, inter_op_threads
+
+
+def job_threads(properties, num_cores, num_jobs):
+    """
+    Thread settings of a job. Thread counts set in the properties are used as they are; otherwise a job pinned to some
+    CPUs uses all of them, and other jobs get an equal share of the cores, see `thread_counts`.
+    :param properties: (dict{'string': object}) -> Canvas properties of the job
+    :param num_cores: (int) -> Number of cores shared by the jobs
+    :param num_jobs: (int) -> Number of jobs running at the same time
+    :return: (int, int, list[int]) -> Intra-op and inter-op thread counts, and the CPUs to run on or None for any CPU
+    """
+    cpus = threads.parse_cpus(properties.get('cpu_affinity', '')) or None
+    intra_op_threads, inter_op_threads = thread_counts(len(cpus), 1) if cpus else thread_counts(num_cores, num_jobs)
+    intra_op_threads = int(properties.get('intra_op_threads') or intra_op_threads)
+    inter_op_threads = int(properties.get('inter_op_threads') or inter_op_threads)
+    return intra_op_threads, inter_op_threads, cpus
+
+
+class Job(object):
+    """
+    Training job tracked by the scheduler.
+
+    Attributes:
+        id: (int) -> Job number, unique within a scheduler
+        name: (string) -> Name shown in status messages
+        properties: (dict{'string': object}) -> Canvas properties the job trains with
+        state: (string) -> QUEUED, RUNNING, DONE, FAILED or CANCELED
+        score: (float) -> Model accuracy, once the job is done
+        metrics: (dict{'string': float}) -> Loss and metrics of the model on the test set, once the job is done
+        submitted: (float) -> Time the job was submitted
+        started: (float) -> Time the job started running, or None
+        finished: (float) -> Time the job finished, or None
+        canceled: (float) -> Time the running job was asked to stop, or None
+    """
+
+    def __init__(self, job_id, name, properties):
+        self.id = job_id
+        self.name = name
+        self.properties = properties
+        self.state = QUEUED
+        self.score = None
+        self.metrics = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.canceled = None
+
+    @property
+    def label(self):
+        return '[Job {0}: {1}]'.format(self.id, self.name)
+
+    @property
+    def active(self):
+        return self.state in (QUEUED, RUNNING)
+
+
+class JobScheduler(object):
+    """
+    Runs training jobs on a pool of warm training workers. Jobs wait in a first in, first out queue and up to
+    `num_slots` of them run at once. Each job is given an equal share of the cores as TensorFlow intra-op threads when
+    it starts, so concurrent jobs do not oversubscribe the CPU, unless the job's properties set its thread counts or pin
+    it to some CPUs, see `job_threads`.
+
+    The scheduler does not run a thread of its own: `poll` collects status messages, records finished jobs and starts
+    queued jobs, and is called periodically by the GUI.
+
+    A canceled job stops at the end of its current batch. If it has not stopped `cancel_timeout` seconds later, its
+    worker is terminated and replaced by a new one.
+
+    Attributes:
+        num_cores: (int) -> Number of cores shared by the jobs
+        num_slots: (int) -> Maximum number of jobs run at once
+        cancel_timeout: (float) -> Seconds a canceled job has to stop before its worker is terminated
+        jobs: (list[Job]) -> Every submitted job, in submission order
+        logger: (logging.Logger) -> Scheduler logger
+    """
+
+    def __init__(self, num_slots=None, num_cores=None, worker_factory=worker.TrainingWorker,
+                 cancel_timeout=CANCEL_TIMEOUT):
+        self.num_cores = num_cores or os.cpu_count()
+        self.num_slots = num_slots or default_slots(self.num_cores)
+        self.cancel_timeout = cancel_timeout
+        self.jobs = []
+        self.logger = logging.getLogger('scheduler')
+
+        self.__workers = [worker_factory() for _ in range(self.num_slots)]
+        self.__running = {}
+        self.__messages = []
+        self.__job_ids = itertools.count(1)
+
+    @property
+    def active(self):
+        """
+        :return: (boolean) -> True while any job is queued or running
+        """
+        return any(job.active for job in self.jobs)
+
+    def start(self):
+        """
+        Start one training worker so it loads its libraries before the first job arrives. The other workers start when
+        jobs first need them, so slots that are never used do not hold a process with TensorFlow loaded.
+        """
+        self.__workers[0].start()
+
+    def stop(self):
+        """
+        Cancel every job and stop the training workers
+        """
+        self.cancel()
+        for training_worker in self.__workers:
+            training_worker.stop()
+
+    def submit(self, properties, name=None, overrides=None):
+        """
+        Queue a training job. The job runs as soon as a worker is free.
+        :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+        :param name: (string) -> Name shown in status messages, defaults to the canvas name
+        :param overrides: (dict{'string': object}) -> Properties of this job only, such as 'intra_op_threads',
+                                                      'inter_op_threads' or 'cpu_affinity'
+        :return: (Job) -> The queued job
+        """
+        properties = dict(properties, **(overrides or {}))
+        job = Job(next(self.__job_ids), name or properties.get('canvas_name', 'network'), copy.deepcopy(properties))
+        self.jobs.append(job)
+        self.logger.info('{0} queued'.format(job.label))
+        self.__messages.append('{0} queued\n'.format(job.label))
+        self.__dispatch()
+        return job
+
+    def cancel(self, job_id=None):
+        """
+        Cancel a queued or running job
+        :param job_id: (int) -> Job to cancel, or None to cancel every job
+        """
+        for job in self.jobs:
+            if job_id is not None and job.id != job_id:
+                continue
+            if job.state == QUEUED:
+                self.__finish(job, CANCELED)
+            elif job.state == RUNNING:
+                # The worker reports the job as canceled once it stops
+                for training_worker, running_job in self.__running.items():
+                    if running_job is job:
+                        training_worker.cancel()
+                if job.canceled is None:
+                    job.canceled = time.time()
+
+    def wait(self, timeout=None):
+        """
+        Block until a worker has a message to read or the timeout passes. The messages are not read, so a thread can
+        wait here and wake the thread that calls `poll`.
+        :param timeout: (float) -> Maximum number of seconds to wait, or None to wait until a message arrives
+        :return: (boolean) -> True if a message is waiting
+        """
+        connections = [training_worker.connection for training_worker in self.__workers]
+        try:
+            return bool(multiprocessing.connection.wait(connections, timeout))
+        except (OSError, ValueError):
+            # A worker was restarted while waiting, closing the connection being waited on
+            return False
+
+    def read_metrics(self):
+        """
+        Read the per-batch metrics the workers wrote to their shared memory buffers since the last read
+        :return: (numpy.recarray) -> Samples of every worker, see `ring_buffer.FIELDS`, or None if no worker has a buffer
+        """
+        buffers = [training_worker.metrics for training_worker in self.__workers
+                   if getattr(training_worker, 'metrics', None) is not None]
+        if not buffers:
+            return None
+        return np.concatenate([ring.read() for ring in buffers]).view(np.recarray)
+
+    def poll(self):
+        """
+        Collect status messages from the workers, record finished jobs and start queued jobs
+        :return: (list[string or dict{'string': object}]) -> Progress messages, see `progress`, marked with their job
+        """
+        for training_worker, job in list(self.__running.items()):
+            # Messages are sent before the result, so reading the result first leaves none of this job's messages behind
+            result = training_worker.poll_result()
+            while training_worker.connection.poll():
+                try:
+                    message = training_worker.connection.recv()
+                except EOFError:
+                    break
+                self.__messages.append(self.__label(job, message))
+
+            if result is None and job.canceled is not None and time.time() - job.canceled >= self.cancel_timeout:
+                training_worker.restart()
+                result = {'id': job.id, 'state': CANCELED, 'score': None, 'metrics': None}
+                self.__messages.append('{0} Did not stop within {1:g} s, training worker restarted\n'.format(
+                    job.label, self.cancel_timeout))
+            elif result is None and not training_worker.is_alive():
+                result = {'id': job.id, 'state': FAILED, 'score': None, 'metrics': None}
+                self.__messages.append('{0} Training worker exited unexpectedly\n'.format(job.label))
+            if result is not None:
+                del self.__running[training_worker]
+                job.score = result['score']
+                job.metrics = result.get('metrics')
+                self.__finish(job, result['state'])
+
+        self.__dispatch()
+        messages, self.__messages = self.__messages, []
+        return messages
+
+    def __label(self, job, message):
+        """
+        Mark a message with the job that sent it. Typed progress messages get the job's id under 'job', and its label
+        under 'label' if several jobs can run at once; text messages are prefixed with the label instead.
+        """
+        if progress.message_type(message) != progress.TEXT:
+            return dict(message, job=job.id, label=job.label if self.num_slots > 1 else None)
+        return message if self.num_slots == 1 else '{0} {1}'.format(job.label, message)
+
+    def __dispatch(self):
+        """
+        Start queued jobs on idle workers
+        """
+        queued = [job for job in self.jobs if job.state == QUEUED]
+        # Running workers first, as they have their libraries loaded
+        idle = sorted((training_worker for training_worker in self.__workers if training_worker not in self.__running),
+                      key=lambda training_worker: not training_worker.is_alive())
+        num_jobs = min(self.num_slots, len(self.__running) + len(queued))
+        for job, training_worker in zip(queued, idle):
+            intra_op_threads, inter_op_threads, cpus = job_threads(job.properties, self.num_cores, num_jobs)
+            training_worker.submit(job.properties, job.id, intra_op_threads, inter_op_threads, cpus)
+            self.__running[training_worker] = job
+            job.state = RUNNING
+            job.started = time.time()
+
+            message = '{0} running with {1} threads'.format(job.label, intra_op_threads)
+            if cpus:
+                message += ' on CPUs {0}'.format(threads.format_cpus(cpus))
+            self.logger.info(message)
+            self.__messages.append(message + '\n')
+
+    def __finish(self, job, state):
+        """
+        Record that a job finished
+        """
+        job.state = state
+        job.finished = time.time()
+        message = '{0} {1}'.format(job.label, state)
+        if job.started is not None:
+            message += ' after {0:.1f} s'.format(job.finished - job.started)
+        self.logger.info(message)
+        self.__messages.append(message + '\n')
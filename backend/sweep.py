@@ -0,0 +1,266 @@
+import os
+import copy
+import math
+import logging
+import itertools
+
+import pandas as pd
+
+from backend import scheduler
+
+DEFAULT_REDUCTION = 3
+RESULTS_SUFFIX = '_sweep.csv'
+
+
+def parse_value(text):
+    """
+    :param text: (string) -> Property value typed in the GUI
+    :return: (int, float or string) -> The value as a number if it is one
+    """
+    text = text.strip()
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_values(text):
+    """
+    Parse the values of one swept property. Values are either a comma separated list, such as "sgd, adam", or an
+    inclusive numeric range written start:stop:step, such as "50:200:50".
+    :param text: (string) -> Values typed in the GUI
+    :return: (list) -> Values, empty if the text is blank
+    """
+    if not text.strip():
+        return []
+    if ':' in text and ',' not in text:
+        parts = [parse_value(part) for part in text.split(':')]
+        if len(parts) not in (2, 3) or not all(isinstance(part, (int, float)) for part in parts):
+            raise ValueError('Invalid range: {0}'.format(text))
+        start, stop, step = parts if len(parts) == 3 else parts + [1]
+        if step <= 0:
+            raise ValueError('Range step must be > 0: {0}'.format(text))
+        count = int(math.floor((stop - start) / float(step) + 1e-9)) + 1
+        return [start + step * index for index in range(max(0, count))]
+    return [parse_value(value) for value in text.split(',') if value.strip()]
+
+
+def set_property(properties, key, value):
+    """
+    Set a canvas or layer property. Layer properties are addressed as layers.<index>.<property>, for example
+    layers.1.size for the size of the second layer.
+    :param properties: (dict{'string': object}) -> Canvas properties, changed in place
+    :param key: (string) -> Property name
+    :param value: (object) -> New value
+    """
+    if key.startswith('layers.'):
+        _, index, name = key.split('.', 2)
+        properties['layers'][int(index)][name] = value
+    else:
+        properties[key] = value
+
+
+def expand_grid(grid):
+    """
+    Expand a grid into every combination of its values
+    :param grid: (dict{'string': list}) -> Values of each swept property
+    :return: (list[dict{'string': object}]) -> One dictionary of property values per combination
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def rung_epochs(max_epochs, num_rungs, reduction):
+    """
+    :param max_epochs: (int) -> Epochs trained in the last rung
+    :param num_rungs: (int) -> Number of rungs
+    :param reduction: (int) -> Factor the number of trials shrinks by, and the epochs grow by, from one rung to the next
+    :return: (list[int]) -> Epochs trained in each rung
+    """
+    return [max(1, int(round(max_epochs / float(reduction) ** (num_rungs - 1 - rung)))) for rung in range(num_rungs)]
+
+
+class Trial(object):
+    """
+    One configuration of a sweep.
+
+    Attributes:
+        id: (int) -> Trial number
+        params: (dict{'string': object}) -> Swept property values of this configuration
+        scores: (list[float]) -> Model accuracy at the end of each rung the trial ran in, None if the job failed
+        job: (scheduler.Job) -> Training job of the current rung
+    """
+
+    def __init__(self, trial_id, params):
+        self.id = trial_id
+        self.params = params
+        self.scores = []
+        self.job = None
+
+    @property
+    def score(self):
+        """
+        :return: (float) -> Accuracy in the last rung the trial ran in, or None
+        """
+        return self.scores[-1] if self.scores else None
+
+    def rank_key(self):
+        # Trials that got further rank first, then by accuracy; failed trials rank last
+        return -len(self.scores), -(self.score if self.score is not None else -math.inf)
+
+
+class Sweep(object):
+    """
+    Hyperparameter sweep with successive halving. Every combination of the grid is trained for a few epochs, then the
+    best 1/`reduction` of the trials continue training from their saved models up to `reduction` times as many epochs,
+    until one trial is left or the trials reach the canvas's epochs. Clearly losing configurations therefore stop after
+    a fraction of the full training time, and no epoch of a surviving trial is trained twice. Trials of a network
+    script cannot continue from a saved model, see `training.warm_start_source`, so they are trained again from the
+    start in every rung.
+
+    The epochs of each rung are set by the sweep, so 'epochs' cannot be swept.
+
+    Trials are queued as jobs on the job scheduler, so they run in parallel on the training workers. All trials use the
+    canvas's train/test split, and the parsed dataset is cached once and memory mapped by every worker. After each rung
+    the trials are ranked and written to `<canvas name>_sweep.csv` in the project directory.
+
+    Like the scheduler, the sweep is advanced by calling `poll`.
+
+    Attributes:
+        properties: (dict{'string': object}) -> Canvas properties of the swept design
+        trials: (list[Trial]) -> Every configuration of the grid
+        reduction: (int) -> Factor the number of trials shrinks by from one rung to the next
+        epochs: (list[int]) -> Epochs each rung trains up to
+        rung: (int) -> Current rung
+        finished: (boolean) -> True once the last rung is done or the sweep was canceled
+        results_path: (string) -> Path to the ranked results table
+        logger: (logging.Logger) -> Sweep logger
+    """
+
+    def __init__(self, properties, grid, job_scheduler, reduction=DEFAULT_REDUCTION):
+        """
+        :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+        :param grid: (dict{'string': list}) -> Values of each swept property, see `set_property`
+        :param job_scheduler: (scheduler.JobScheduler) -> Scheduler the trials run on
+        :param reduction: (int) -> Factor the number of trials shrinks by from one rung to the next, at least 2
+        """
+        if not grid or not all(grid.values()):
+            raise ValueError('Nothing to sweep')
+        if 'epochs' in grid:
+            raise ValueError('Epochs cannot be swept, each round of the sweep sets its own')
+        self.properties = copy.deepcopy(properties)
+        self.trials = [Trial(index + 1, params) for index, params in enumerate(expand_grid(grid))]
+        self.reduction = max(2, int(reduction))
+        self.logger = logging.getLogger('sweep')
+
+        num_rungs = 1 + int(math.floor(math.log(len(self.trials), self.reduction) + 1e-9))
+        # Rungs that would train no further than the rung before are dropped, as survivors continue training
+        self.epochs = sorted(set(rung_epochs(int(self.properties['epochs']), num_rungs, self.reduction)))
+        self.rung = 0
+        self.finished = False
+        self.results_path = os.path.join(self.properties['project_directory'],
+                                         self.properties['canvas_name'] + RESULTS_SUFFIX)
+
+        for trial in self.trials:
+            # Fail now, not in the middle of the sweep, if a swept property does not exist
+            self.trial_properties(trial)
+
+        self.__scheduler = job_scheduler
+        self.__messages = []
+        self.__alive = list(self.trials)
+
+    def start(self):
+        """
+        Queue the first rung
+        """
+        self.__start_rung()
+
+    def cancel(self):
+        """
+        Cancel the trials of the current rung
+        """
+        for trial in self.__alive:
+            if trial.job is not None and trial.job.active:
+                self.__scheduler.cancel(trial.job.id)
+        self.finished = True
+
+    def poll(self):
+        """
+        Start the next rung once every trial of the current rung has finished
+        :return: (list[string]) -> Status messages
+        """
+        if not self.finished and all(not trial.job.active for trial in self.__alive):
+            for trial in self.__alive:
+                trial.scores.append(trial.job.score if trial.job.state == scheduler.DONE else None)
+            self.__alive.sort(key=Trial.rank_key)
+            self.write_results()
+
+            survivors = [trial for trial in self.__alive[:int(math.ceil(len(self.__alive) / float(self.reduction)))]
+                         if trial.score is not None]
+            self.rung += 1
+            if self.rung < len(self.epochs) and survivors:
+                self.__message('Sweep rung {0}: kept {1} of {2} trials'.format(self.rung, len(survivors),
+                                                                               len(self.__alive)))
+                self.__alive = survivors
+                self.__start_rung()
+            else:
+                self.finished = True
+                best = self.ranked()[0]
+                self.__message('Sweep finished: best trial {0} {1} with accuracy {2}'.format(
+                    best.id, best.params, None if best.score is None else round(best.score, 3)))
+                self.__message('Sweep results saved to {0}'.format(self.results_path))
+
+        messages, self.__messages = self.__messages, []
+        return messages
+
+    def ranked(self):
+        """
+        :return: (list[Trial]) -> Every trial, best first
+        """
+        return sorted(self.trials, key=Trial.rank_key)
+
+    def write_results(self):
+        """
+        Write the ranked trials to the results table
+        """
+        rows = []
+        for rank, trial in enumerate(self.ranked(), 1):
+            row = {'rank': rank, 'trial': trial.id}
+            row.update(trial.params)
+            row['epochs'] = self.epochs[len(trial.scores) - 1] if trial.scores else 0
+            row['accuracy'] = trial.score
+            rows.append(row)
+
+        columns = ['rank', 'trial'] + list(self.trials[0].params) + ['epochs', 'accuracy']
+        temp_path = '{0}.{1}.tmp'.format(self.results_path, os.getpid())
+        pd.DataFrame(rows, columns=columns).to_csv(temp_path, index=False)
+        os.replace(temp_path, self.results_path)
+
+    def trial_properties(self, trial):
+        """
+        :param trial: (Trial) -> Trial of the sweep
+        :return: (dict{'string': object}) -> Canvas properties the trial trains with in the current rung
+        """
+        properties = copy.deepcopy(self.properties)
+        for key, value in trial.params.items():
+            set_property(properties, key, value)
+        properties['canvas_name'] = '{0}_trial{1}'.format(self.properties['canvas_name'], trial.id)
+        properties['split_name'] = self.properties.get('split_name', self.properties['canvas_name'])
+        properties['epochs'] = self.epochs[self.rung]
+        if self.rung > 0 and properties.get('script') is None:
+            # Continue from the model the trial saved at the end of the last rung
+            properties['warm_start'] = True
+        return properties
+
+    def __start_rung(self):
+        self.__message('Sweep rung {0}: {1} trials of {2} epochs'.format(self.rung + 1, len(self.__alive),
+                                                                          self.epochs[self.rung]))
+        for trial in self.__alive:
+            properties = self.trial_properties(trial)
+            trial.job = self.__scheduler.submit(properties, name='trial {0}'.format(trial.id))
+
+    def __message(self, message):
+        self.logger.info(message)
+        self.__messages.append(message + '\n')
@@ -0,0 +1,103 @@
+import os
+import logging
+
+logger = logging.getLogger('threads')
+
+
+def available_cpus():
+    """
+    :return: (list[int]) -> CPUs this process is allowed to run on
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count()))
+
+
+def parse_cpus(text):
+    """
+    Parse a CPU affinity mask written as a list of CPUs and ranges, such as "0-3,8"
+    :param text: (string) -> CPU list typed in the GUI
+    :return: (list[int]) -> Sorted CPUs, empty if the text is blank
+    """
+    cpus = set()
+    for part in str(text).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        first, last = int(first), int(last or first)
+        if first < 0 or last < first:
+            raise ValueError('Invalid CPU range: {0}'.format(part))
+        cpus.update(range(first, last + 1))
+    return sorted(cpus)
+
+
+def format_cpus(cpus):
+    """
+    :param cpus: (list[int]) -> CPUs
+    :return: (string) -> The CPUs written as a list of CPUs and ranges, such as "0-3,8"
+    """
+    parts = []
+    for cpu in sorted(set(cpus)):
+        if parts and parts[-1][1] == cpu - 1:
+            parts[-1][1] = cpu
+        else:
+            parts.append([cpu, cpu])
+    return ','.join(str(first) if first == last else '{0}-{1}'.format(first, last) for first, last in parts)
+
+
+def set_affinity(cpus):
+    """
+    Restrict the calling thread, and every thread and process it starts afterwards, to a set of CPUs. TensorFlow starts
+    its thread pools when a session is created, so the affinity has to be set before then.
+    :param cpus: (list[int]) -> CPUs to run on
+    :return: (boolean) -> True if the affinity was set, False if this platform does not support it
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        logger.warning('CPU affinity is not supported on this platform')
+        return False
+    os.sched_setaffinity(0, cpus)
+    return True
+
+
+def candidate_settings(num_cores):
+    """
+    :param num_cores: (int) -> Number of cores available to a job
+    :return: (list[(int, int)]) -> Intra-op and inter-op thread counts worth comparing: powers of two up to the number of
+                                   cores, and the number of cores itself, each with one and two inter-op threads
+    """
+    intra_op_threads = set([num_cores])
+    count = 1
+    while count < num_cores:
+        intra_op_threads.add(count)
+        count *= 2
+    return [(intra, inter) for intra in sorted(intra_op_threads) for inter in (1, 2)]
+
+
+def configure_session(intra_op_threads, inter_op_threads):
+    """
+    Create the Keras session with the given TensorFlow thread pools
+    :param intra_op_threads: (int) -> Threads used within an operation, 0 for the TensorFlow default
+    :param inter_op_threads: (int) -> Operations run at once, 0 for the TensorFlow default
+    """
+    if not intra_op_threads and not inter_op_threads:
+        return
+    try:
+        import tensorflow as tf
+        from keras import backend
+    except ImportError:
+        return
+    config = tf.ConfigProto(intra_op_parallelism_threads=intra_op_threads,
+                            inter_op_parallelism_threads=inter_op_threads)
+    backend.set_session(tf.Session(config=config))
+
+
+def clear_session():
+    """
+    Release the Keras graph and session so models do not accumulate in a long-lived process
+    """
+    try:
+        from keras import backend
+    except ImportError:
+        return
+    backend.clear_session()
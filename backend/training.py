@@ -0,0 +1,405 @@
+import os
+import time
+import logging
+import importlib.util
+
+import numpy as np
+
+from backend import builder, cache, dataset, layers, prefetch, progress, checkpoint, threads, tuner
+
+logger = logging.getLogger('training')
+
+
+class TrainingCanceled(Exception):
+    pass
+
+
+def split_file(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (string) -> Path to the train/test split of the canvas. Sweep trials share the split of their canvas.
+    """
+    split_name = properties.get('split_name', properties['canvas_name'])
+    return os.path.join(properties['project_directory'], '{0}_split.npz'.format(split_name))
+
+
+def folds_file(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (string) -> Path to the cross-validation fold assignment of the canvas, shared by the jobs of its folds
+    """
+    split_name = properties.get('split_name', properties['canvas_name'])
+    return os.path.join(properties['project_directory'], '{0}_folds.npz'.format(split_name))
+
+
+def split_rows(properties, num_rows):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties. If 'fold' is set, the rows of that fold of the
+                                                   'num_folds' cross-validation folds are held out for testing.
+    :param num_rows: (int) -> Number of rows in the dataset
+    :return: (numpy.ndarray, numpy.ndarray) -> Training and test row indices
+    """
+    if properties.get('fold') is not None:
+        assignment = dataset.load_folds(folds_file(properties), num_rows, int(properties['num_folds']),
+                                        properties.get('seed'))
+        return dataset.fold_rows(assignment, int(properties['fold']))
+    return dataset.load_split(split_file(properties), num_rows, float(properties['training_size']),
+                              properties.get('seed'))
+
+
+def import_script(path):
+    """
+    Import a network script. The script is executed as a new module every time, so a long-lived process always trains
+    the latest version of the script while the libraries it imports stay loaded.
+    :param path: (string) -> Path to the network script
+    :return: (module) -> Network module with a `train_neural_network` function
+    """
+    spec = importlib.util.spec_from_file_location('network', path)
+    network = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(network)
+    return network
+
+
+def load_network(properties):
+    """
+    :param properties: (dict{'string': object}) -> Canvas properties. If 'script' is set, the network script at that
+                                                   path, such as an exported script edited by hand, is used instead of
+                                                   the canvas layers.
+    :return: (builder.Network or module) -> Network with `build_model` and `train_neural_network` functions
+    """
+    script = properties.get('script')
+    if script is None:
+        return builder.Network(properties)
+    if not os.path.isfile(script):
+        raise ValueError('Cannot train without a network')
+    return import_script(script)
+
+
+def warm_start_source(properties):
+    """
+    Find the model a continued training run starts from: the latest checkpoint, left by a canceled run, or else the
+    saved model of the canvas
+    :param properties: (dict{'string': object}) -> Canvas properties
+    :return: (dict{'string': object}) -> State of the model, with its path under 'path' and the number of epochs it was
+                                         trained for under 'epoch'
+    """
+    state = checkpoint.latest(checkpoint.checkpoint_dir(properties))
+    if state is None or state.get('architecture') is None:
+        state = builder.load_state(properties)
+    if state is None:
+        raise ValueError('No trained model to continue from')
+    return state
+
+
+def training_spec(properties, dataset_cache):
+    """
+    Describe everything that determines a trained model: the network, the contents of the training data and the
+    train/test split. Reads the whole data file the first time it is described, so it is called by training workers.
+    :param properties: (dict{'string': object}) -> Canvas properties, whose train/test split already exists
+    :param dataset_cache: (cache.DatasetCache) -> Cache that remembers the fingerprints of data files
+    :return: (dict{'string': object}) -> Training specification, see `cache.spec_key`
+    """
+    spec = builder.network_spec(properties)
+    if properties.get('script'):
+        spec['script'] = cache.fingerprint(properties['script'])['sha1']
+    spec.update(feature_dtype=properties.get('feature_dtype', 'auto'),
+                training_size=float(properties['training_size']),
+                data=dataset_cache.fingerprint(properties['data_path'])['sha1'],
+                split=cache.fingerprint(split_file(properties))['sha1'],
+                seed=properties.get('seed'))
+    return spec
+
+
+def open_batches(properties, dataset_cache, send, cancel=None):
+    """
+    Read the training data of a canvas and its train/test split, or its cross-validation fold
+    :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+    :param dataset_cache: (cache.DatasetCache) -> Binary cache of parsed training data
+    :param send: (function) -> Function passed status messages
+    :param cancel: (multiprocessing.Event) -> Optional event that stops waiting for another job to cache the data
+    :return: (function, numpy.ndarray, numpy.ndarray) -> Function that creates a batch stream from rows, a batch size and
+                                                         whether to shuffle, then the training rows and the test rows
+    """
+    data_path = properties['data_path']
+
+    # Read in training data
+    send(progress.phase(progress.READING, 'Reading data...\n'))
+    if properties.get('streaming'):
+        num_rows = dataset.count_rows(data_path)
+        train_rows, test_rows = split_rows(properties, num_rows)
+
+        def batch_stream(rows, batch_size, shuffle=True):
+            return dataset.CsvBatchStream(data_path, dataset.indices_mask(rows, num_rows),
+                                          batch_size=batch_size,
+                                          shuffle=shuffle)
+    else:
+        try:
+            X_data, y_data = dataset_cache.load(data_path, properties['feature_dtype'], status=send, cancel=cancel)
+        except cache.WaitCanceled as error:
+            raise TrainingCanceled(str(error))
+        send('Training data: {0:.1f} MB ({1:.1f} MB saved by compact types)\n'.format(
+            X_data.nbytes / 1e6,
+            (len(X_data) * dataset.num_feature_columns(X_data) * np.dtype(np.float64).itemsize - X_data.nbytes) / 1e6))
+        # Folds index the memory mapped arrays shared by every job, so the data is never copied per fold
+        train_rows, test_rows = split_rows(properties, len(y_data))
+
+        def batch_stream(rows, batch_size, shuffle=True):
+            return dataset.ArrayBatchStream(X_data, y_data, rows, batch_size=batch_size, shuffle=shuffle)
+    return batch_stream, train_rows, test_rows
+
+
+def train(properties, dataset_cache, send, cancel=None, submitted=None, record=None, artifact_cache=None,
+          report=None):
+    """
+    Train the network of a canvas. A network built from the canvas is first checked against a profile of the data, see
+    `check_data`, so a design that does not fit fails before the data is parsed.
+    :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`. If 'resume' is
+                                                   True, training continues from the latest checkpoint. If 'warm_start'
+                                                   is True, training continues from the trained model up to the
+                                                   'epochs' property, see `warm_start_source`.
+    :param dataset_cache: (cache.DatasetCache) -> Binary cache of parsed training data
+    :param send: (function) -> Function passed status messages
+    :param cancel: (multiprocessing.Event) -> Optional event that stops training at the end of the current batch when
+                                              set. The partially trained model is saved as a checkpoint unless the
+                                              'save_on_cancel' property is False.
+    :param submitted: (float) -> Time the job was submitted, used to report the time to the first batch
+    :param record: (function) -> Optional function passed the metrics of every batch as keyword arguments, such as
+                                 `ring_buffer.MetricsRing.write`
+    :param artifact_cache: (cache.ArtifactCache) -> Cache of trained models. If the 'use_artifact_cache' property is
+                                                   True, a model trained before with the same specification and data,
+                                                   see `training_spec`, is restored before the data is read instead
+                                                   of trained, and a newly trained model is cached.
+    :param report: (function) -> Optional function passed the metrics of the model on the test set, such as
+                                 {'loss': 0.31, 'accuracy': 0.9}. Only networks built from the canvas record their
+                                 loss and other metrics; others report their accuracy alone.
+    :return: (float) -> Model accuracy on the test set
+    """
+    submitted = submitted or time.time()
+    network = load_network(properties)
+
+    def check_canceled():
+        if cancel is not None and cancel.is_set():
+            raise TrainingCanceled('Training canceled')
+
+    training_size = float(properties['training_size'])
+    directory = checkpoint.checkpoint_dir(properties)
+    architecture = getattr(network, 'architecture', None)
+    resume = None
+    warm_start_path = None
+    if properties.get('resume'):
+        resume = checkpoint.latest(directory)
+        if resume is None:
+            raise ValueError('No checkpoint to resume from')
+        if resume.get('training_size') != training_size:
+            # A different training size would create a new split and mix test rows into training
+            raise ValueError('Training size changed since the checkpoint was saved')
+        send('Resuming from epoch {0}\n'.format(resume['epoch']))
+    elif properties.get('warm_start'):
+        resume = warm_start_source(properties)
+        if resume.get('training_size') != training_size:
+            raise ValueError('Training size changed since the model was trained')
+        if int(properties['epochs']) <= resume['epoch']:
+            raise ValueError('Epochs must be more than the {0} epochs already trained'.format(resume['epoch']))
+        if architecture is None or resume.get('architecture') is None:
+            raise ValueError('Only networks built from the canvas can continue training')
+        if (resume['architecture'], resume.get('optimizer'), resume.get('loss')) != \
+                (architecture, properties['optimizer'], properties['loss']):
+            # The saved model cannot be restored as it is, so a new model starts from as many of its weights as fit
+            warm_start_path = resume['path']
+            send('Continuing from epoch {0} with a changed network\n'.format(resume['epoch']))
+        else:
+            send('Continuing from epoch {0}\n'.format(resume['epoch']))
+    initial_epoch = resume['epoch'] if resume else 0
+
+    artifact_files = None
+    if artifact_cache is not None and properties.get('use_artifact_cache'):
+        artifact_files = builder.artifact_files(properties)
+        if architecture is None:
+            # Only networks built from the canvas record how they were trained
+            del artifact_files[builder.STATE_SUFFIX.lstrip('_')]
+        # A model is only cached once its split exists, so without a split there is nothing to restore. The data is not
+        # read until the cache misses.
+        if os.path.isfile(split_file(properties)):
+            try:
+                metadata = artifact_cache.restore(cache.spec_key(training_spec(properties, dataset_cache)),
+                                                  artifact_files)
+            except (IOError, OSError) as error:
+                logger.warning('Unable to read the artifact cache: {0}'.format(error))
+                metadata = None
+            if metadata is not None:
+                send('Network unchanged since it was trained, restored the trained model (cached)\n')
+                if report is not None:
+                    report({'accuracy': metadata['score']})
+                return metadata['score']
+
+    if properties.get('script') is None:
+        # The GUI only checks the design once the data has been profiled, so check it before the data is parsed
+        problems, _ = check_data(properties, dataset_cache.profile(properties['data_path'], status=send))
+        if problems:
+            raise ValueError('Network does not fit the training data:\n{0}'.format('\n'.join(problems)))
+        check_canceled()
+
+    batch_stream, train_rows, test_rows = open_batches(properties, dataset_cache, send, cancel)
+    check_canceled()
+
+    batch_size = properties.get('batch_size', dataset.DEFAULT_BATCH_SIZE)
+    if batch_size == tuner.AUTO and resume and resume.get('batch_size'):
+        batch_size = resume['batch_size']
+        send('Batch size: {0}, as when the model was saved\n'.format(batch_size))
+    elif batch_size == tuner.AUTO:
+        send(progress.phase(progress.TUNING, 'Choosing batch size...\n'))
+        features, labels = next(iter(batch_stream(train_rows, tuner.SAMPLE_ROWS)))
+        batch_size = tuner.tune(network.build_model(), features, labels,
+                                prefetch_depth=properties['prefetch_depth'],
+                                send=send)
+        check_canceled()
+
+    train_data = prefetch.PrefetchStream(batch_stream(train_rows, batch_size),
+                                         depth=properties['prefetch_depth'],
+                                         num_workers=properties['prefetch_workers'],
+                                         cancel=cancel)
+    test_data = prefetch.PrefetchStream(batch_stream(test_rows, batch_size, shuffle=False),
+                                        depth=properties['prefetch_depth'],
+                                        num_workers=properties['prefetch_workers'],
+                                        cancel=cancel)
+
+    network_callbacks = []
+    details = {'training_size': training_size, 'batch_size': batch_size, 'architecture': architecture,
+               'optimizer': properties.get('optimizer'), 'loss': properties.get('loss')}
+    policy = checkpoint.CheckpointPolicy(properties.get('checkpoint_epochs', checkpoint.DEFAULT_EVERY_EPOCHS),
+                                         properties.get('checkpoint_minutes', checkpoint.DEFAULT_EVERY_MINUTES),
+                                         initial_epoch)
+    try:
+        # Imports Keras, so it is only imported when training
+        from backend import callbacks
+    except ImportError:
+        # Without Keras the prefetch streams still stop the job at the next batch
+        callbacks = None
+    cancel_callback = None
+    if callbacks is not None:
+        network_callbacks.append(callbacks.ProgressCallback(send, record=record))
+        if policy.enabled:
+            network_callbacks.append(callbacks.CheckpointCallback(directory, policy, details, send))
+        if cancel is not None:
+            cancel_callback = callbacks.CancelCallback(cancel,
+                                                       directory if properties.get('save_on_cancel', True) else None,
+                                                       details,
+                                                       send,
+                                                       initial_epoch)
+            network_callbacks.append(cancel_callback)
+
+    send(progress.phase(progress.TRAINING, 'Training network...\n'))
+    try:
+        if warm_start_path:
+            score = network.train_neural_network(train_data, test_data,
+                                                 callbacks=network_callbacks,
+                                                 initial_epoch=initial_epoch,
+                                                 warm_start_path=warm_start_path)
+        else:
+            score = network.train_neural_network(train_data, test_data,
+                                                 callbacks=network_callbacks,
+                                                 resume_path=resume['path'] if resume else None,
+                                                 initial_epoch=initial_epoch)
+    except prefetch.StreamStopped:
+        # Canceled while waiting for a batch, so no batch is in progress
+        raise TrainingCanceled(cancel_callback.stop() if cancel_callback is not None else 'Training canceled')
+    finally:
+        train_data.stop()
+        test_data.stop()
+    check_canceled()
+    # The finished model is saved by the network script, so the checkpoints are no longer needed
+    checkpoint.clear(directory)
+    if architecture is not None:
+        builder.save_state(properties, epoch=int(properties['epochs']), **details)
+    if artifact_files is not None:
+        try:
+            # The split exists now, and may have been made for this run
+            spec = training_spec(properties, dataset_cache)
+            artifact_cache.store(cache.spec_key(spec), artifact_files, score, spec)
+        except (IOError, OSError) as error:
+            logger.warning('Unable to cache the trained model: {0}'.format(error))
+
+    if report is not None:
+        test_metrics = dict(getattr(network, 'test_metrics', None) or {})
+        # Older versions of Keras name the accuracy 'acc'; the score is the accuracy either way
+        test_metrics.pop('acc', None)
+        test_metrics['accuracy'] = score
+        report(test_metrics)
+
+    if train_data.first_batch_time is not None:
+        send('First batch after {0:.2f} s\n'.format(train_data.first_batch_time - submitted))
+    send('Waited {0:.2f} s for training data ({1:.1f} ms per batch)\n'.format(
+        train_data.stall_time, train_data.mean_stall * 1000))
+    return score
+
+
+def calibrate(properties, dataset_cache, send, cancel=None):
+    """
+    Time the network of a canvas with several TensorFlow thread settings, on a sample of its training data,
+    and suggest the fastest setting for this machine. The calling thread's CPU affinity decides how many cores are
+    compared.
+    :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+    :param dataset_cache: (cache.DatasetCache) -> Binary cache of parsed training data
+    :param send: (function) -> Function passed status messages
+    :param cancel: (multiprocessing.Event) -> Optional event that stops the calibration after the current setting
+    :return: (int, int) -> Suggested intra-op and inter-op thread counts
+    """
+    network = load_network(properties)
+
+    batch_stream, train_rows, _ = open_batches(properties, dataset_cache, send, cancel)
+    batch_size = properties.get('batch_size', dataset.DEFAULT_BATCH_SIZE)
+    if batch_size == tuner.AUTO:
+        batch_size = dataset.DEFAULT_BATCH_SIZE
+    features, labels = next(iter(batch_stream(train_rows, tuner.SAMPLE_ROWS)))
+
+    num_cores = len(threads.available_cpus())
+    send(progress.phase(progress.CALIBRATING, 'Calibrating threads on {0} cores...\n'.format(num_cores)))
+    results = tuner.calibrate_threads(network.build_model, features, labels, batch_size,
+                                      threads.candidate_settings(num_cores),
+                                      cancel=cancel)
+    if cancel is not None and cancel.is_set():
+        raise TrainingCanceled('Calibration canceled')
+
+    # The sample is timed, so scale it up to the training set
+    scale = len(train_rows) / float(len(labels))
+    for result in results:
+        send('{0} intra-op, {1} inter-op threads: {2:.2f} s per epoch\n'.format(
+            result['intra_op_threads'], result['inter_op_threads'], result['seconds'] * scale))
+    intra_op_threads, inter_op_threads = tuner.best_threads(results)
+    send('Suggested threads: {0} intra-op, {1} inter-op\n'.format(intra_op_threads, inter_op_threads))
+    return intra_op_threads, inter_op_threads
+
+
+def check_data(properties, data_profile):
+    """
+    Check the network design of a canvas against a profile of its training data
+    :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+    :param data_profile: (profiler.DatasetProfile) -> Profile of the training data
+    :return: (list[string], int) -> Problems that keep the network from training on the data, and the number of
+                                    missing feature values
+    """
+    network_layers = layers.create_layers(properties['layers'])
+    problems = data_profile.check_design(network_layers[0].layer_properties['dimensions'],
+                                         network_layers[-1].layer_properties.get('size'))
+    return problems, int(data_profile.nan_counts[1:].sum())
+
+
+def profile(properties, dataset_cache, send):
+    """
+    Profile the training data of a canvas and report whether the network design fits it. Profiling reads the whole
+    data file, so it runs as a job instead of on the GUI thread; the GUI checks the cached profile afterwards, see
+    `cache.DatasetCache.cached_profile`.
+    :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`
+    :param dataset_cache: (cache.DatasetCache) -> Binary cache of parsed training data
+    :param send: (function) -> Function passed status messages
+    :return: (profiler.DatasetProfile) -> Profile of the training data
+    """
+    data_profile = dataset_cache.profile(properties['data_path'], status=send)
+    problems, missing_features = check_data(properties, data_profile)
+    for problem in problems:
+        send(progress.error(problem))
+    if missing_features:
+        send('{0} feature values are missing\n'.format(missing_features))
+    if not problems:
+        send('Data profiled: {0} rows, {1} features\n'.format(data_profile.num_rows, data_profile.num_features))
+    return data_profile
@@ -0,0 +1,181 @@
+import time
+import logging
+
+import numpy as np
+
+from backend import dataset, threads
+
+AUTO = 'auto'
+CANDIDATES = (16, 32, 64, 128, 256, 512, 1024)
+SAMPLE_ROWS = 2048
+PROBE_STEPS = 5
+MEMORY_LIMIT = 512 * 2 ** 20
+FLOAT_BYTES = 4
+
+logger = logging.getLogger('tuner')
+
+
+def parse_batch_size(value):
+    """
+    :param value: (int or string) -> Batch size property, a number or 'auto'
+    :return: (int or string) -> The batch size as an int, or AUTO
+    """
+    if str(value).strip().lower() == AUTO:
+        return AUTO
+    batch_size = int(value)
+    if batch_size <= 0:
+        raise ValueError('Batch size must be > 0')
+    return batch_size
+
+
+def bytes_per_sample(num_features, unit_counts, prefetch_depth=0):
+    """
+    Estimate the memory each sample of a batch takes while training: its features in the batch being trained on and in
+    every prefetched batch, plus an activation and a gradient for every unit of the network
+    :param num_features: (int) -> Number of features
+    :param unit_counts: (list[int]) -> Number of units in each layer
+    :param prefetch_depth: (int) -> Number of batches prepared ahead of training
+    :return: (int) -> Bytes per sample
+    """
+    return FLOAT_BYTES * (num_features * (1 + prefetch_depth) + 2 * sum(unit_counts))
+
+
+def probe(train_step, features, labels, candidates=CANDIDATES, sample_bytes=0, memory_limit=MEMORY_LIMIT,
+          steps=PROBE_STEPS):
+    """
+    Time a few training steps at each candidate batch size. Each batch size gets one untimed warm-up step first, since
+    the first step of a new batch shape is slower. Batch sizes over the memory limit or larger than the sample are
+    skipped.
+    :param train_step: (function) -> Trains on one batch of features and labels
+    :param features: (numpy.ndarray) -> Sample of the training features
+    :param labels: (numpy.ndarray) -> Labels of the sample
+    :param candidates: (list[int]) -> Batch sizes to try
+    :param sample_bytes: (int) -> Estimated memory per sample, see `bytes_per_sample`
+    :param memory_limit: (int) -> Maximum estimated memory of a batch in bytes
+    :param steps: (int) -> Number of timed steps per batch size
+    :return: (list[dict{'string': object}]) -> For each candidate, in increasing order, its 'batch_size', estimated
+                                                'memory' and 'samples_per_second', which is None if it was skipped
+    """
+    results = []
+    for batch_size in sorted(candidates):
+        result = {'batch_size': batch_size, 'memory': batch_size * sample_bytes, 'samples_per_second': None}
+        results.append(result)
+        if result['memory'] > memory_limit or batch_size > len(labels):
+            continue
+
+        starts = range(0, len(labels) - batch_size + 1, batch_size)
+        batches = [(features[start:start + batch_size], labels[start:start + batch_size]) for start in starts]
+        train_step(*batches[0])
+        start_time = time.perf_counter()
+        for step in range(steps):
+            train_step(*batches[step % len(batches)])
+        elapsed = time.perf_counter() - start_time
+        result['samples_per_second'] = steps * batch_size / max(elapsed, 1e-9)
+    return results
+
+
+def best(results):
+    """
+    :param results: (list[dict{'string': object}]) -> Probe results, see `probe`
+    :return: (int) -> Batch size with the highest throughput, the smallest one on a tie, or None if none was timed
+    """
+    timed = [result for result in results if result['samples_per_second'] is not None]
+    if not timed:
+        return None
+    return max(timed, key=lambda result: (result['samples_per_second'], -result['batch_size']))['batch_size']
+
+
+def best_threads(results):
+    """
+    :param results: (list[dict{'string': object}]) -> Calibration results, see `calibrate_threads`
+    :return: (int, int) -> Fastest intra-op and inter-op thread counts, the fewest threads on a tie
+    """
+    fastest = min(results, key=lambda result: (result['seconds'],
+                                               result['intra_op_threads'] + result['inter_op_threads']))
+    return fastest['intra_op_threads'], fastest['inter_op_threads']
+
+
+def calibrate_threads(build_model, features, labels, batch_size, settings, configure=threads.configure_session,
+                      clear=threads.clear_session, cancel=None):
+    """
+    Time one pass over a sample with each thread setting. Thread pools are created with the session, so every setting
+    gets a new session and a new model, after one untimed warm-up batch.
+    :param build_model: (function) -> Returns a new compiled model
+    :param features: (numpy.ndarray) -> Sample of the training features
+    :param labels: (numpy.ndarray) -> Labels of the sample
+    :param batch_size: (int) -> Batch size
+    :param settings: (list[(int, int)]) -> Intra-op and inter-op thread counts to compare
+    :param configure: (function) -> Creates the session for an intra-op and inter-op thread count
+    :param clear: (function) -> Releases the session
+    :param cancel: (multiprocessing.Event) -> Optional event that stops the calibration after the current setting
+    :return: (list[dict{'string': object}]) -> 'intra_op_threads', 'inter_op_threads' and 'seconds' of each setting
+    """
+    batches = [(features[start:start + batch_size], labels[start:start + batch_size])
+               for start in range(0, len(labels), batch_size)]
+    results = []
+    for intra_op_threads, inter_op_threads in settings:
+        configure(intra_op_threads, inter_op_threads)
+        try:
+            train_step = model_step(build_model())
+            train_step(*batches[0])
+            start_time = time.perf_counter()
+            for batch in batches:
+                train_step(*batch)
+            seconds = time.perf_counter() - start_time
+        finally:
+            clear()
+        results.append({'intra_op_threads': intra_op_threads, 'inter_op_threads': inter_op_threads,
+                        'seconds': seconds})
+        logger.info('{0} intra-op, {1} inter-op threads: {2:.3f} s'.format(intra_op_threads, inter_op_threads, seconds))
+        if cancel is not None and cancel.is_set():
+            break
+    return results
+
+
+def model_step(model):
+    """
+    :param model: (keras.models.Model) -> Compiled model
+    :return: (function) -> Trains the model on one batch, one-hot encoding the labels as training does for
+                           losses other than sparse categorical crossentropy
+    """
+    num_classes = model.output_shape[-1]
+    sparse = 'sparse' in str(model.loss)
+
+    def train_step(features, labels):
+        if not sparse:
+            labels = np.eye(num_classes, dtype=np.float32)[labels.astype(np.int64)]
+        model.train_on_batch(features, labels)
+    return train_step
+
+
+def tune(model, features, labels, prefetch_depth=0, memory_limit=MEMORY_LIMIT, send=None):
+    """
+    Pick the batch size that trains a model fastest on this machine. The model is trained by the probe, so it should be
+    a throwaway copy of the model to train.
+    :param model: (keras.models.Model) -> Compiled model
+    :param features: (numpy.ndarray) -> Sample of the training features
+    :param labels: (numpy.ndarray) -> Labels of the sample
+    :param prefetch_depth: (int) -> Number of batches prepared ahead of training
+    :param memory_limit: (int) -> Maximum estimated memory of a batch in bytes
+    :param send: (function) -> Optional function passed status messages
+    :return: (int) -> Chosen batch size
+    """
+    unit_counts = [int(np.prod(layer.output_shape[1:])) for layer in model.layers]
+    sample_bytes = bytes_per_sample(features.shape[1], unit_counts, prefetch_depth)
+    results = probe(model_step(model), features, labels, sample_bytes=sample_bytes, memory_limit=memory_limit)
+
+    lines = []
+    for result in results:
+        if result['samples_per_second'] is None:
+            lines.append('{0}: skipped'.format(result['batch_size']))
+        else:
+            lines.append('{0}: {1:.0f} samples/s'.format(result['batch_size'], result['samples_per_second']))
+        logger.info('Batch size {0}: {1:.1f} MB, {2} samples/s'.format(result['batch_size'], result['memory'] / 1e6,
+                                                                       result['samples_per_second']))
+
+    batch_size = best(results) or dataset.DEFAULT_BATCH_SIZE
+    logger.info('Chose batch size {0}'.format(batch_size))
+    if send:
+        send('Batch size probe: {0}\n'.format(', '.join(lines)))
+        send('Batch size: {0}\n'.format(batch_size))
+    return batch_size
@@ -0,0 +1,259 @@
+import os
+import time
+import queue
+import functools
+import logging
+import importlib
+import threading
+import multiprocessing
+
+from backend import cache, log_config, progress, ring_buffer, threads, training
+
+PRELOAD_MODULES = ['tensorflow', 'keras']
+# Seconds between checks that the application that started a worker is still running
+PARENT_POLL_INTERVAL = 1.0
+
+DONE = 'done'
+FAILED = 'failed'
+CANCELED = 'canceled'
+
+
+class TrainingWorker(object):
+    """
+    Long-lived training process. The worker imports Keras and TensorFlow once, in the background, as soon as it starts
+    and then trains one job at a time, so a training run does not pay for the imports. The parsed data cache and file
+    fingerprints also stay in memory between jobs.
+
+    Jobs are sent to the worker as dictionaries over a queue:
+        {'type': 'train', 'id': int, 'properties': dict, 'submitted': float, 'intra_op_threads': int,
+         'inter_op_threads': int, 'cpu_affinity': list} -> Train the network of a canvas
+        {'type': 'stop'} -> Exit the worker
+    Status messages are sent back as strings over a pipe, and the outcome of every job as a dictionary over a result
+    queue: {'id': int, 'state': DONE, FAILED or CANCELED, 'score': float, 'metrics': dict}. Canceling a job sets an
+    event that stops the job at the end of its current batch; the worker itself keeps running. A job that does not stop
+    can be abandoned with `restart`. The worker exits on its own if the application that started it exits without
+    stopping it, as when it crashes.
+
+    While training, the worker also writes the loss, accuracy, throughput and memory use of every batch to a shared
+    memory ring buffer, `metrics`, which the GUI and headless monitors read without going through the pipe. The buffer
+    is created when the worker starts and outlives restarts.
+
+    Attributes:
+        connection: (multiprocessing.Connection) -> Parent end of the status pipe
+        metrics: (ring_buffer.MetricsRing) -> Per-batch training metrics, or None if the buffer could not be created or
+                                              the worker is stopped
+        preload: (list[string]) -> Modules imported when the worker starts
+        cache_dir: (string) -> Directory of the parsed data cache
+        artifact_dir: (string) -> Directory of the trained model cache
+        log_queue: (multiprocessing.Queue) -> Queue the worker process sends its log records to, see
+                                              `log_config.configure`, or None to keep the logging it inherits. Unless
+                                              one is given, the queue configured when the process starts.
+        log_level: (int) -> Lowest level the worker process logs, set when the process starts
+        logger: (logging.Logger) -> Worker logger
+    """
+
+    def __init__(self, preload=None, cache_dir=cache.DEFAULT_CACHE_DIR, log_queue=None,
+                 artifact_dir=cache.DEFAULT_ARTIFACT_DIR):
+        self.preload = PRELOAD_MODULES if preload is None else preload
+        self.cache_dir = cache_dir
+        self.artifact_dir = artifact_dir
+        self.log_queue = None
+        self.log_level = None
+        self.__log_queue = log_queue
+        self.logger = logging.getLogger('worker')
+        self.metrics = None
+        self.__process = None
+        self.__parent_pid = None
+        self.__create_channels()
+
+    @property
+    def busy(self):
+        """
+        :return: (boolean) -> True from the time a job is submitted until it finishes or the worker dies
+        """
+        return not self.__idle.is_set() and self.is_alive()
+
+    @property
+    def pid(self):
+        """
+        :return: (int) -> Process id of the worker, or None if it was never started
+        """
+        return None if self.__process is None else self.__process.pid
+
+    def is_alive(self):
+        return self.__process is not None and self.__process.is_alive()
+
+    def start(self):
+        """
+        Start the worker process if it is not already running
+        """
+        if self.is_alive():
+            return
+        if self.metrics is None:
+            try:
+                self.metrics = ring_buffer.MetricsRing.create()
+            except OSError as error:
+                self.logger.warning('Training metrics unavailable: {0}'.format(error))
+        # Logging may be configured, or reconfigured, after the worker is created
+        self.log_queue = self.__log_queue if self.__log_queue is not None else log_config.log_queue()
+        self.log_level = logging.getLogger().getEffectiveLevel()
+        self.__idle.set()
+        self.__parent_pid = os.getpid()
+        # Not daemonic so jobs can parse data in a process pool, so the worker watches the application itself
+        self.__process = multiprocessing.Process(target=self.__run)
+        self.__process.start()
+
+    def submit(self, properties, job_id=None, intra_op_threads=0, inter_op_threads=0, cpu_affinity=None):
+        """
+        Queue a training job, starting the worker first if needed
+        :param properties: (dict{'string': object}) -> Canvas properties set by `Control.set_properties`. If
+                                                       'calibrate' is True, the job times the network with several
+                                                       thread settings instead of training it. If 'profile' is True,
+                                                       the job profiles the training data and checks the network
+                                                       design against it.
+        :param job_id: (int) -> Optional identifier returned with the job's result
+        :param intra_op_threads: (int) -> Threads TensorFlow uses within an operation, 0 for the TensorFlow default
+        :param inter_op_threads: (int) -> Operations TensorFlow runs at once, 0 for the TensorFlow default
+        :param cpu_affinity: (list[int]) -> CPUs the job runs on, or None for every CPU the worker may use
+        """
+        self.start()
+        self.__cancel.clear()
+        self.__idle.clear()
+        self.__jobs.put({
+            'type': 'train',
+            'id': job_id,
+            'properties': properties,
+            'submitted': time.time(),
+            'intra_op_threads': intra_op_threads,
+            'inter_op_threads': inter_op_threads,
+            'cpu_affinity': cpu_affinity,
+        })
+
+    def poll_result(self):
+        """
+        :return: (dict{'string': object}) -> Outcome of a finished job, or None if no job has finished
+        """
+        try:
+            return self.__results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def cancel(self):
+        """
+        Stop the current job at the end of its current batch
+        """
+        if self.busy:
+            self.__cancel.set()
+
+    def stop(self, timeout=5.0):
+        """
+        Stop the worker, terminating it if it does not exit within the timeout, and remove its metrics buffer
+        :param timeout: (float) -> Seconds to wait for the worker to exit
+        """
+        if self.is_alive():
+            self.__cancel.set()
+            self.__jobs.put({'type': 'stop'})
+            self.__process.join(timeout)
+            if self.__process.is_alive():
+                self.__process.terminate()
+        if self.metrics is not None:
+            self.metrics.unlink()
+            self.metrics = None
+
+    def restart(self):
+        """
+        Terminate the worker process, abandoning its current job, and start a new one. This is the fallback for a job
+        that does not stop after being canceled. The pipe, queues and events are replaced since the process may have
+        been terminated while using them.
+        """
+        if self.__process is not None and self.__process.is_alive():
+            self.logger.warning('Terminating training worker {0}'.format(self.__process.pid))
+            self.__process.terminate()
+            self.__process.join()
+        self.__create_channels()
+        self.start()
+
+    def __create_channels(self):
+        """
+        Create the pipe, queues and events shared with the worker process
+        """
+        self.connection, self.__child_connection = multiprocessing.Pipe()
+        self.__jobs = multiprocessing.Queue()
+        self.__results = multiprocessing.Queue()
+        self.__cancel = multiprocessing.Event()
+        self.__idle = multiprocessing.Event()
+        self.__idle.set()
+
+    def __watch_parent(self):
+        """
+        Exit the worker process, and the parsing processes of its job, once the application that started it is gone
+        """
+        while os.getppid() == self.__parent_pid:
+            time.sleep(PARENT_POLL_INTERVAL)
+        for child in multiprocessing.active_children():
+            child.terminate()
+        os._exit(1)
+
+    def __run(self):
+        """
+        Worker process main loop
+        """
+        threading.Thread(target=self.__watch_parent, daemon=True).start()
+        if self.log_queue is not None:
+            log_config.configure_worker(self.log_queue, self.log_level)
+        start_time = time.time()
+        for module in self.preload:
+            try:
+                importlib.import_module(module)
+            except ImportError as error:
+                self.logger.warning('Unable to preload {0}: {1}'.format(module, error))
+        self.logger.debug('Worker ready in {0:.2f} s'.format(time.time() - start_time))
+
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+        artifact_cache = cache.ArtifactCache(self.artifact_dir)
+        default_cpus = threads.available_cpus()
+        while True:
+            job = self.__jobs.get()
+            if job['type'] == 'stop':
+                break
+
+            # A job is only done once training returns; anything else is a failure
+            result = {'id': job['id'], 'state': FAILED, 'score': None, 'metrics': None}
+            try:
+                # TensorFlow's thread pools inherit the affinity when the session is created
+                threads.set_affinity(job['cpu_affinity'] or default_cpus)
+                if job['properties'].get('profile'):
+                    training.profile(job['properties'], dataset_cache, self.__child_connection.send)
+                    result['state'] = DONE
+                elif job['properties'].get('calibrate'):
+                    training.calibrate(job['properties'], dataset_cache, self.__child_connection.send,
+                                       cancel=self.__cancel)
+                    result['state'] = DONE
+                else:
+                    threads.configure_session(job['intra_op_threads'], job['inter_op_threads'])
+                    record = functools.partial(self.metrics.write, job=job['id']) if self.metrics is not None else None
+                    score = training.train(job['properties'], dataset_cache, self.__child_connection.send,
+                                           cancel=self.__cancel,
+                                           submitted=job['submitted'],
+                                           record=record,
+                                           artifact_cache=artifact_cache,
+                                           report=lambda metrics: result.update(metrics=metrics))
+                    result['state'] = DONE
+                    result['score'] = score
+                    self.__child_connection.send(progress.phase(progress.DONE, 'Network trained\n\n'))
+                    self.__child_connection.send('Model accuracy: {0}\n'.format(round(score, 3)))
+            except training.TrainingCanceled as error:
+                result['state'] = CANCELED
+                self.__child_connection.send('{0}\n'.format(error))
+            except Exception as error:
+                # Any error fails the job, not the worker, so the worker stays warm for the next job
+                result['state'] = FAILED
+                self.logger.exception('Job {0} failed'.format(job['id']))
+                self.__child_connection.send(progress.error('An error occurred while training:\n{0}: {1}'.format(
+                    type(error).__name__, error)))
+            finally:
+                threads.clear_session()
+                self.__results.put(result)
+                self.__idle.set()
+
+        self.__child_connection.close()
@@ -241,5 +241,16 @@ class CanvasFrame(object):
                                                           new_optimizer='sgd',
                                                           new_loss='mean_squared_error',
                                                           new_epochs=1,
+                                                          new_streaming=False,
+                                                          new_feature_dtype='auto',
+                                                          new_prefetch_depth=4,
+                                                          new_prefetch_workers=1,
+                                                          new_checkpoint_epochs=1,
+                                                          new_checkpoint_minutes=30,
+                                                          new_save_on_cancel=True,
+                                                          new_batch_size=32,
+                                                          new_intra_op_threads=0,
+                                                          new_inter_op_threads=0,
+                                                          new_cpu_affinity='',
                                                           old_count=old_count)
         self.clear_slots()
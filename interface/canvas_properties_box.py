@@ -14,7 +14,18 @@ DEFAULT_CANVAS_PROPERTIES = {
     'training_size': .5,
     'optimizer': 'sgd',
     'loss': 'mean_squared_error',
-    'epochs': 1
+    'epochs': 1,
+    'streaming': False,
+    'feature_dtype': 'auto',
+    'prefetch_depth': 4,
+    'prefetch_workers': 1,
+    'checkpoint_epochs': 1,
+    'checkpoint_minutes': 30,
+    'save_on_cancel': True,
+    'batch_size': 32,
+    'intra_op_threads': 0,
+    'inter_op_threads': 0,
+    'cpu_affinity': ''
 }
 
 
@@ -199,6 +210,17 @@ class CanvasPropertiesBox(PropertiesBox):
                                new_optimizer=None,
                                new_loss=None,
                                new_epochs=None,
+                               new_streaming=False,
+                               new_feature_dtype='auto',
+                               new_prefetch_depth=4,
+                               new_prefetch_workers=1,
+                               new_checkpoint_epochs=1,
+                               new_checkpoint_minutes=30,
+                               new_save_on_cancel=True,
+                               new_batch_size=32,
+                               new_intra_op_threads=0,
+                               new_inter_op_threads=0,
+                               new_cpu_affinity='',
                                old_count=None):
         """
         Updates the the box_properties to the input values
@@ -210,6 +232,17 @@ class CanvasPropertiesBox(PropertiesBox):
         :param new_optimizer: string - The desired updated value of optimizer
         :param new_loss: string - The desired updated value of loss
         :param new_epochs: int - The desired updated value of epochs
+        :param new_streaming: bool - The desired updated value of streaming
+        :param new_feature_dtype: string - The desired updated value of feature_dtype
+        :param new_prefetch_depth: int - The desired updated value of prefetch_depth
+        :param new_prefetch_workers: int - The desired updated value of prefetch_workers
+        :param new_checkpoint_epochs: int - The desired updated value of checkpoint_epochs
+        :param new_checkpoint_minutes: int - The desired updated value of checkpoint_minutes
+        :param new_save_on_cancel: bool - The desired updated value of save_on_cancel
+        :param new_batch_size: int or str - The desired updated value of batch_size, a number or 'auto'
+        :param new_intra_op_threads: int - The desired updated value of intra_op_threads
+        :param new_inter_op_threads: int - The desired updated value of inter_op_threads
+        :param new_cpu_affinity: str - The desired updated value of cpu_affinity
         :param old_count: int - The previous number of slots on the canvas
         :return: None
         """
@@ -222,6 +255,17 @@ class CanvasPropertiesBox(PropertiesBox):
         self.box_properties['optimizer'] = new_optimizer
         self.box_properties['loss'] = new_loss
         self.box_properties['epochs'] = new_epochs
+        self.box_properties['streaming'] = new_streaming
+        self.box_properties['feature_dtype'] = new_feature_dtype
+        self.box_properties['prefetch_depth'] = new_prefetch_depth
+        self.box_properties['prefetch_workers'] = new_prefetch_workers
+        self.box_properties['checkpoint_epochs'] = new_checkpoint_epochs
+        self.box_properties['checkpoint_minutes'] = new_checkpoint_minutes
+        self.box_properties['save_on_cancel'] = new_save_on_cancel
+        self.box_properties['batch_size'] = new_batch_size
+        self.box_properties['intra_op_threads'] = new_intra_op_threads
+        self.box_properties['inter_op_threads'] = new_inter_op_threads
+        self.box_properties['cpu_affinity'] = new_cpu_affinity
         self.update_text()
         self.update_slots(old_count)
 
@@ -547,6 +591,17 @@ class CanvasProperties(PropertiesEditor):
         self.optimizer = props.box_properties['optimizer']
         self.loss = props.box_properties['loss']
         self.epochs = props.box_properties['epochs']
+        self.streaming = props.box_properties['streaming']
+        self.feature_dtype = props.box_properties['feature_dtype']
+        self.prefetch_depth = props.box_properties['prefetch_depth']
+        self.prefetch_workers = props.box_properties['prefetch_workers']
+        self.checkpoint_epochs = props.box_properties['checkpoint_epochs']
+        self.checkpoint_minutes = props.box_properties['checkpoint_minutes']
+        self.save_on_cancel = props.box_properties['save_on_cancel']
+        self.batch_size = props.box_properties['batch_size']
+        self.intra_op_threads = props.box_properties['intra_op_threads']
+        self.inter_op_threads = props.box_properties['inter_op_threads']
+        self.cpu_affinity = props.box_properties['cpu_affinity']
 
         # Declare all the entry widgets used in the window
         self.canvas_name_entry = None
@@ -557,6 +612,17 @@ class CanvasProperties(PropertiesEditor):
         self.optimizer_entry = None
         self.loss_entry = None
         self.epochs_entry = None
+        self.streaming_entry = None
+        self.feature_dtype_entry = None
+        self.prefetch_depth_entry = None
+        self.prefetch_workers_entry = None
+        self.checkpoint_epochs_entry = None
+        self.checkpoint_minutes_entry = None
+        self.save_on_cancel_entry = None
+        self.batch_size_entry = None
+        self.intra_op_threads_entry = None
+        self.inter_op_threads_entry = None
+        self.cpu_affinity_entry = None
 
         # As optimizer and loss are dropdowns, the available choices must be defined as lists and variables
         # made for the current selection
@@ -567,6 +633,10 @@ class CanvasProperties(PropertiesEditor):
                        'categorical_crossentropy', 'sparse_categorical_crossentropy', 'binary_crossentropy',
                        'kullback_leibler_divergence', 'poisson', 'cosine_proximity']
         self.loss_selected = tk.StringVar()
+        self.streaming_selected = tk.BooleanVar()
+        self.save_on_cancel_selected = tk.BooleanVar()
+        self.feature_dtypes = ['auto', 'uint8', 'int8', 'uint16', 'int16', 'int32', 'float16', 'float32', 'float64']
+        self.feature_dtype_selected = tk.StringVar()
 
         # Define a file path for the program to fall back on if the browser is launched without a valid path
         self.FILE_PATH = os.path.join(os.path.expanduser('~'), 'Desktop')
@@ -574,7 +644,7 @@ class CanvasProperties(PropertiesEditor):
         # Define the configurations available to the browser selection tool
         self.VALID_TYPES = {
             'all': ('all files', '*'),
-            'csv': ('csv', '*.csv'),
+            'csv': ('csv', ('*.csv', '*.csv.zip', '*.csv.gz', '*.csv.bz2', '*.csv.xz')),
             'python': ('Python', '*.py'),
             'h5py': ('h5py', '*.h5py')
         }
@@ -645,19 +715,91 @@ class CanvasProperties(PropertiesEditor):
         self.epochs_entry.grid(row=7, column=1)
         self.epochs_entry.insert(10, self.epochs)
 
+        # Construct the streaming label and checkbox. Streaming reads the training data in chunks instead of all at once
+        tk.Label(self.top_frame, text="Stream Data:").grid(row=8, column=0, sticky=tk.E)
+        self.streaming_entry = tk.Checkbutton(self.top_frame, variable=self.streaming_selected)
+        self.streaming_selected.set(self.streaming)
+        self.streaming_entry.grid(row=8, column=1, sticky=tk.W)
+
+        # Construct the feature type label and the dropdown widget. 'auto' stores each feature in the smallest type that
+        # holds it without loss
+        tk.Label(self.top_frame, text="Feature Type:").grid(row=9, column=0, sticky=tk.E)
+        self.feature_dtype_entry = tk.OptionMenu(self.top_frame, self.feature_dtype_selected, *self.feature_dtypes)
+        self.feature_dtype_selected.set(self.feature_dtype)
+        self.feature_dtype_entry.grid(row=9, column=1)
+
+        # Construct the prefetch depth label and entry widget. This is the number of batches prepared ahead of training
+        tk.Label(self.top_frame, text="Prefetch Depth:").grid(row=10, column=0, sticky=tk.E)
+        self.prefetch_depth_entry = tk.Entry(self.top_frame)
+        self.prefetch_depth_entry.grid(row=10, column=1)
+        self.prefetch_depth_entry.insert(10, self.prefetch_depth)
+
+        # Construct the prefetch workers label and entry widget. This is the number of threads preparing batches
+        tk.Label(self.top_frame, text="Prefetch Workers:").grid(row=11, column=0, sticky=tk.E)
+        self.prefetch_workers_entry = tk.Entry(self.top_frame)
+        self.prefetch_workers_entry.grid(row=11, column=1)
+        self.prefetch_workers_entry.insert(10, self.prefetch_workers)
+
+        # Construct the checkpoint epochs label and entry widget. A checkpoint is saved every this many epochs, 0 for never
+        tk.Label(self.top_frame, text="Checkpoint Epochs:").grid(row=12, column=0, sticky=tk.E)
+        self.checkpoint_epochs_entry = tk.Entry(self.top_frame)
+        self.checkpoint_epochs_entry.grid(row=12, column=1)
+        self.checkpoint_epochs_entry.insert(10, self.checkpoint_epochs)
+
+        # Construct the checkpoint minutes label and entry widget. A checkpoint is saved every this many minutes, 0 for
+        # never
+        tk.Label(self.top_frame, text="Checkpoint Minutes:").grid(row=13, column=0, sticky=tk.E)
+        self.checkpoint_minutes_entry = tk.Entry(self.top_frame)
+        self.checkpoint_minutes_entry.grid(row=13, column=1)
+        self.checkpoint_minutes_entry.insert(10, self.checkpoint_minutes)
+
+        # Construct the save on cancel label and checkbox. A canceled run saves its partially trained model as a
+        # checkpoint so it can be resumed
+        tk.Label(self.top_frame, text="Save On Cancel:").grid(row=14, column=0, sticky=tk.E)
+        self.save_on_cancel_entry = tk.Checkbutton(self.top_frame, variable=self.save_on_cancel_selected)
+        self.save_on_cancel_selected.set(self.save_on_cancel)
+        self.save_on_cancel_entry.grid(row=14, column=1, sticky=tk.W)
+
+        # Construct the batch size label and entry widget. 'auto' measures the fastest batch size before training
+        tk.Label(self.top_frame, text="Batch Size:").grid(row=15, column=0, sticky=tk.E)
+        self.batch_size_entry = tk.Entry(self.top_frame)
+        self.batch_size_entry.grid(row=15, column=1)
+        self.batch_size_entry.insert(10, self.batch_size)
+
+        # Construct the intra-op threads label and entry widget. This is the number of threads TensorFlow uses within
+        # an operation, 0 to share the cores between running jobs
+        tk.Label(self.top_frame, text="Intra-op Threads:").grid(row=16, column=0, sticky=tk.E)
+        self.intra_op_threads_entry = tk.Entry(self.top_frame)
+        self.intra_op_threads_entry.grid(row=16, column=1)
+        self.intra_op_threads_entry.insert(10, self.intra_op_threads)
+
+        # Construct the inter-op threads label and entry widget. This is the number of operations TensorFlow runs at
+        # once, 0 to choose automatically
+        tk.Label(self.top_frame, text="Inter-op Threads:").grid(row=17, column=0, sticky=tk.E)
+        self.inter_op_threads_entry = tk.Entry(self.top_frame)
+        self.inter_op_threads_entry.grid(row=17, column=1)
+        self.inter_op_threads_entry.insert(10, self.inter_op_threads)
+
+        # Construct the CPU affinity label and entry widget. Training runs only on these CPUs, such as "0-3,8", or on
+        # any CPU if blank
+        tk.Label(self.top_frame, text="CPU Affinity:").grid(row=18, column=0, sticky=tk.E)
+        self.cpu_affinity_entry = tk.Entry(self.top_frame)
+        self.cpu_affinity_entry.grid(row=18, column=1)
+        self.cpu_affinity_entry.insert(10, self.cpu_affinity)
+
         # Construct the error widget with a variable to represent the displayed text
         self.error_entry = tk.Label(self.top_frame,
                                     textvariable=self.error_mes,
-                                    fg="red").grid(row=8, column=0, sticky=tk.W, columnspan=2)
+                                    fg="red").grid(row=19, column=0, sticky=tk.W, columnspan=2)
 
         # Construct the Ok and cancel button. Bind the special save configurations function to the OK, and bind the
         # close function to cancel button
         tk.Button(self.top_frame,
                   text="OK",
-                  command=self.save_configurations).grid(row=8, column=2, sticky=tk.E, pady=3)
+                  command=self.save_configurations).grid(row=19, column=2, sticky=tk.E, pady=3)
         tk.Button(self.top_frame,
                   text="Cancel",
-                  command=self.exit).grid(row=8, column=3, sticky=tk.W, pady=3)
+                  command=self.exit).grid(row=19, column=3, sticky=tk.W, pady=3)
 
     def get_file(self):
         """
@@ -790,6 +932,85 @@ class CanvasProperties(PropertiesEditor):
             return
         self.epochs = epochs
 
+        # Store the new streaming selection
+        self.streaming = self.streaming_selected.get()
+
+        # Store the new feature type selected
+        self.feature_dtype = self.feature_dtype_selected.get()
+
+        # Store the new prefetch depth. If it isn't an integer, or if it is out of range, cancel the saving process.
+        prefetch_depth = self.prefetch_depth_entry.get()
+        if not is_integer(prefetch_depth):
+            self.error_mes.set("Prefetch Depth should be an int")
+            return
+        if int(prefetch_depth) < 1 or int(prefetch_depth) > 64:
+            self.error_mes.set("Prefetch Depth should be 1 to 64")
+            return
+        self.prefetch_depth = prefetch_depth
+
+        # Store the new prefetch workers. If it isn't an integer, or if it is out of range, cancel the saving process.
+        prefetch_workers = self.prefetch_workers_entry.get()
+        if not is_integer(prefetch_workers):
+            self.error_mes.set("Prefetch Workers should be an int")
+            return
+        if int(prefetch_workers) < 1 or int(prefetch_workers) > 16:
+            self.error_mes.set("Prefetch Workers should be 1 to 16")
+            return
+        self.prefetch_workers = prefetch_workers
+
+        # Store the new checkpoint epochs. If it isn't an integer, or if it is out of range, cancel the saving process.
+        checkpoint_epochs = self.checkpoint_epochs_entry.get()
+        if not is_integer(checkpoint_epochs):
+            self.error_mes.set("Checkpoint Epochs should be an int")
+            return
+        if int(checkpoint_epochs) < 0 or int(checkpoint_epochs) > 1000:
+            self.error_mes.set("Checkpoint Epochs should be 0 to 1000")
+            return
+        self.checkpoint_epochs = checkpoint_epochs
+
+        # Store the new checkpoint minutes. If it isn't an integer, or if it is out of range, cancel the saving process.
+        checkpoint_minutes = self.checkpoint_minutes_entry.get()
+        if not is_integer(checkpoint_minutes):
+            self.error_mes.set("Checkpoint Minutes should be an int")
+            return
+        if int(checkpoint_minutes) < 0 or int(checkpoint_minutes) > 1440:
+            self.error_mes.set("Checkpoint Minutes should be 0 to 1440")
+            return
+        self.checkpoint_minutes = checkpoint_minutes
+
+        # Store the new save on cancel selection
+        self.save_on_cancel = self.save_on_cancel_selected.get()
+
+        # Store the new batch size. If it isn't 'auto' or an integer in range, cancel the saving process.
+        batch_size = self.batch_size_entry.get().strip()
+        if batch_size != 'auto':
+            if not is_integer(batch_size):
+                self.error_mes.set("Batch Size should be an int or auto")
+                return
+            if int(batch_size) < 1 or int(batch_size) > 65536:
+                self.error_mes.set("Batch Size should be 1 to 65536")
+                return
+        self.batch_size = batch_size
+
+        # Store the new thread counts. If either isn't an integer, or if it is out of range, cancel the saving process.
+        intra_op_threads = self.intra_op_threads_entry.get()
+        inter_op_threads = self.inter_op_threads_entry.get()
+        if not is_integer(intra_op_threads) or not is_integer(inter_op_threads):
+            self.error_mes.set("Threads should be an int")
+            return
+        if not 0 <= int(intra_op_threads) <= 1024 or not 0 <= int(inter_op_threads) <= 1024:
+            self.error_mes.set("Threads should be 0 to 1024")
+            return
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+        # Store the new CPU affinity. If it isn't a list of CPUs and ranges, cancel the saving process.
+        cpu_affinity = self.cpu_affinity_entry.get().strip()
+        if not re.match(r'^(\d+(-\d+)?(\s*,\s*\d+(-\d+)?)*)?$', cpu_affinity):
+            self.error_mes.set("CPU Affinity should look like 0-3,8")
+            return
+        self.cpu_affinity = cpu_affinity
+
         # Call the function of the canvas properties box to save all the new values
         self.props.edit_canvas_attributes(new_canvas_name=self.canvas_name,
                                           new_slot_count=self.slot_count,
@@ -799,6 +1020,17 @@ class CanvasProperties(PropertiesEditor):
                                           new_optimizer=self.optimizer,
                                           new_loss=self.loss,
                                           new_epochs=self.epochs,
+                                          new_streaming=self.streaming,
+                                          new_feature_dtype=self.feature_dtype,
+                                          new_prefetch_depth=self.prefetch_depth,
+                                          new_prefetch_workers=self.prefetch_workers,
+                                          new_checkpoint_epochs=self.checkpoint_epochs,
+                                          new_checkpoint_minutes=self.checkpoint_minutes,
+                                          new_save_on_cancel=self.save_on_cancel,
+                                          new_batch_size=self.batch_size,
+                                          new_intra_op_threads=self.intra_op_threads,
+                                          new_inter_op_threads=self.inter_op_threads,
+                                          new_cpu_affinity=self.cpu_affinity,
                                           old_count=old_count)
 
         # Close the window
@@ -1,8 +1,9 @@
 import tkinter
+import tkinter.simpledialog
 import os
 import pickle
 import webbrowser
-from interface import open_popup
+from interface import open_popup, sweep_popup
 
 
 class Menu(object):
@@ -35,6 +36,14 @@ class Menu(object):
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.destroy)
 
+        # Create the menu under "Train"
+        train_menu = tkinter.Menu(self.menu)
+        self.menu.add_cascade(label="Train", menu=train_menu)
+        train_menu.add_command(label="Continue Training", command=self.continue_training)
+        train_menu.add_command(label="Sweep...", command=self.sweep)
+        train_menu.add_command(label="Cross-Validate...", command=self.cross_validate)
+        train_menu.add_command(label="Calibrate Threads", command=self.calibrate)
+
         # Create the menu under "Help"
         help_menu = tkinter.Menu(self.menu)
         self.menu.add_cascade(label="Help", menu=help_menu)
@@ -62,6 +71,37 @@ class Menu(object):
         """
         open_popup.OpenPopup(self.main_window, self.log)
 
+    def sweep(self):
+        """
+        Open a widget that allows the user to enter the property values of a hyperparameter sweep.
+        :return: None
+        """
+        sweep_popup.SweepPopup(self.main_window, self.log)
+
+    def cross_validate(self):
+        """
+        Ask for the number of folds, then train and test the network on each fold in turn.
+        :return: None
+        """
+        num_folds = tkinter.simpledialog.askinteger('Cross-Validate', 'Number of folds:', parent=self.root,
+                                                    initialvalue=5, minvalue=2)
+        if num_folds is not None:
+            self.main_window.cross_validate(num_folds)
+
+    def continue_training(self):
+        """
+        Train the saved model of the canvas for the epochs added since it was trained.
+        :return: None
+        """
+        self.main_window.continue_model()
+
+    def calibrate(self):
+        """
+        Time the network with several thread settings and report the fastest one.
+        :return: None
+        """
+        self.main_window.calibrate_threads()
+
     @staticmethod
     def open_readme():
         """
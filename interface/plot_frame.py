@@ -0,0 +1,267 @@
+import math
+import tkinter as tk
+
+import numpy as np
+
+from backend import decimation, progress
+
+# Milliseconds between redraws. Metrics arriving in between are only stored, however many there are.
+FRAME_INTERVAL = 100
+# Pixels between the plot and the edges of the canvas
+MARGIN = 6
+
+METRICS = {
+    'loss': (('loss',), ('val_loss',)),
+    'accuracy': (('acc', 'accuracy'), ('val_acc', 'val_accuracy')),
+}
+
+
+class PlotFrame(object):
+
+    def __init__(self, root, assigned_row=5, assigned_col=0, height=160):
+        """
+        Live plot of the training curves. The loss or accuracy of every batch, read from the training workers' metrics
+        buffers, is drawn as a band from the minimum to the maximum of each group of batches with their mean as a line,
+        and the metrics of every epoch as lines on top, solid for training and dashed for validation. Workers without
+        a metrics buffer are plotted from their throttled batch messages instead, which carry the mean of the epoch so
+        far. Batches are placed by their epoch and step, so batches missing from the plot leave gaps rather than
+        shifting the batches after them. The batches are decimated as they arrive, see `decimation.MinMaxSeries`, so a
+        redraw costs the same after a million batches as after ten. The canvas is redrawn at most once every
+        FRAME_INTERVAL milliseconds, and only if something changed. The plot follows the most recently started training
+        job.
+        :param root: tkinter.Widget - Widget that encapsulates this class's widgets.
+        :param assigned_row: int - Row on which the plot will exist on the parent widget (root)
+        :param assigned_col: int - Column on which the plot will exist on the parent widget (root)
+        :param height: int - The initial height of the plot
+        """
+        self.frame = tk.Frame(root, pady=3, padx=3)
+        self.frame.columnconfigure(1, weight=1)
+        self.frame.rowconfigure(1, weight=1)
+        self.frame.grid(row=assigned_row, column=assigned_col, sticky='nsew')
+
+        self.label = tk.Label(self.frame, text='Training', font='Helvetica 12 bold')
+        self.label.grid(row=0, column=0, sticky='w')
+
+        self.metric = tk.StringVar(value='loss')
+        self.metric.trace('w', lambda *args: self.invalidate())
+        self.metric_menu = tk.OptionMenu(self.frame, self.metric, *sorted(METRICS))
+        self.metric_menu.grid(row=0, column=1, sticky='e')
+
+        self.canvas = tk.Canvas(self.frame, height=height, bg='white', highlightthickness=0)
+        self.canvas.grid(row=1, column=0, columnspan=2, sticky='nsew')
+        self.canvas.bind('<Configure>', lambda event: self.invalidate())
+
+        # Canvas items are created once and moved on every redraw
+        self.band = self.canvas.create_polygon(0, 0, 0, 0, fill='#c6dbef', outline='', state=tk.HIDDEN)
+        self.mean_line = self.canvas.create_line(0, 0, 0, 0, fill='#3182bd', state=tk.HIDDEN)
+        self.epoch_line = self.canvas.create_line(0, 0, 0, 0, fill='#e6550d', width=2, state=tk.HIDDEN)
+        self.validation_line = self.canvas.create_line(0, 0, 0, 0, fill='#31a354', width=2, dash=(4, 2),
+                                                       state=tk.HIDDEN)
+        self.top_label = self.canvas.create_text(MARGIN, MARGIN, anchor='nw', font='Helvetica 8')
+        self.bottom_label = self.canvas.create_text(MARGIN, 0, anchor='sw', font='Helvetica 8')
+        self.count_label = self.canvas.create_text(0, 0, anchor='se', font='Helvetica 8')
+
+        self.job = None
+        self.batches = {metric: decimation.MinMaxSeries() for metric in METRICS}
+        self.epochs = {metric: ([], [], []) for metric in METRICS}
+        self.__epoch_starts = {}
+        self.__epoch_steps = {}
+        self.__steps = None
+        self.__sampled = False
+        self.__dirty = False
+        self.__schedule()
+
+    def add_samples(self, samples):
+        """
+        Add the metrics of training batches. Passed to `Control.add_metrics_listener`.
+        :param samples: numpy.recarray - Samples read from the metrics buffers, see `ring_buffer.FIELDS`
+        :return: None
+        """
+        jobs = samples.job[~np.isnan(samples.job)]
+        if len(jobs):
+            self.__follow(int(jobs.max()))
+        if self.job is not None:
+            samples = samples[samples.job == self.job]
+        samples = samples[np.isfinite(samples.epoch) & np.isfinite(samples.step)]
+        if not len(samples):
+            return
+        self.__sampled = True
+        positions = np.empty(len(samples), dtype=np.int64)
+        for epoch in np.unique(samples.epoch):
+            rows = samples.epoch == epoch
+            positions[rows] = self.__position(int(epoch), samples.step[rows].astype(np.int64))
+        self.__add_batches(positions, {'loss': samples.loss, 'accuracy': samples.accuracy})
+
+    def add_message(self, message):
+        """
+        Add the metrics of epoch messages, and of batch messages from workers without a metrics buffer. Passed to
+        `Control.add_progress_listener`.
+        :param message: str or dict - Progress message, see `progress`
+        :return: None
+        """
+        kind = progress.message_type(message)
+        if kind not in (progress.BATCH, progress.EPOCH):
+            return
+        job = message.get('job')
+        if job is not None:
+            self.__follow(job)
+            if job != self.job:
+                return
+
+        if kind == progress.BATCH:
+            self.__steps = message['steps'] or self.__steps
+            if not self.__sampled and message['step']:
+                position = self.__position(message['epoch'], np.array([message['step']]))
+                self.__add_batches(position, {metric: np.array([self.__first_value(message['metrics'], names)])
+                                              for metric, (names, _) in METRICS.items()})
+            return
+
+        if message['epoch'] in self.__epoch_starts:
+            position = self.__epoch_starts[message['epoch']] + self.__epoch_length(message['epoch']) - 1
+        else:
+            position = max(self.batches['loss'].count - 1, 0)
+        for metric, (train_names, validation_names) in METRICS.items():
+            positions, values, validation_values = self.epochs[metric]
+            positions.append(position)
+            values.append(self.__first_value(message['metrics'], train_names))
+            validation_values.append(self.__first_value(message['metrics'], validation_names))
+        self.invalidate()
+
+    def clear(self):
+        """
+        Remove every curve from the plot.
+        :return: None
+        """
+        for series in self.batches.values():
+            series.clear()
+        self.epochs = {metric: ([], [], []) for metric in METRICS}
+        self.__epoch_starts = {}
+        self.__epoch_steps = {}
+        self.__steps = None
+        self.__sampled = False
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Redraw the plot on the next frame.
+        :return: None
+        """
+        self.__dirty = True
+
+    def redraw(self):
+        """
+        Draw the curves of the selected metric to fit the canvas.
+        :return: None
+        """
+        self.__dirty = False
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        metric = self.metric.get()
+        series = self.batches[metric]
+        positions, mins, maxs, means = series.buckets()
+        epoch_positions, epoch_values, validation_values = (np.array(values, dtype=np.float64)
+                                                            for values in self.epochs[metric])
+
+        values = np.concatenate((mins, maxs, epoch_values, validation_values))
+        values = values[np.isfinite(values)]
+        if not len(values) or width <= 2 * MARGIN or height <= 2 * MARGIN:
+            for item in (self.band, self.mean_line, self.epoch_line, self.validation_line):
+                self.canvas.itemconfig(item, state=tk.HIDDEN)
+            self.canvas.itemconfig(self.top_label, text='')
+            self.canvas.itemconfig(self.bottom_label, text='')
+            self.canvas.itemconfig(self.count_label, text='')
+            return
+
+        low, high = values.min(), values.max()
+        if high - low < 1e-12:
+            low, high = low - 0.5, high + 0.5
+        x_scale = (width - 2 * MARGIN) / max(series.count - 1, epoch_positions.max() if len(epoch_positions) else 0, 1)
+        y_scale = (height - 2 * MARGIN) / (high - low)
+
+        def points(xs, ys):
+            keep = np.isfinite(ys)
+            coordinates = np.column_stack((MARGIN + xs[keep] * x_scale, height - MARGIN - (ys[keep] - low) * y_scale))
+            return coordinates.ravel().tolist()
+
+        self.__set_coords(self.band, points(np.r_[positions, positions[::-1]], np.r_[maxs, mins[::-1]]), 3)
+        self.__set_coords(self.mean_line, points(positions, means), 2)
+        self.__set_coords(self.epoch_line, points(epoch_positions, epoch_values), 2)
+        self.__set_coords(self.validation_line, points(epoch_positions, validation_values), 2)
+
+        self.canvas.itemconfig(self.top_label, text='{0} {1:.4g}'.format(metric, high))
+        self.canvas.coords(self.bottom_label, MARGIN, height - MARGIN)
+        self.canvas.itemconfig(self.bottom_label, text='{0:.4g}'.format(low))
+        self.canvas.coords(self.count_label, width - MARGIN, height - MARGIN)
+        self.canvas.itemconfig(self.count_label, text='{0} batches'.format(series.count))
+
+    def __set_coords(self, item, coordinates, min_points):
+        """
+        Move a canvas item to the given coordinates, hiding it if there are too few points to draw it.
+        """
+        if len(coordinates) < 2 * min_points:
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+            return
+        self.canvas.coords(item, *coordinates)
+        self.canvas.itemconfig(item, state=tk.NORMAL)
+
+    def __position(self, epoch, steps):
+        """
+        Number the batches of an epoch from the first batch plotted. An epoch starts after the last epoch before it,
+        whose length is the number of batches per epoch if a batch message gave it, else the last step seen in it.
+        """
+        if epoch not in self.__epoch_starts:
+            previous = [known for known in self.__epoch_starts if known < epoch]
+            if previous:
+                last = max(previous)
+                self.__epoch_starts[epoch] = self.__epoch_starts[last] + self.__epoch_length(last) * (epoch - last)
+            else:
+                self.__epoch_starts[epoch] = 0
+        self.__epoch_steps[epoch] = max(self.__epoch_steps.get(epoch, 0), int(steps.max()))
+        return self.__epoch_starts[epoch] + steps - 1
+
+    def __epoch_length(self, epoch):
+        """
+        Number of batches in an epoch, as far as is known.
+        """
+        return self.__steps or self.__epoch_steps.get(epoch, 1)
+
+    def __add_batches(self, positions, values):
+        """
+        Add batch metrics at their positions, leaving gaps for the batches in between. Positions already plotted are
+        ignored.
+        """
+        start = self.batches['loss'].count
+        keep = positions >= start
+        if not np.any(keep):
+            return
+        positions = positions[keep]
+        for metric, metric_values in values.items():
+            padded = np.full(positions.max() + 1 - start, np.nan)
+            padded[positions - start] = metric_values[keep]
+            self.batches[metric].add(padded)
+        self.invalidate()
+
+    def __follow(self, job):
+        """
+        Start a new plot when a newer training job reports its metrics.
+        """
+        if self.job is None or job > self.job:
+            self.job = job
+            self.clear()
+
+    def __schedule(self):
+        """
+        Redraw the plot every frame in which it changed.
+        """
+        if self.__dirty:
+            self.redraw()
+        self.frame.after(FRAME_INTERVAL, self.__schedule)
+
+    @staticmethod
+    def __first_value(metrics, names):
+        """
+        Get the first metric found under any of the given names, as Keras names accuracy differently across versions.
+        """
+        for name in names:
+            if name in metrics:
+                return float(metrics[name])
+        return math.nan
@@ -1,9 +1,30 @@
 import tkinter as tk
 
+# Milliseconds text is held before being added to the text box, so a burst of messages is inserted at once
+FLUSH_INTERVAL = 100
+DEFAULT_MAX_LINES = 5000
+TAIL_LINES = 200
+# Tag of the lines hidden in tail only mode
+HIDDEN_TAG = 'hidden'
+
 
 class StatusBox(object):
 
-    def __init__(self, root):
+    def __init__(self, root, max_lines=DEFAULT_MAX_LINES, tail_only=False):
+        """
+        Scrolling box of status text. Text added within one FLUSH_INTERVAL is buffered and inserted into the text widget
+        at once, and the oldest lines are removed once the box holds more than `max_lines` lines, so a verbose training
+        run neither slows the GUI down nor grows its memory without limit. In tail only mode the box shows only the last
+        TAIL_LINES lines and always scrolls to the end; the lines before them are hidden, not removed, and show again
+        when tail only mode is turned off.
+        :param root: tkinter.Widget - Widget that encapsulates this class's widgets.
+        :param max_lines: int - Maximum number of lines kept, or None to keep every line
+        :param tail_only: bool - True to start in tail only mode
+        """
+        self.max_lines = max_lines
+        self.pending = []
+        self.__flush_scheduled = False
+
         self.frame = tk.Frame(root, pady=3, padx=3)
         self.frame.columnconfigure(0, weight=1)
         self.frame.rowconfigure(1, weight=1)
@@ -13,8 +34,14 @@ class StatusBox(object):
         self.label = tk.Label(self.frame, text='Status', font='Helvetica 12 bold')
         self.label.grid(row=0, column=0, sticky='w')
 
+        self.tail_selected = tk.BooleanVar(value=tail_only)
+        self.tail_entry = tk.Checkbutton(self.frame, text='Tail only', variable=self.tail_selected,
+                                         command=self.flush)
+        self.tail_entry.grid(row=0, column=0, columnspan=2, sticky='e')
+
         self.text = tk.Text(self.frame)
-        self.text.config(state=tk.DISABLED, wrap=tk.NONE)
+        self.text.config(state=tk.DISABLED, wrap=tk.NONE, font='Helvetica 10')
+        self.text.tag_configure(HIDDEN_TAG, elide=True)
         self.text.grid(row=1, column=0, sticky='nsew')
 
         self.v_scroll = tk.Scrollbar(self.frame, orient=tk.VERTICAL)
@@ -28,47 +55,80 @@ class StatusBox(object):
         self.text.config(xscrollcommand=self.h_scroll.set)
         self.add_text('Welcome to Neuromatic\n')
 
+    @property
+    def tail_only(self):
+        return self.tail_selected.get()
+
+    @tail_only.setter
+    def tail_only(self, status):
+        """
+        Turn tail only mode on or off
+        :param status: bool - True to show only the last TAIL_LINES lines
+        """
+        self.tail_selected.set(status)
+        self.flush()
+
     def add_text(self, text):
         """
-        Append text to the text.
+        Append text to the text. The text is shown on the next flush, at most FLUSH_INTERVAL milliseconds later.
         :param text: String to be added to the status box.
         :return: None
         """
         if type(text) is not str:
             raise TypeError('Value passed to add_text must be a string.')
 
+        self.pending.append(text)
+        if not self.__flush_scheduled:
+            self.__flush_scheduled = True
+            self.frame.after(FLUSH_INTERVAL, self.flush)
+
+    def flush(self):
+        """
+        Insert the buffered text with a single insert, remove the lines over the limit, then hide the lines before the
+        tail in tail only mode.
+        :return: None
+        """
+        self.__flush_scheduled = False
+        text, self.pending = ''.join(self.pending), []
+
+        # Continue the auto scroll if the scroll bars are at the bottom left, or always in tail only mode
+        y_position = self.v_scroll.get()
+        x_position = self.h_scroll.get()
+        follow = self.tail_only or (y_position[1] == 1.0 and x_position[0] == 0.0)
+
         # Enable text edit
-        self.text.config(state=tk.NORMAL, font='Helvetica 10')
-        # Add new text to the bottom
-        self.text.insert(tk.END, text)
+        self.text.config(state=tk.NORMAL)
+        if text:
+            self.text.insert(tk.END, text)
+        # A text ending in a newline ends with an empty line, which is not counted
+        line, column = (int(part) for part in self.text.index('end-1c').split('.'))
+        num_lines = line - (column == 0)
+        if self.max_lines and num_lines > self.max_lines:
+            self.text.delete('1.0', '{0}.0'.format(num_lines - self.max_lines + 1))
+            num_lines = self.max_lines
+        self.text.tag_remove(HIDDEN_TAG, '1.0', tk.END)
+        if self.tail_only and num_lines > TAIL_LINES:
+            self.text.tag_add(HIDDEN_TAG, '1.0', '{0}.0'.format(num_lines - TAIL_LINES + 1))
         # Disable text edit
         self.text.config(state=tk.DISABLED)
 
-        # Get the current position of the scroll bar
-        y_position = self.v_scroll.get()
-        x_position = self.h_scroll.get()
-        # Continue the auto scroll if scroll bar is set to bottom
-        if y_position[1] == 1.0 and x_position[0] == 0.0:
+        if follow:
             # Scroll to the end of the text box
             self.text.see(tk.END)
             self.h_scroll.set(x_position[0], x_position[1])
 
     def clear(self):
-        self.text.delete("1.0", 'End')
-        self.text.destroy()
-        self.text = tk.Text(self.frame)
-        self.text.config(state=tk.DISABLED, wrap=tk.NONE)
-        self.text.grid(row=1, column=0, sticky='nsew')
-
-        self.v_scroll = tk.Scrollbar(self.frame, orient=tk.VERTICAL)
-        self.v_scroll.grid(row=1, column=1, sticky='ns')
-        self.v_scroll.config(command=self.text.yview)
-        self.text.config(yscrollcommand=self.v_scroll.set)
+        """
+        Remove all text, including text not shown yet.
+        :return: None
+        """
+        self.pending = []
+        self.text.config(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.config(state=tk.DISABLED)
+        self.text.xview_moveto(0)
+        self.text.yview_moveto(0)
 
-        self.h_scroll = tk.Scrollbar(self.frame, orient=tk.HORIZONTAL)
-        self.h_scroll.grid(row=2, column=0, sticky='ew')
-        self.h_scroll.config(command=self.text.xview)
-        self.text.config(xscrollcommand=self.h_scroll.set)
 
 if __name__ == '__main__':
     root = tk.Tk()
@@ -0,0 +1,115 @@
+import tkinter
+
+from backend import sweep
+
+
+class SweepPopup(object):
+
+    def __init__(self, main_window, logger):
+        """
+        Popup dialog box used to enter the values of a hyperparameter sweep over the current canvas. Each entry takes a
+        comma separated list of values, such as "sgd, adam", or a range written start:stop:step, such as "50:200:50".
+        Blank entries are not swept.
+        :param main_window: Tkinter.Tk - The main window of the application. Used to manage application data.
+        :param logger: function - The function to which status strings can be passed.
+        """
+
+        # Create a new window for the dialog box
+        self.root = tkinter.Toplevel()
+        self.root.title('Sweep')
+        self.main_window = main_window
+        self.log = logger
+        self.properties = main_window.canvas.get_all_project_properties()
+        # Freezes other windows while this window is open
+        self.root.grab_set()
+        self.top_frame = None
+        self.entries = {}
+        self.reduction_entry = None
+        self.error_mes = tkinter.StringVar()
+        self.config_frames()
+        self.add_widgets()
+
+    def config_frames(self):
+        """
+        Configure the frame positions and sizes on the window.
+        :return: None
+        """
+        self.root.grid_rowconfigure(1, weight=1)
+        self.root.grid_columnconfigure(1, weight=1)
+
+        self.top_frame = tkinter.Frame(self.root, pady=1)
+        self.top_frame.grid(row=0, columnspan=2, sticky='nsew')
+
+    def add_widgets(self):
+        """
+        Add an entry for the optimizer, for the size of every hidden layer and for the percentage of every dropout
+        layer, then the sweep settings.
+        :return: None
+        """
+        rows = [('Optimizers:', 'optimizer', self.properties['optimizer'])]
+        for index, layer in enumerate(self.properties['layers']):
+            if layer['type'] == 'hidden':
+                rows.append(('Layer {0} Sizes:'.format(index + 1), 'layers.{0}.size'.format(index), layer['size']))
+            elif layer['type'] == 'dropout':
+                rows.append(('Layer {0} Dropouts:'.format(index + 1), 'layers.{0}.percentage'.format(index),
+                             layer['percentage']))
+
+        for row, (label, key, value) in enumerate(rows):
+            tkinter.Label(self.top_frame, text=label).grid(row=row, column=0, sticky=tkinter.E)
+            self.entries[key] = tkinter.Entry(self.top_frame)
+            self.entries[key].grid(row=row, column=1)
+            self.entries[key].insert(10, value)
+
+        # Construct the reduction label and entry widget. Each round keeps the best 1/reduction of the configurations
+        row = len(rows)
+        tkinter.Label(self.top_frame, text="Keep 1 in:").grid(row=row, column=0, sticky=tkinter.E)
+        self.reduction_entry = tkinter.Entry(self.top_frame)
+        self.reduction_entry.grid(row=row, column=1)
+        self.reduction_entry.insert(10, sweep.DEFAULT_REDUCTION)
+
+        # Construct the error widget with a variable to represent the displayed text
+        tkinter.Label(self.top_frame,
+                      textvariable=self.error_mes,
+                      fg="red").grid(row=row + 1, column=0, sticky=tkinter.W, columnspan=2)
+        # Create the Ok button
+        tkinter.Button(self.top_frame,
+                       text="OK",
+                       command=self.save_configurations).grid(row=row + 2, column=0, sticky=tkinter.W, pady=3)
+        # Create the Cancel button
+        tkinter.Button(self.top_frame,
+                       text="Cancel",
+                       command=self.exit).grid(row=row + 2, column=1, sticky=tkinter.E, pady=3)
+
+    def exit(self):
+        """
+        Unfreeze root and delete the popup
+        :return: None
+        """
+        self.root.grab_release()
+        self.root.destroy()
+
+    def save_configurations(self):
+        """
+        Parse the entered values and start the sweep.
+        :return: None
+        """
+        grid = {}
+        for key, entry in self.entries.items():
+            try:
+                values = sweep.parse_values(entry.get())
+            except ValueError as error:
+                self.error_mes.set(str(error))
+                return
+            if values:
+                grid[key] = values
+        if not grid:
+            self.error_mes.set("Enter values to sweep")
+            return
+
+        reduction = self.reduction_entry.get()
+        if not reduction.isdigit() or int(reduction) < 2:
+            self.error_mes.set("Keep 1 in should be an int > 1")
+            return
+
+        self.main_window.start_sweep(grid, int(reduction))
+        self.exit()
@@ -1,7 +1,8 @@
+import threading
 import tkinter
 import tkinter.filedialog
 from backend import control
-from interface import buttons, status_box, canvas_frame, menu
+from interface import buttons, status_box, canvas_frame, menu, plot_frame
 
 
 class Window(object):
@@ -28,6 +29,7 @@ class Window(object):
         self.right_frame = None
         self.left_frame = None
         self.status_box = None
+        self.plot = None
         self.canvas = None
 
         # Lambdas used to connect the GUI and Backend
@@ -35,6 +37,11 @@ class Window(object):
         self.create_new_canvas = None
         self.generate_nn_script = None
         self.train_model = None
+        self.resume_model = None
+        self.continue_model = None
+        self.start_sweep = None
+        self.cross_validate = None
+        self.calibrate_threads = None
         self.cancel_training = None
         self.clear_canvas = None
         self.empty_funct = None
@@ -42,6 +49,9 @@ class Window(object):
         # Backend object
         self.control = control.Control()
 
+        # Set by the GUI thread once the messages the pipe reader woke it for have been read
+        self.__drained = threading.Event()
+
         # Configure the window's Tkinter frames
         self.config_frames()
 
@@ -51,6 +61,9 @@ class Window(object):
         # Send initial status to the status box
         self.control.init_status(self.status_box.add_text)
 
+        # Import the training libraries in the background before the first training run
+        self.control.start_worker()
+
     def config_frames(self):
         """
         Configure the window's Tkinter frames for widget organization.
@@ -105,17 +118,23 @@ class Window(object):
                               assigned_row=0,
                               assigned_col=2,
                               sticky='nsew')
+        buttons.GenericButton(root=self.top_frame,
+                              button_label="Resume",
+                              passed_function=self.resume_model,
+                              assigned_row=0,
+                              assigned_col=3,
+                              sticky='nsew')
         buttons.GenericButton(root=self.top_frame,
                               button_label="Cancel",
                               passed_function=self.control.terminate_training,
                               assigned_row=0,
-                              assigned_col=3,
+                              assigned_col=4,
                               sticky='nsew')
         buttons.GenericButton(root=self.top_frame,
                               button_label="Clear Slots",
                               passed_function=self.clear_canvas,
                               assigned_row=0,
-                              assigned_col=4,
+                              assigned_col=5,
                               sticky='nsew')
 
         # Add layer buttons to the right frame. Used for the drag and drop interface.
@@ -160,6 +179,11 @@ class Window(object):
         self.status_box = status_box.StatusBox(self.right_frame)
         self.status_box.frame.grid(row=4, column=0)
 
+        # Add the training plot below the status box, fed by the batch and epoch metrics of the training workers
+        self.plot = plot_frame.PlotFrame(self.right_frame, assigned_row=5, assigned_col=0)
+        self.control.add_metrics_listener(self.plot.add_samples)
+        self.control.add_progress_listener(self.plot.add_message)
+
         # Add the canvas frame to the left frame
         self.canvas = canvas_frame.CanvasFrame(self.left_frame,
                                                logger=self.log,
@@ -180,6 +204,17 @@ class Window(object):
         opt = new_properties['optimizer']
         loss = new_properties['loss']
         ep = new_properties['epochs']
+        stream = new_properties.get('streaming', False)
+        dtype = new_properties.get('feature_dtype', 'auto')
+        depth = new_properties.get('prefetch_depth', 4)
+        workers = new_properties.get('prefetch_workers', 1)
+        checkpoint_epochs = new_properties.get('checkpoint_epochs', 1)
+        checkpoint_minutes = new_properties.get('checkpoint_minutes', 30)
+        save_on_cancel = new_properties.get('save_on_cancel', True)
+        batch_size = new_properties.get('batch_size', 32)
+        intra_op_threads = new_properties.get('intra_op_threads', 0)
+        inter_op_threads = new_properties.get('inter_op_threads', 0)
+        cpu_affinity = new_properties.get('cpu_affinity', '')
 
         # Edit the canvas properties
         self.canvas.canvas_properties_box.edit_canvas_attributes(
@@ -191,6 +226,17 @@ class Window(object):
                                             new_optimizer=opt,
                                             new_loss=loss,
                                             new_epochs=ep,
+                                            new_streaming=stream,
+                                            new_feature_dtype=dtype,
+                                            new_prefetch_depth=depth,
+                                            new_prefetch_workers=workers,
+                                            new_checkpoint_epochs=checkpoint_epochs,
+                                            new_checkpoint_minutes=checkpoint_minutes,
+                                            new_save_on_cancel=save_on_cancel,
+                                            new_batch_size=batch_size,
+                                            new_intra_op_threads=intra_op_threads,
+                                            new_inter_op_threads=inter_op_threads,
+                                            new_cpu_affinity=cpu_affinity,
                                             old_count=old_count
         )
 
@@ -257,6 +303,31 @@ class Window(object):
             self.control.train_in_new_thread()
         )
 
+        self.resume_model = lambda: (
+            self.control.set_properties(self.canvas.get_all_project_properties()),
+            self.control.resume_training()
+        )
+
+        self.continue_model = lambda: (
+            self.control.set_properties(self.canvas.get_all_project_properties()),
+            self.control.continue_training()
+        )
+
+        self.start_sweep = lambda grid, reduction: (
+            self.control.set_properties(self.canvas.get_all_project_properties()),
+            self.control.start_sweep(grid, reduction)
+        )
+
+        self.cross_validate = lambda num_folds: (
+            self.control.set_properties(self.canvas.get_all_project_properties()),
+            self.control.start_cross_validation(num_folds)
+        )
+
+        self.calibrate_threads = lambda: (
+            self.control.set_properties(self.canvas.get_all_project_properties()),
+            self.control.calibrate_threads()
+        )
+
         self.clear_canvas = lambda: (
             self.log('Slots cleared'),
             self.canvas.clear_slots(),
@@ -271,6 +342,7 @@ class Window(object):
         """
         # Check for updates from the backend
         self.__get_status_updates()
+        threading.Thread(target=self.__watch_pipe, name='pipe-reader', daemon=True).start()
         # Starts the main window
         self.root.mainloop()
 
@@ -286,13 +358,38 @@ class Window(object):
 
     def __get_status_updates(self):
         """
-        Checks for updates to the status box from the training process every 500ms.
+        Checks for updates to the status box from the training process every 500ms. Queued jobs are started and
+        stalled jobs are detected on this tick; messages are usually read sooner, see `__watch_pipe`.
+        """
+        self.__read_messages()
+        # Check for backend status every 500ms
+        self.root.after(500, self.__get_status_updates)
+
+    def __read_messages(self):
+        """
+        Read every pending message from the training process and add its text to the status box.
         """
         status = self.control.check_pipe()
         if status:
             self.status_box.add_text(status)
-        # Check for backend status every 500ms
-        self.root.after(500, self.__get_status_updates)
+        self.__drained.set()
+
+    def __watch_pipe(self):
+        """
+        Pipe reader thread. Waits for the training process to send a message and hands the reading over to the GUI
+        thread as soon as it is idle, so messages reach the status box without waiting for the next tick. The thread
+        never reads the pipe itself, and waits for the GUI thread to drain it before waiting for the next message.
+        """
+        while True:
+            if not self.control.wait_for_messages(timeout=1.0):
+                continue
+            self.__drained.clear()
+            try:
+                self.root.after_idle(self.__read_messages)
+            except (RuntimeError, tkinter.TclError):
+                # The window was closed, or Tcl cannot be called from other threads; the 500ms tick still reads
+                return
+            self.__drained.wait()
 
 
 def main():
@@ -14,7 +14,7 @@ setup(
         'sklearn>=0.0',
 	'kiwisolver==1.0.1',
         'tensorflow==1.9.0',
-        'numpy>=1.15.0',
+        'numpy>=1.16.0',
         'scikit-learn>=0.19.2',
         'scipy>=1.1.0',
         'six>=1.11.0',
@@ -1,12 +1,13 @@
 import os
-import subprocess
+import time
 
 from backend import control
 
 project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 properties = {
+    'canvas_name': 'mnist',
     'project_directory': '{0}/files/'.format(project_dir),
-    'data_path': '{0}/files/mnist.csv'.format(project_dir),
+    'data_path': '{0}/files/mnist.csv.zip'.format(project_dir),
     'training_size': 0.8,
     'optimizer': 'adam',
     'loss': 'sparse_categorical_crossentropy',
@@ -25,15 +26,20 @@ properties = {
     ]
 }
 
-# Unzip MNIST dataset
-subprocess.call('unzip {0}/files/mnist.csv.zip -d {0}/files/'.format(project_dir), shell=True)
-
 controller = control.Control()
 controller.init_status(lambda msg: print(msg))
 controller.set_properties(properties)
 controller.generate_network()
+controller.start_worker()
 controller.train_in_new_thread()
 
-# Remove files created while running
-os.remove('{0}/files/mnist.csv'.format(project_dir))
-os.remove('{0}/backend/network.py'.format(project_dir))
\ No newline at end of file
+# Print status messages from the training worker until the job finishes
+while True:
+    status = controller.check_pipe()
+    if status:
+        print(status)
+    elif not controller.training:
+        break
+    else:
+        time.sleep(0.5)
+controller.stop_worker()
\ No newline at end of file
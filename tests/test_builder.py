@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from backend import builder, layers
+
+
+class FakeModel(object):
+
+    def save(self, path):
+        with open(path, 'w') as fd:
+            fd.write('model')
+
+    def save_weights(self, path):
+        with open(path, 'w') as fd:
+            fd.write('weights')
+
+    def to_json(self):
+        return json.dumps({'class_name': 'Sequential'})
+
+
+class TestBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.properties = {
+            'canvas_name': 'test',
+            'project_directory': self.directory,
+            'batch_size': 'auto',
+            'layers': [
+                {'type': 'input', 'dimensions': 3},
+                {'type': 'empty'},
+                {'type': 'hidden', 'size': 10, 'activation': 'relu'},
+                {'type': 'dropout', 'percentage': 0.2},
+                {'type': 'output', 'size': 10, 'activation': 'softmax'},
+            ],
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_network_layers(self):
+        # Act
+        network = builder.Network(self.properties)
+
+        # Assert
+        self.assertEqual([type(layer) for layer in network.layers],
+                         [layers.InputLayer, layers.DenseLayer, layers.DropoutLayer, layers.DenseLayer])
+
+    def test_network_without_layers(self):
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            builder.Network(dict(self.properties, layers=[{'type': 'empty'}]))
+
+    def test_save_artifacts(self):
+        # Act
+        paths = builder.save_artifacts(FakeModel(), self.properties)
+
+        # Assert
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         ['test_model.h5', 'test_weights.h5', 'test_model.json'])
+        self.assertTrue(all(os.path.isfile(path) for path in paths))
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(os.path.basename(path) for path in paths))
+
+    def test_architecture_ignores_typed_text(self):
+        # Arrange
+        typed = dict(self.properties, layers=[dict(layer) for layer in self.properties['layers']])
+        typed['layers'][2]['size'] = '10'
+
+        # Act
+        key = builder.Network(self.properties).architecture
+        typed_key = builder.Network(typed).architecture
+        typed['layers'][2]['size'] = '11'
+        changed_key = builder.Network(typed).architecture
+
+        # Assert
+        self.assertEqual(key, typed_key)
+        self.assertNotEqual(key, changed_key)
+
+    def test_state(self):
+        # Arrange
+        builder.save_artifacts(FakeModel(), self.properties)
+
+        # Act
+        builder.save_state(self.properties, epoch=5, architecture='abc')
+        state = builder.load_state(self.properties)
+
+        # Assert
+        self.assertEqual(state['epoch'], 5)
+        self.assertEqual(state['architecture'], 'abc')
+        self.assertEqual(state['path'], builder.artifact_paths(self.properties)[0])
+
+    def test_state_without_model(self):
+        # Act
+        builder.save_state(self.properties, epoch=5)
+
+        # Assert
+        self.assertIsNone(builder.load_state(self.properties))
+
+    def test_script_batch_size(self):
+        # Arrange
+        properties = dict(self.properties, batch_size='auto')
+        untrained = builder.script_batch_size(properties)
+        builder.save_artifacts(FakeModel(), self.properties)
+        builder.save_state(self.properties, epoch=5, batch_size=256)
+
+        # Act
+        trained = builder.script_batch_size(properties)
+        fixed = builder.script_batch_size(dict(self.properties, batch_size=64))
+
+        # Assert
+        self.assertEqual(untrained, 32)
+        self.assertEqual(trained, 256)
+        self.assertEqual(fixed, 64)
+
+    def test_transfer_weights_same_shape(self):
+        # Arrange
+        source = [[np.ones((3, 4)), np.ones(4)], [np.ones((4, 2)), np.ones(2)]]
+        target = [[np.zeros((3, 4)), np.zeros(4)], [np.zeros((4, 2)), np.zeros(2)]]
+
+        # Act
+        weights, copied, partial = builder.transfer_weights(source, target)
+
+        # Assert
+        self.assertEqual((copied, partial), (2, 0))
+        for layer_weights in weights:
+            self.assertTrue(all((array == 1).all() for array in layer_weights))
+
+    def test_transfer_weights_changed_shape(self):
+        # Arrange
+        source = [[np.ones((3, 4)), np.ones(4)], [np.ones((4, 2)), np.ones(2)]]
+        target = [[np.zeros((3, 6)), np.zeros(6)], [np.zeros((6, 2)), np.zeros(2)], [np.zeros((2, 2))]]
+
+        # Act
+        weights, copied, partial = builder.transfer_weights(source, target)
+
+        # Assert
+        self.assertEqual((copied, partial), (0, 2))
+        self.assertTrue((weights[0][0][:, :4] == 1).all())
+        self.assertTrue((weights[0][0][:, 4:] == 0).all())
+        self.assertTrue((weights[1][0][:4] == 1).all())
+        self.assertTrue((weights[1][0][4:] == 0).all())
+        self.assertTrue((weights[2][0] == 0).all())
+        self.assertTrue((target[0][0] == 0).all())
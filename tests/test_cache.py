@@ -0,0 +1,395 @@
+import os
+import gzip
+import json
+import time
+import shutil
+import tempfile
+import unittest
+import threading
+import multiprocessing
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backend import cache, dataset
+
+
+def load_repeatedly(cache_dir, data_path, times=20):
+    dataset_cache = cache.DatasetCache(cache_dir, num_workers=1)
+    for _ in range(times):
+        dataset_cache.load(data_path)
+
+
+class TestDatasetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        self.data_path = os.path.join(self.directory, 'data.csv')
+        self.data = np.hstack((np.arange(20).reshape(-1, 1) % 3, np.arange(40).reshape(20, 2) / 4.0))
+        pd.DataFrame(self.data, columns=['label', 'a', 'b']).to_csv(self.data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fingerprint(self):
+        # Act
+        data_fingerprint = cache.fingerprint(self.data_path)
+
+        # Assert
+        self.assertEqual(data_fingerprint['path'], os.path.abspath(self.data_path))
+        self.assertEqual(data_fingerprint['size'], os.path.getsize(self.data_path))
+        self.assertEqual(len(data_fingerprint['sha1']), 40)
+
+    def test_load_matches_csv(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertIsInstance(features, np.memmap)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        expected = pd.read_csv(self.data_path).values
+        np.testing.assert_array_equal(features, expected[:, 1:])
+        np.testing.assert_array_equal(labels, expected[:, 0])
+
+    def test_load_reuses_entry(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+        dataset_cache.load(self.data_path)
+        entry = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        created = os.path.getmtime(os.path.join(entry, cache.FEATURES_FILE))
+
+        # Act
+        dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(entry)])
+        self.assertEqual(os.path.getmtime(os.path.join(entry, cache.FEATURES_FILE)), created)
+
+    def test_concurrent_loads_of_one_entry(self):
+        # Arrange
+        cache.DatasetCache(self.cache_dir).load(self.data_path)
+        processes = [multiprocessing.Process(target=load_repeatedly, args=(self.cache_dir, self.data_path))
+                     for _ in range(4)]
+
+        # Act
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        # Assert
+        self.assertEqual([process.exitcode for process in processes], [0] * 4)
+        entry = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        self.assertEqual(sorted(os.listdir(entry)), [cache.FEATURES_FILE, cache.LABELS_FILE, cache.METADATA_FILE])
+
+    def entry_lock(self, dataset_cache):
+        entry = cache.fingerprint_key(dict(dataset_cache.fingerprint(self.data_path), feature_dtype='auto'))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return os.open(os.path.join(self.cache_dir, entry + cache.LOCK_SUFFIX), os.O_CREAT | os.O_RDWR)
+
+    def test_lock_left_by_dead_process(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir, num_workers=1)
+        os.close(self.entry_lock(dataset_cache))
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(len(labels), 20)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_cancel_while_waiting_for_lock(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir, num_workers=1)
+        fd = self.entry_lock(dataset_cache)
+        self.addCleanup(os.close, fd)
+        self.assertTrue(cache._try_lock(fd))
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+
+        # Act/Assert
+        with self.assertRaises(cache.WaitCanceled):
+            dataset_cache.load(self.data_path, cancel=cancel)
+
+    def test_changed_file_creates_new_entry(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+        dataset_cache.load(self.data_path)
+        pd.DataFrame(self.data[:10], columns=['label', 'a', 'b']).to_csv(self.data_path, index=False)
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(len(labels), 10)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_evict_by_age(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir, max_age=60)
+        dataset_cache.load(self.data_path)
+        entry = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        metadata_path = os.path.join(entry, cache.METADATA_FILE)
+        with open(metadata_path) as fd:
+            metadata = json.load(fd)
+        metadata['last_used'] = time.time() - 120
+        with open(metadata_path, 'w') as fd:
+            json.dump(metadata, fd)
+
+        # Act
+        dataset_cache.evict()
+
+        # Assert
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_evict_by_size_keeps_entry_in_use(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir, max_bytes=1)
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertEqual(len(labels), 20)
+
+    def test_load_narrows_types(self):
+        # Arrange
+        frame = pd.DataFrame({'label': [0, 1, 2], 'a': [0, 255, 7], 'b': [1, 2, 3]})
+        frame.to_csv(self.data_path, index=False)
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(features.dtype, np.uint8)
+        self.assertEqual(labels.dtype, np.uint8)
+        np.testing.assert_array_equal(features, frame.values[:, 1:])
+
+    def test_load_declared_type(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path, 'float32')
+
+        # Assert
+        self.assertEqual(features.dtype, np.float32)
+        np.testing.assert_array_equal(features, self.data[:, 1:])
+
+    def test_load_declared_type_too_small(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            dataset_cache.load(self.data_path, 'uint8')
+
+    def test_load_per_column_types(self):
+        # Arrange
+        frame = pd.DataFrame({'label': [0, 1, 2, 1], 'a': [0, 255, 7, 3], 'b': [0.5, 1.25, 2.0, 0.1]})
+        frame.to_csv(self.data_path, index=False)
+        sequential_cache = cache.DatasetCache(os.path.join(self.directory, 'sequential'), num_workers=1)
+        parallel_cache = cache.DatasetCache(os.path.join(self.directory, 'parallel'), num_workers=4)
+
+        # Act
+        features, labels = sequential_cache.load(self.data_path)
+        parallel_features, _ = parallel_cache.load(self.data_path)
+        batch, _ = dataset.ArrayBatchStream(features, labels, [0, 1, 2, 3], shuffle=False)[0]
+
+        # Assert
+        self.assertEqual([features.dtype[name] for name in features.dtype.names], [np.uint8, np.float64])
+        self.assertEqual(features.dtype.itemsize, 9)
+        np.testing.assert_array_equal(parallel_features, features)
+        self.assertEqual(batch.dtype, np.float32)
+        np.testing.assert_array_equal(batch, frame.values[:, 1:].astype(np.float32))
+
+    def test_load_declared_float_type_rounds(self):
+        # Arrange
+        pd.DataFrame({'label': [0, 1], 'a': [0.1, 2.0], 'b': [3, 4]}).to_csv(self.data_path, index=False)
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+        messages = []
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path, 'float16', status=messages.append)
+
+        # Assert
+        self.assertEqual(features.dtype, np.float16)
+        self.assertIn('1 feature columns are rounded by declared feature type float16\n', messages)
+
+    def test_load_declared_float_type_too_small(self):
+        # Arrange
+        pd.DataFrame({'label': [0, 1], 'a': [1e6, 2.0]}).to_csv(self.data_path, index=False)
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            dataset_cache.load(self.data_path, 'float16')
+
+    def test_parallel_load_matches_sequential(self):
+        # Arrange
+        frame = pd.DataFrame(np.random.RandomState(0).randint(0, 300, (400, 5)))
+        frame.to_csv(self.data_path, index=False)
+        sequential_cache = cache.DatasetCache(os.path.join(self.directory, 'sequential'), num_workers=1)
+        parallel_cache = cache.DatasetCache(os.path.join(self.directory, 'parallel'), num_workers=4)
+
+        # Act
+        sequential_features, sequential_labels = sequential_cache.load(self.data_path)
+        parallel_features, parallel_labels = parallel_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(parallel_features.dtype, sequential_features.dtype)
+        np.testing.assert_array_equal(parallel_features, sequential_features)
+        np.testing.assert_array_equal(parallel_labels, sequential_labels)
+
+    def test_load_compressed(self):
+        # Arrange
+        with open(self.data_path, 'rb') as source, gzip.open(self.data_path + '.gz', 'wb') as destination:
+            destination.write(source.read())
+        dataset_cache = cache.DatasetCache(self.cache_dir, num_workers=4)
+
+        # Act
+        features, labels = dataset_cache.load(self.data_path + '.gz')
+
+        # Assert
+        np.testing.assert_array_equal(features, self.data[:, 1:])
+        np.testing.assert_array_equal(labels, self.data[:, 0])
+
+    def test_profile_is_cached(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+        data_profile = dataset_cache.profile(self.data_path)
+        profile_files = sorted(os.listdir(self.cache_dir))
+
+        # Act
+        cached_profile = dataset_cache.profile(self.data_path)
+        dataset_cache.load(self.data_path)
+
+        # Assert
+        self.assertEqual(len(profile_files), 2)
+        self.assertTrue(any(name.endswith(cache.PROFILE_SUFFIX) for name in profile_files))
+        self.assertTrue(any(name.endswith(cache.STAT_SUFFIX) for name in profile_files))
+        self.assertTrue(set(profile_files) <= set(os.listdir(self.cache_dir)))
+        self.assertEqual(cached_profile.labels, data_profile.labels)
+        np.testing.assert_array_equal(cached_profile.mean, np.mean(self.data, axis=0))
+
+    def test_cached_profile_without_reading_file(self):
+        # Arrange
+        dataset_cache = cache.DatasetCache(self.cache_dir)
+        missing_profile = dataset_cache.cached_profile(self.data_path)
+        dataset_cache.profile(self.data_path)
+
+        # Act
+        with mock.patch('backend.cache.open', side_effect=open, create=True) as mock_open:
+            cached_profile = dataset_cache.cached_profile(self.data_path)
+        with open(self.data_path, 'a') as fd:
+            fd.write('1,2,3,4\n')
+        changed_profile = dataset_cache.cached_profile(self.data_path)
+
+        # Assert
+        self.assertIsNone(missing_profile)
+        self.assertEqual(cached_profile.num_rows, len(self.data))
+        self.assertNotIn(self.data_path, [call[0][0] for call in mock_open.call_args_list])
+        self.assertIsNone(changed_profile)
+
+
+class TestArtifactCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.directory, 'artifacts')
+        self.project_dir = os.path.join(self.directory, 'project')
+        os.makedirs(self.project_dir)
+        self.paths = {'model.h5': os.path.join(self.project_dir, 'net_model.h5'),
+                      'model.json': os.path.join(self.project_dir, 'net_model.json')}
+        for name, path in self.paths.items():
+            with open(path, 'w') as fd:
+                fd.write(name * 10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_spec_key_ignores_key_order(self):
+        # Act
+        key1 = cache.spec_key({'epochs': 5, 'layers': [['InputLayer', {'dimensions': 3}]], 'loss': 'mse'})
+        key2 = cache.spec_key({'loss': 'mse', 'layers': [['InputLayer', {'dimensions': 3}]], 'epochs': 5})
+        key3 = cache.spec_key({'loss': 'mse', 'layers': [['InputLayer', {'dimensions': 3}]], 'epochs': 6})
+
+        # Assert
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+
+    def test_restore_missing_entry(self):
+        # Arrange
+        artifact_cache = cache.ArtifactCache(self.cache_dir)
+
+        # Act
+        metadata = artifact_cache.restore('missing', self.paths)
+
+        # Assert
+        self.assertIsNone(metadata)
+
+    def test_store_and_restore(self):
+        # Arrange
+        artifact_cache = cache.ArtifactCache(self.cache_dir)
+        artifact_cache.store('key', self.paths, score=0.75, spec={'epochs': 5})
+        for path in self.paths.values():
+            os.remove(path)
+
+        # Act
+        metadata = artifact_cache.restore('key', self.paths)
+
+        # Assert
+        self.assertEqual(metadata['score'], 0.75)
+        self.assertEqual(metadata['spec'], {'epochs': 5})
+        for name, path in self.paths.items():
+            with open(path, 'r') as fd:
+                self.assertEqual(fd.read(), name * 10)
+
+    def test_restore_leaves_unchanged_files(self):
+        # Arrange
+        artifact_cache = cache.ArtifactCache(self.cache_dir)
+        artifact_cache.store('key', self.paths)
+        os.utime(self.paths['model.h5'], (0, 0))
+
+        # Act
+        artifact_cache.restore('key', self.paths)
+
+        # Assert
+        self.assertEqual(os.path.getmtime(self.paths['model.h5']), 0)
+
+    def test_restore_replaces_changed_files(self):
+        # Arrange
+        artifact_cache = cache.ArtifactCache(self.cache_dir)
+        artifact_cache.store('key', self.paths)
+        with open(self.paths['model.json'], 'w') as fd:
+            fd.write('changed')
+
+        # Act
+        artifact_cache.restore('key', self.paths)
+
+        # Assert
+        with open(self.paths['model.json'], 'r') as fd:
+            self.assertEqual(fd.read(), 'model.json' * 10)
+
+    def test_evict_least_recently_used(self):
+        # Arrange
+        entry_bytes = sum(os.path.getsize(path) for path in self.paths.values())
+        artifact_cache = cache.ArtifactCache(self.cache_dir, max_bytes=2 * entry_bytes)
+        artifact_cache.store('old', self.paths)
+        artifact_cache.store('used', self.paths)
+        time.sleep(0.01)
+        artifact_cache.restore('old', self.paths)
+
+        # Act
+        artifact_cache.store('new', self.paths)
+
+        # Assert
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['new', 'old'])
@@ -0,0 +1,91 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from backend import checkpoint
+
+
+def write_model(path):
+    with open(path, 'w') as fd:
+        fd.write('model')
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.checkpoints = os.path.join(self.directory, 'test_checkpoints')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_checkpoint_dir(self):
+        # Act
+        directory = checkpoint.checkpoint_dir({'project_directory': '/path/to/directory', 'canvas_name': 'test'})
+
+        # Assert
+        self.assertEqual(directory, '/path/to/directory/test_checkpoints')
+
+    def test_latest_without_checkpoint(self):
+        # Assert
+        self.assertIsNone(checkpoint.latest(self.checkpoints))
+
+    def test_save_and_latest(self):
+        # Arrange
+        for epoch in range(1, 5):
+            checkpoint.save(write_model, self.checkpoints, epoch, training_size=0.8)
+
+        # Act
+        state = checkpoint.latest(self.checkpoints)
+
+        # Assert
+        self.assertEqual(state['epoch'], 4)
+        self.assertEqual(state['training_size'], 0.8)
+        self.assertEqual(state['path'], os.path.join(self.checkpoints, 'epoch00004.h5'))
+        self.assertEqual(sorted(os.listdir(self.checkpoints)), ['checkpoint.json', 'epoch00003.h5', 'epoch00004.h5'])
+
+    def test_failed_save_keeps_previous_checkpoint(self):
+        # Arrange
+        checkpoint.save(write_model, self.checkpoints, 1)
+
+        def fail(path):
+            with open(path, 'w') as fd:
+                fd.write('partial')
+            raise IOError('Disk full')
+
+        # Act
+        with self.assertRaises(IOError):
+            checkpoint.save(fail, self.checkpoints, 2)
+
+        # Assert
+        self.assertEqual(checkpoint.latest(self.checkpoints)['epoch'], 1)
+        self.assertFalse(os.path.isfile(os.path.join(self.checkpoints, 'epoch00002.h5')))
+
+    def test_clear(self):
+        # Arrange
+        checkpoint.save(write_model, self.checkpoints, 1)
+
+        # Act
+        checkpoint.clear(self.checkpoints)
+
+        # Assert
+        self.assertIsNone(checkpoint.latest(self.checkpoints))
+
+    def test_policy(self):
+        # Arrange
+        by_epoch = checkpoint.CheckpointPolicy(every_epochs=2, every_minutes=0, initial_epoch=4)
+        by_time = checkpoint.CheckpointPolicy(every_epochs=0, every_minutes=1)
+        disabled = checkpoint.CheckpointPolicy(every_epochs=0, every_minutes=0)
+
+        # Act
+        by_time.last_time = time.time() - 61
+
+        # Assert
+        self.assertFalse(by_epoch.epoch_due(5))
+        self.assertTrue(by_epoch.epoch_due(6))
+        self.assertTrue(by_time.time_due())
+        by_time.saved(1)
+        self.assertFalse(by_time.time_due())
+        self.assertFalse(disabled.enabled)
@@ -1,7 +1,16 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest import mock
 
+import numpy as np
+import pandas as pd
+
 from backend import layers
+from backend import cache
+from backend import builder
+from backend import scheduler
 from backend import control
 
 
@@ -10,11 +19,11 @@ class TestControl(unittest.TestCase):
     def setUp(self):
         self.controller = control.Control()
         self.controller.init_status(lambda msg: msg)
+        self.controller.artifact_cache = mock.Mock(**{'restore.return_value': None})
 
-    @mock.patch('backend.control.shutil')
     @mock.patch('builtins.open')
     @mock.patch('backend.control.os')
-    def test_generate_network(self, mock_os, mock_open, mock_shutil):
+    def test_generate_network(self, mock_os, mock_open):
         # Arrange
         mock_os.path.join.return_value = '/path/to/directory/neuromatic_network.py'
         layer1 = layers.InputLayer({
@@ -42,9 +51,47 @@ class TestControl(unittest.TestCase):
 
         # Assert
         self.assertEqual(mock_open.call_args, mock.call('/path/to/directory/neuromatic_network.py', 'w'))
-        self.assertEqual(mock_open.return_value.__enter__.return_value.write.call_count, 23)
+        self.assertEqual(mock_open.return_value.__enter__.return_value.write.call_count, 38)
         self.assertEquals(log.output, ['INFO:control:\nGenerating network...', 'INFO:control:Network generated'])
 
+    @mock.patch('backend.builder.load_state', return_value=None)
+    @mock.patch('builtins.open')
+    @mock.patch('backend.control.os')
+    def test_generate_network_categorical(self, mock_os, mock_open, mock_load_state):
+        # Arrange
+        mock_os.path.join.return_value = '/path/to/directory/neuromatic_network.py'
+        layer1 = layers.InputLayer({
+            'dimensions': 512
+        })
+        layer2 = layers.DenseLayer({
+            'size': 10,
+            'activation': 'softmax'
+        })
+        self.controller.canvas_properties['canvas_name'] = 'neuromatic'
+        self.controller.canvas_properties['optimizer'] = 'adam'
+        self.controller.canvas_properties['loss'] = 'categorical_crossentropy'
+        self.controller.canvas_properties['metrics'] = ['accuracy']
+        self.controller.canvas_properties['epochs'] = 5
+        self.controller.canvas_properties['batch_size'] = 'auto'
+        self.controller.canvas_properties['project_directory'] = '/path/to/directory'
+        self.controller.layers = [layer1, layer2]
+        self.controller.can_generate = True
+
+        # Act
+        self.controller.generate_network()
+
+        # Assert
+        writes = [call[0][0] for call in mock_open.return_value.__enter__.return_value.write.call_args_list]
+        self.assertIn('def train_neural_network(train_data, test_data, callbacks=None, resume_path=None, initial_epoch=0):\n', writes)
+        self.assertIn('\ttrain_data = ((X, to_categorical(y, 10)) for X, y in train_data)\n', writes)
+        self.assertIn('\tmodel.fit_generator(train_data, steps_per_epoch=train_steps, epochs=5, '
+                      'initial_epoch=initial_epoch, callbacks=callbacks, workers=0)\n', writes)
+        self.assertIn('\t\tmodel = load_model(resume_path)\n\n', writes)
+        self.assertIn('BATCH_SIZE = 32\n\n\n', writes)
+        self.assertIn('\ty_train = to_categorical(y_train, 10)\n', writes)
+        self.assertIn('\tmodel.fit(X_train, y_train, batch_size=BATCH_SIZE, epochs=5, callbacks=callbacks)\n', writes)
+        self.assertIn('\tmodel = build_model()\n\n', writes)
+
     @mock.patch('backend.control.os')
     def test_set_properties_success(self, mock_os):
         # Arrange
@@ -249,6 +296,104 @@ class TestControl(unittest.TestCase):
         self.assertFalse(self.controller.can_train)
         self.assertEqual(log.output, ['ERROR:control:Invalid data file type'])
 
+    def test_set_properties_data_mismatch(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        data_path = os.path.join(directory, 'data.csv')
+        data = np.hstack((np.arange(20).reshape(-1, 1) % 12, np.arange(60).reshape(20, 3)))
+        pd.DataFrame(data, columns=['label', 'a', 'b', 'c']).to_csv(data_path, index=False)
+        self.controller.dataset_cache = cache.DatasetCache(os.path.join(directory, 'cache'))
+        self.controller.dataset_cache.profile(data_path)
+        self.controller.scheduler = mock.Mock()
+        properties = {
+            'canvas_name': 'neuromatic',
+            'project_directory': directory,
+            'data_path': data_path,
+            'training_size': 0.8,
+            'layers': [
+                {
+                    'type': 'input',
+                    'dimensions': 784
+                },
+                {
+                    'type': 'hidden',
+                    'size': 100,
+                    'activation': 'sigmoid',
+                },
+                {
+                    'type': 'output',
+                    'size': 10,
+                    'activation': 'softmax',
+                }
+            ]
+        }
+
+        # Act
+        with self.assertLogs('control', level='DEBUG') as log:
+            self.controller.set_properties(properties)
+
+        # Assert
+        self.assertTrue(self.controller.can_generate)
+        self.assertFalse(self.controller.can_train)
+        self.assertEqual(log.output, [
+            'ERROR:control:Input layer dimensions (784) do not match the number of features in the data (3)',
+            'ERROR:control:Output layer size (10) is too small for labels from 0 to 11',
+        ])
+
+    def test_set_properties_profiles_data_in_background(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        data_path = os.path.join(directory, 'data.csv')
+        pd.DataFrame(np.arange(80).reshape(20, 4), columns=['label', 'a', 'b', 'c']).to_csv(data_path, index=False)
+        self.controller.dataset_cache = mock.Mock(**{'cached_profile.return_value': None})
+        self.controller.scheduler = mock.Mock()
+        properties = {
+            'canvas_name': 'neuromatic',
+            'project_directory': directory,
+            'data_path': data_path,
+            'training_size': 0.8,
+            'layers': [
+                {'type': 'input', 'dimensions': 3},
+                {'type': 'hidden', 'size': 10, 'activation': 'sigmoid'},
+                {'type': 'output', 'size': 3, 'activation': 'softmax'}
+            ]
+        }
+
+        # Act
+        self.controller.set_properties(properties)
+        self.controller.set_properties(properties)
+
+        # Assert
+        # Training jobs check the design themselves, so training is not held back until the profile arrives
+        self.assertTrue(self.controller.can_train)
+        self.controller.dataset_cache.profile.assert_not_called()
+        self.controller.scheduler.submit.assert_called_once_with(self.controller.canvas_properties, name='profile',
+                                                                 overrides={'profile': True})
+
+    def test_train_uses_artifact_cache(self):
+        # Arrange
+        self.controller.scheduler = mock.Mock()
+        self.controller.set_properties({
+            'canvas_name': 'neuromatic',
+            'project_directory': '/tmp',
+            'data_path': '/tmp/missing.csv',
+            'training_size': 0.8,
+            'layers': [
+                {'type': 'input', 'dimensions': 3},
+                {'type': 'hidden', 'size': 10, 'activation': 'sigmoid'},
+                {'type': 'output', 'size': 3, 'activation': 'softmax'}
+            ]
+        })
+
+        # Act
+        self.controller.train_in_new_thread()
+
+        # Assert
+        self.controller.scheduler.submit.assert_called_once_with(self.controller.canvas_properties,
+                                                                 overrides={'use_artifact_cache': True})
+
     def test_sanitize_input(self):
         # Arrange
         string1 = 'Remove these characters;`\'\"|\n\t#'
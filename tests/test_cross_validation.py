@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from backend import cross_validation, scheduler
+
+
+class FakeScheduler(object):
+
+    def __init__(self, num_slots=2):
+        self.num_slots = num_slots
+        self.jobs = []
+
+    def submit(self, properties, name=None):
+        job = scheduler.Job(len(self.jobs) + 1, name, properties)
+        self.jobs.append(job)
+        return job
+
+    def cancel(self, job_id=None):
+        for job in self.jobs:
+            if job.id == job_id:
+                job.state = scheduler.CANCELED
+
+    def finish(self, score, metrics=None):
+        for job in self.jobs:
+            if job.active:
+                job.state = scheduler.DONE
+                job.score = score(job.properties)
+                job.metrics = metrics(job.properties) if metrics else None
+
+
+class TestCrossValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.properties = {
+            'canvas_name': 'test',
+            'project_directory': self.directory,
+            'epochs': 3,
+        }
+        self.scheduler = FakeScheduler()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_too_few_folds(self):
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            cross_validation.CrossValidation(self.properties, 1, self.scheduler)
+
+    def test_start_queues_every_fold(self):
+        # Arrange
+        validation = cross_validation.CrossValidation(self.properties, 4, self.scheduler)
+
+        # Act
+        validation.start()
+
+        # Assert
+        self.assertEqual(len(self.scheduler.jobs), 4)
+        self.assertEqual([job.properties['fold'] for job in self.scheduler.jobs], [0, 1, 2, 3])
+        self.assertTrue(all(job.properties['num_folds'] == 4 for job in self.scheduler.jobs))
+        self.assertTrue(all(job.properties['split_name'] == 'test' for job in self.scheduler.jobs))
+        self.assertEqual(self.scheduler.jobs[0].properties['canvas_name'], 'test_fold1')
+
+    def test_reports_mean_and_deviation(self):
+        # Arrange
+        validation = cross_validation.CrossValidation(self.properties, 2, self.scheduler)
+        validation.start()
+        self.assertEqual(validation.poll(), ['Cross-validating with 2 folds, 2 at a time\n'])
+
+        # Act
+        self.scheduler.finish(lambda properties: 0.5 + 0.25 * properties['fold'],
+                              lambda properties: {'loss': 1.0 - 0.5 * properties['fold'], 'mae': 0.25})
+        messages = validation.poll()
+
+        # Assert
+        self.assertTrue(validation.finished)
+        self.assertIn('Cross-validation finished: accuracy 0.625 +/- 0.125, loss 0.750 +/- 0.250, mae 0.250 +/- 0.000 '
+                      'over 2 of 2 folds\n', messages)
+        results = pd.read_csv(validation.results_path)
+        self.assertEqual(list(results.columns), ['fold', 'accuracy', 'loss', 'mae'])
+        self.assertEqual(list(results['accuracy']), [0.5, 0.75])
+        self.assertEqual(list(results['loss']), [1.0, 0.5])
+
+    def test_reports_serial_folds(self):
+        # Arrange
+        validation = cross_validation.CrossValidation(self.properties, 3, FakeScheduler(num_slots=1))
+
+        # Act
+        validation.start()
+        messages = validation.poll()
+
+        # Assert
+        self.assertEqual(messages[0], 'Cross-validating with 3 folds, 1 at a time\n')
+        self.assertIn('fewer than 8 cores', messages[1])
+
+    def test_cancel(self):
+        # Arrange
+        validation = cross_validation.CrossValidation(self.properties, 3, self.scheduler)
+        validation.start()
+
+        # Act
+        validation.cancel()
+
+        # Assert
+        self.assertTrue(validation.finished)
+        self.assertTrue(all(job.state == scheduler.CANCELED for job in self.scheduler.jobs))
+        self.assertFalse(os.path.isfile(validation.results_path))
@@ -0,0 +1,194 @@
+import os
+import bz2
+import gzip
+import lzma
+import shutil
+import zipfile
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend import dataset
+
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.directory, 'data.csv')
+        self.data = np.hstack((np.arange(50).reshape(-1, 1) % 10, np.arange(150).reshape(50, 3)))
+        pd.DataFrame(self.data, columns=['label', 'a', 'b', 'c']).to_csv(self.data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_count_rows(self):
+        # Act
+        num_rows = dataset.count_rows(self.data_path, chunk_size=7)
+
+        # Assert
+        self.assertEqual(num_rows, 50)
+
+    def test_split_indices(self):
+        # Act
+        train, test = dataset.split_indices(50, 0.8, seed=0)
+
+        # Assert
+        self.assertEqual(len(train), 40)
+        self.assertEqual(len(test), 10)
+        np.testing.assert_array_equal(np.sort(np.concatenate((train, test))), np.arange(50))
+
+    def test_load_split_reuses_saved_split(self):
+        # Arrange
+        split_path = os.path.join(self.directory, 'canvas_split.npz')
+        train, test = dataset.load_split(split_path, 50, 0.8)
+
+        # Act
+        reused_train, reused_test = dataset.load_split(split_path, 50, 0.8)
+        new_train, new_test = dataset.load_split(split_path, 50, 0.5)
+
+        # Assert
+        np.testing.assert_array_equal(reused_train, train)
+        np.testing.assert_array_equal(reused_test, test)
+        self.assertEqual(len(new_train), 25)
+
+    def test_fold_assignment(self):
+        # Act
+        assignment = dataset.fold_assignment(52, 5, seed=0)
+
+        # Assert
+        self.assertEqual(sorted(np.bincount(assignment)), [10, 10, 10, 11, 11])
+        with self.assertRaises(ValueError):
+            dataset.fold_assignment(52, 1)
+
+    def test_fold_rows_cover_every_row_once(self):
+        # Arrange
+        assignment = dataset.load_folds(os.path.join(self.directory, 'canvas_folds.npz'), 50, 5)
+
+        # Act
+        folds = [dataset.fold_rows(assignment, fold) for fold in range(5)]
+
+        # Assert
+        np.testing.assert_array_equal(np.sort(np.concatenate([test for _, test in folds])), np.arange(50))
+        for train, test in folds:
+            self.assertEqual(len(train) + len(test), 50)
+            self.assertFalse(set(train) & set(test))
+
+    def test_load_folds_reuses_saved_folds(self):
+        # Arrange
+        folds_path = os.path.join(self.directory, 'canvas_folds.npz')
+        assignment = dataset.load_folds(folds_path, 50, 5)
+
+        # Act
+        reused = dataset.load_folds(folds_path, 50, 5)
+        changed = dataset.load_folds(folds_path, 50, 4)
+
+        # Assert
+        np.testing.assert_array_equal(reused, assignment)
+        self.assertEqual(changed.max(), 3)
+
+    def test_array_batch_stream(self):
+        # Arrange
+        train, test = dataset.split_indices(50, 0.8, seed=0)
+        features, labels = self.data[:, 1:].astype(np.uint8), self.data[:, 0]
+        stream = dataset.ArrayBatchStream(features, labels, train, batch_size=16)
+
+        # Act
+        batches = [next(stream) for _ in range(len(stream))]
+
+        # Assert
+        self.assertEqual(len(stream), 3)
+        self.assertEqual(batches[0][0].dtype, np.float32)
+        self.assertEqual([len(y) for X, y in batches], [16, 16, 8])
+        self.assertEqual(sorted(np.concatenate([y for X, y in batches])), sorted(labels[train]))
+        self.assertEqual(len(next(stream)[1]), 16)
+
+    def test_csv_batch_stream_epoch(self):
+        # Arrange
+        train, test = dataset.split_indices(50, 0.8, seed=0)
+        mask = dataset.indices_mask(train, 50)
+        stream = dataset.CsvBatchStream(self.data_path, mask, batch_size=16, chunk_size=7, shuffle=False)
+
+        # Act
+        batches = list(stream.epoch())
+
+        # Assert
+        self.assertEqual(len(stream), 3)
+        self.assertEqual(len(batches), 3)
+        self.assertEqual([len(y) for X, y in batches], [16, 16, 8])
+        X = np.vstack([X for X, y in batches])
+        y = np.concatenate([y for X, y in batches])
+        np.testing.assert_array_equal(X, self.data[mask, 1:])
+        np.testing.assert_array_equal(y, self.data[mask, 0])
+
+    def test_csv_batch_stream_repeats(self):
+        # Arrange
+        mask = np.ones(50, dtype=bool)
+        stream = dataset.CsvBatchStream(self.data_path, mask, batch_size=20, chunk_size=7)
+
+        # Act
+        sizes = [len(next(stream)[1]) for _ in range(6)]
+
+        # Assert
+        self.assertEqual(sizes, [20, 20, 10, 20, 20, 10])
+
+    def test_narrowest_dtype(self):
+        # Assert
+        self.assertEqual(dataset.narrowest_dtype(0, 255, True, True), np.uint8)
+        self.assertEqual(dataset.narrowest_dtype(-1, 127, True, True), np.int8)
+        self.assertEqual(dataset.narrowest_dtype(0, 70000, True, True), np.uint32)
+        self.assertEqual(dataset.narrowest_dtype(0.0, 1.0, False, True), np.float32)
+        self.assertEqual(dataset.narrowest_dtype(0.0, 0.1, False, False), np.float64)
+
+    def test_scan_dtypes(self):
+        # Arrange
+        frame = pd.DataFrame({
+            'label': [0, 1, 2, 9],
+            'pixel': [0, 255, 128, 3],
+            'signed': [-300, 5, 0, 1],
+            'half': [0.5, 0.25, np.nan, 1.0],
+            'precise': [0.1, 0.2, 0.3, 0.4],
+        })
+        frame.to_csv(self.data_path, index=False)
+
+        # Act
+        num_rows, dtypes = dataset.scan_dtypes(self.data_path, chunk_size=3)
+
+        # Assert
+        self.assertEqual(num_rows, 4)
+        self.assertEqual(dtypes, [np.uint8, np.uint8, np.int16, np.float32, np.float64])
+
+    def test_is_supported(self):
+        # Assert
+        self.assertTrue(dataset.is_supported('/path/to/file.csv'))
+        self.assertTrue(dataset.is_supported('/path/to/file.CSV.GZ'))
+        self.assertTrue(dataset.is_supported('/path/to/file.csv.zip'))
+        self.assertFalse(dataset.is_supported('/path/to/file.xls'))
+        self.assertFalse(dataset.is_supported('/path/to/file.gz'))
+
+    def test_open_compressed_data(self):
+        # Arrange
+        with open(self.data_path, 'rb') as fd:
+            content = fd.read()
+        paths = []
+        for extension, opener in (('.gz', gzip.open), ('.bz2', bz2.open), ('.xz', lzma.open)):
+            paths.append(self.data_path + extension)
+            with opener(paths[-1], 'wb') as fd:
+                fd.write(content)
+        paths.append(self.data_path + '.zip')
+        with zipfile.ZipFile(paths[-1], 'w') as archive:
+            archive.writestr('__MACOSX/._data.csv', b'junk')
+            archive.writestr('data.csv', content)
+
+        for path in paths:
+            # Act
+            with dataset.open_data(path) as fd:
+                data = fd.read()
+            stream = dataset.CsvBatchStream(path, np.ones(50, dtype=bool), batch_size=50, chunk_size=7, shuffle=False)
+
+            # Assert
+            self.assertEqual(data, content)
+            self.assertEqual(dataset.count_rows(path, chunk_size=7), 50)
+            np.testing.assert_array_equal(next(stream)[0], self.data[:, 1:])
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from backend import decimation
+
+
+class TestMinMaxSeries(unittest.TestCase):
+
+    def test_keeps_values_until_full(self):
+        # Arrange
+        series = decimation.MinMaxSeries(capacity=8)
+
+        # Act
+        series.add([3.0, 1.0])
+        series.add(2.0)
+        positions, mins, maxs, means = series.buckets()
+
+        # Assert
+        self.assertEqual(series.width, 1)
+        self.assertEqual(list(positions), [0, 1, 2])
+        self.assertEqual(list(mins), [3.0, 1.0, 2.0])
+        self.assertEqual(list(maxs), [3.0, 1.0, 2.0])
+
+    def test_merges_buckets_and_keeps_spikes(self):
+        # Arrange
+        series = decimation.MinMaxSeries(capacity=16)
+        values = np.ones(100000)
+        values[12345] = 50.0
+        values[67890] = -50.0
+
+        # Act
+        for chunk in np.array_split(values, 37):
+            series.add(chunk)
+        positions, mins, maxs, means = series.buckets()
+
+        # Assert
+        self.assertEqual(series.count, 100000)
+        self.assertLessEqual(len(series), 16)
+        self.assertEqual(series.width, 8192)
+        self.assertEqual(maxs.max(), 50.0)
+        self.assertEqual(mins.min(), -50.0)
+        self.assertEqual(np.count_nonzero(means != 1.0), 2)
+
+    def test_skips_nan(self):
+        # Arrange
+        series = decimation.MinMaxSeries(capacity=4)
+
+        # Act
+        series.add([np.nan, 1.0, np.nan, 3.0])
+        positions, mins, maxs, means = series.buckets()
+        series.clear()
+
+        # Assert
+        self.assertEqual(list(positions), [1, 3])
+        self.assertEqual(list(means), [1.0, 3.0])
+        self.assertEqual(len(series), 0)
+        self.assertEqual(series.count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
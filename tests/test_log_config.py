@@ -0,0 +1,91 @@
+import os
+import gzip
+import shutil
+import logging
+import tempfile
+import unittest
+import multiprocessing
+
+from backend import log_config
+
+
+def log_from_worker(queue):
+    log_config.configure_worker(queue, 'info')
+    logging.getLogger('worker').info('Message from the worker')
+    logging.getLogger('worker').debug('Hidden worker message')
+
+
+class TestLogConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        root = logging.getLogger()
+        self.root_handlers, self.root_level = list(root.handlers), root.level
+
+    def tearDown(self):
+        log_config.shutdown()
+        root = logging.getLogger()
+        root.handlers[:] = self.root_handlers
+        root.setLevel(self.root_level)
+        shutil.rmtree(self.directory)
+
+    def read_log(self):
+        with open(os.path.join(self.directory, log_config.LOG_FILE)) as fd:
+            return fd.read()
+
+    def test_collects_worker_logs(self):
+        # Arrange
+        log_config.configure(level='info', log_dir=self.directory)
+
+        # Act
+        logging.getLogger('control').info('Message from the GUI')
+        logging.getLogger('control').debug('Hidden GUI message')
+        process = multiprocessing.Process(target=log_from_worker, args=(log_config.log_queue(),))
+        process.start()
+        process.join()
+        log_config.shutdown()
+        log = self.read_log()
+
+        # Assert
+        self.assertIn('[control     ][INFO    ] Message from the GUI', log)
+        self.assertIn('[worker      ][INFO    ] Message from the worker', log)
+        self.assertNotIn('Hidden', log)
+        self.assertIsNone(log_config.log_queue())
+
+    def test_set_level(self):
+        # Arrange
+        log_config.configure(level='warning', log_dir=self.directory)
+
+        # Act
+        logging.getLogger('scheduler').info('Not logged')
+        log_config.set_level('info')
+        logging.getLogger('scheduler').info('Logged')
+        log_config.shutdown()
+
+        # Assert
+        self.assertNotIn('Not logged', self.read_log())
+        self.assertIn('Logged', self.read_log())
+        with self.assertRaises(ValueError):
+            log_config.parse_level('loud')
+
+    def test_compresses_rotated_logs(self):
+        # Arrange
+        path = os.path.join(self.directory, log_config.LOG_FILE)
+        handler = log_config.CompressingRotatingFileHandler(path, max_bytes=200, backup_count=2)
+        record = logging.LogRecord('test', logging.INFO, __file__, 1, 'x' * 150, None, None)
+
+        # Act
+        for _ in range(4):
+            handler.emit(record)
+        handler.close()
+
+        # Assert
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         [log_config.LOG_FILE, log_config.LOG_FILE + '.1.gz', log_config.LOG_FILE + '.2.gz'])
+        with gzip.open(path + '.1.gz', 'rt') as fd:
+            self.assertIn('x' * 150, fd.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backend import parallel_csv
+
+
+class TestParallelCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.directory, 'data.csv')
+        random = np.random.RandomState(0)
+        self.frame = pd.DataFrame({
+            'label': random.randint(0, 10, 500),
+            'pixel': random.randint(0, 256, 500),
+            'signed': random.randint(-1000, 1000, 500),
+            'value': random.rand(500),
+        })
+        self.frame.to_csv(self.data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_split_ranges(self):
+        # Act
+        ranges = parallel_csv.split_ranges(self.data_path, 7)
+
+        # Assert
+        with open(self.data_path, 'rb') as fd:
+            content = fd.read()
+        self.assertEqual(len(ranges), 7)
+        self.assertEqual(ranges[0][0], content.index(b'\n') + 1)
+        self.assertEqual(ranges[-1][1], len(content))
+        for (start, end), (next_start, _) in zip(ranges[:-1], ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(content[end - 1:end], b'\n')
+
+    def test_scan(self):
+        # Arrange
+        reader = parallel_csv.ParallelCsvReader(self.data_path, num_workers=2, range_size=1024)
+        self.addCleanup(reader.close)
+
+        # Act
+        num_rows, dtypes = reader.scan()
+
+        # Assert
+        self.assertGreater(len(reader.ranges), 2)
+        self.assertEqual(num_rows, 500)
+        self.assertEqual(dtypes, [np.uint8, np.uint8, np.int16, np.float64])
+
+    def test_read_into_matches_read_csv(self):
+        # Arrange
+        reader = parallel_csv.ParallelCsvReader(self.data_path, num_workers=3, range_size=1024)
+        num_rows, dtypes = reader.scan()
+        features_path = os.path.join(self.directory, 'features.npy')
+        labels_path = os.path.join(self.directory, 'labels.npy')
+        np.lib.format.open_memmap(features_path, mode='w+', dtype=np.float64, shape=(num_rows, 3))
+        np.lib.format.open_memmap(labels_path, mode='w+', dtype=np.float64, shape=(num_rows,))
+
+        # Act
+        reader.read_into(features_path, labels_path)
+
+        # Assert
+        expected = pd.read_csv(self.data_path).values
+        np.testing.assert_array_equal(np.load(features_path), expected[:, 1:])
+        np.testing.assert_array_equal(np.load(labels_path), expected[:, 0])
+
+    def test_parses_each_range_once(self):
+        # Arrange
+        reader = parallel_csv.ParallelCsvReader(self.data_path, num_workers=1, range_size=1024,
+                                                temp_dir=self.directory)
+        features_path = os.path.join(self.directory, 'features.npy')
+        labels_path = os.path.join(self.directory, 'labels.npy')
+
+        # Act
+        with mock.patch.object(parallel_csv, '_parse_range', wraps=parallel_csv._parse_range) as parse_range:
+            num_rows, dtypes = reader.scan()
+            np.lib.format.open_memmap(features_path, mode='w+', dtype=np.float64, shape=(num_rows, 3))
+            np.lib.format.open_memmap(labels_path, mode='w+', dtype=np.float64, shape=(num_rows,))
+            reader.read_into(features_path, labels_path)
+
+        # Assert
+        self.assertEqual(parse_range.call_count, len(reader.ranges))
+        np.testing.assert_array_equal(np.load(features_path), pd.read_csv(self.data_path).values[:, 1:])
+        self.assertEqual(sorted(os.listdir(self.directory)), ['data.csv', 'features.npy', 'labels.npy'])
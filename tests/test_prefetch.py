@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from backend import dataset, prefetch
+
+
+class FailingStream(object):
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        raise ValueError('Bad batch')
+
+    def on_epoch_end(self):
+        pass
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.features = np.arange(200).reshape(100, 2)
+        self.labels = np.arange(100)
+
+    def test_prefetch_yields_every_batch_each_epoch(self):
+        # Arrange
+        stream = dataset.ArrayBatchStream(self.features, self.labels, np.arange(100), batch_size=16)
+        prefetched = prefetch.PrefetchStream(stream, depth=2, num_workers=3)
+
+        # Act
+        epochs = []
+        for _ in range(3):
+            labels = np.concatenate([next(prefetched)[1] for _ in range(len(prefetched))])
+            epochs.append(sorted(labels))
+        prefetched.stop()
+
+        # Assert
+        self.assertEqual(len(prefetched), 7)
+        for labels in epochs:
+            self.assertEqual(labels, list(range(100)))
+        self.assertEqual(prefetched.batches, 21)
+        self.assertGreaterEqual(prefetched.stall_time, 0.0)
+
+    def test_prefetch_sequential_stream(self):
+        # Arrange
+        stream = iter([(np.zeros((2, 2)), np.array([index, index])) for index in range(5)])
+        prefetched = prefetch.PrefetchStream(stream, num_workers=4)
+
+        # Act
+        labels = [next(prefetched)[1][0] for _ in range(5)]
+        prefetched.stop()
+
+        # Assert
+        self.assertFalse(prefetched.indexable)
+        self.assertEqual(prefetched.num_workers, 1)
+        self.assertEqual(labels, [0, 1, 2, 3, 4])
+
+    def test_prefetch_raises_stream_errors(self):
+        # Arrange
+        prefetched = prefetch.PrefetchStream(FailingStream())
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            next(prefetched)
+        prefetched.stop()
@@ -0,0 +1,108 @@
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backend import profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.directory, 'data.csv')
+        random = np.random.RandomState(0)
+        self.frame = pd.DataFrame({
+            'label': np.arange(100) % 10,
+            'a': random.normal(1e6, 1.0, 100),
+            'b': random.randint(0, 255, 100).astype(float),
+        })
+        self.frame.loc[[3, 50], 'b'] = np.nan
+        self.frame.to_csv(self.data_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_profile_csv(self):
+        # Act
+        data_profile = profiler.profile_csv(self.data_path, chunk_size=7)
+
+        # Assert
+        values = self.frame.values
+        self.assertEqual(data_profile.num_rows, 100)
+        self.assertEqual(data_profile.num_features, 2)
+        self.assertEqual(data_profile.label_cardinality, 10)
+        np.testing.assert_array_equal(data_profile.nan_counts, [0, 0, 2])
+        np.testing.assert_array_equal(data_profile.minimum, np.nanmin(values, axis=0))
+        np.testing.assert_array_equal(data_profile.maximum, np.nanmax(values, axis=0))
+        np.testing.assert_allclose(data_profile.mean, np.nanmean(values, axis=0))
+        np.testing.assert_allclose(data_profile.std, np.nanstd(values, axis=0), rtol=1e-6)
+
+    def test_profile_compressed_csv(self):
+        # Arrange
+        with open(self.data_path, 'rb') as source, gzip.open(self.data_path + '.gz', 'wb') as destination:
+            destination.write(source.read())
+
+        # Act
+        data_profile = profiler.profile_csv(self.data_path + '.gz')
+
+        # Assert
+        self.assertEqual(data_profile.num_rows, 100)
+        self.assertEqual(data_profile.labels, list(range(10)))
+
+    def test_profile_round_trip(self):
+        # Arrange
+        data_profile = profiler.profile_csv(self.data_path)
+
+        # Act
+        loaded = profiler.DatasetProfile.from_dict(data_profile.to_dict())
+
+        # Assert
+        self.assertEqual(loaded.columns, ['label', 'a', 'b'])
+        np.testing.assert_array_equal(loaded.std, data_profile.std)
+
+    def test_check_design(self):
+        # Arrange
+        data_profile = profiler.profile_csv(self.data_path)
+
+        # Act
+        matching = data_profile.check_design(2, 10)
+        mismatched = data_profile.check_design(784, 5)
+
+        # Assert
+        self.assertEqual(matching, [])
+        self.assertEqual(len(mismatched), 2)
+        self.assertIn('Input layer dimensions (784)', mismatched[0])
+        self.assertIn('Output layer size (5)', mismatched[1])
+
+    def test_check_design_fractional_labels(self):
+        # Arrange
+        self.frame['label'] = self.frame['label'] / 4.0
+        self.frame.to_csv(self.data_path, index=False)
+        data_profile = profiler.profile_csv(self.data_path)
+
+        # Act
+        problems = data_profile.check_design(2, 10)
+
+        # Assert
+        self.assertEqual(problems, ['Labels must be whole numbers to classify'])
+
+    def test_check_design_many_labels(self):
+        # Arrange
+        with mock.patch.object(profiler, 'MAX_LABELS', 3):
+            data_profile = profiler.profile_csv(self.data_path)
+
+        # Act
+        fitting = data_profile.check_design(2, 10)
+        too_small = data_profile.check_design(2, 5)
+
+        # Assert
+        self.assertIsNone(data_profile.labels)
+        self.assertEqual(fitting, [])
+        self.assertEqual(len(too_small), 1)
+        self.assertIn('Output layer size (5)', too_small[0])
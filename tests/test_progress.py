@@ -0,0 +1,97 @@
+import unittest
+
+from backend import progress
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgress(unittest.TestCase):
+
+    def test_format_text(self):
+        # Act/Assert
+        self.assertEqual(progress.format_message('Reading data...\n'), 'Reading data...\n')
+        self.assertEqual(progress.format_message(progress.phase(progress.READING, 'Reading data...')),
+                         'Reading data...\n')
+        self.assertIsNone(progress.format_message(progress.phase(progress.TRAINING)))
+
+    def test_format_epoch(self):
+        # Arrange
+        message = progress.epoch(2, 10, {'loss': 0.25, 'acc': 0.9}, 1520.4, 3725, 12.0)
+
+        # Act
+        text = progress.format_message(dict(message, label='[Job 1: test]'))
+
+        # Assert
+        self.assertEqual(text, '[Job 1: test] Epoch 2/10 - acc: 0.9000 - loss: 0.2500 - 1520 samples/s - ETA 1:02:05\n')
+
+    def test_batch_is_not_text(self):
+        # Act/Assert
+        self.assertIsNone(progress.format_message(progress.batch(1, 10, 5, 100, {'loss': 0.5}, 100.0, 60.0)))
+
+    def test_running_metrics_weight_by_batch_size(self):
+        # Arrange
+        metrics = progress.RunningMetrics()
+
+        # Act
+        metrics.add({'batch': 0, 'size': 30, 'loss': 1.0})
+        metrics.add({'batch': 1, 'size': 10, 'loss': 3.0})
+
+        # Assert
+        self.assertEqual(metrics.batches, 2)
+        self.assertEqual(metrics.samples, 40)
+        self.assertEqual(metrics.means(), {'loss': 1.5})
+
+    def test_throttle_coalesces_batches(self):
+        # Arrange
+        sent = []
+        clock = FakeClock()
+        sender = progress.ThrottledSender(sent.append, interval=1.0, clock=clock)
+
+        # Act
+        for step in range(1, 101):
+            clock.now = step * 0.25
+            sender(progress.batch(1, 1, step, 100, {}, 0.0, None))
+        sender.flush()
+
+        # Assert
+        self.assertEqual([message['step'] for message in sent], list(range(1, 100, 4)) + [100])
+        self.assertEqual(sender.coalesced, 74)
+
+    def test_throttle_keeps_order(self):
+        # Arrange
+        sent = []
+        clock = FakeClock()
+        sender = progress.ThrottledSender(sent.append, interval=1.0, clock=clock)
+        sender(progress.batch(1, 1, 1, 2, {}, 0.0, None))
+        sender(progress.batch(1, 1, 2, 2, {}, 0.0, None))
+
+        # Act
+        sender(progress.epoch(1, 1, {}, 0.0, None, 1.0))
+
+        # Assert
+        self.assertEqual([progress.message_type(message) for message in sent],
+                         [progress.BATCH, progress.BATCH, progress.EPOCH])
+        self.assertEqual(sent[1]['step'], 2)
+
+    def test_latency_meter(self):
+        # Arrange
+        meter = progress.LatencyMeter()
+
+        # Act
+        meter.add('Text messages are not measured\n', now=10.0)
+        for delay in range(1, 101):
+            meter.add(dict(progress.error('error'), time=10.0), now=10.0 + delay / 1000.0)
+
+        # Assert
+        self.assertEqual(meter.count, 100)
+        self.assertAlmostEqual(meter.mean, 0.0505)
+        self.assertAlmostEqual(meter.maximum, 0.1)
+        self.assertAlmostEqual(meter.percentile(95), 0.096)
+        self.assertIn('over 100 messages', meter.summary())
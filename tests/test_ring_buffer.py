@@ -0,0 +1,104 @@
+import math
+import unittest
+import multiprocessing
+from unittest import mock
+
+import numpy as np
+
+from backend import ring_buffer
+
+
+def write_samples(name, count):
+    ring = ring_buffer.MetricsRing.attach(name)
+    for step in range(count):
+        ring.write(step=step, loss=1.0 / (step + 1))
+    ring.close()
+
+
+class TestMetricsRing(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = ring_buffer.MetricsRing.create(capacity=8)
+
+    def tearDown(self):
+        self.ring.unlink()
+
+    def test_reads_new_samples(self):
+        # Arrange
+        for step in range(3):
+            self.ring.write(time=100.0 + step, step=step, loss=0.5)
+
+        # Act
+        first = self.ring.read()
+        self.ring.write(step=3)
+        second = self.ring.read()
+
+        # Assert
+        self.assertEqual(first.dtype.names, ring_buffer.FIELDS)
+        self.assertEqual(list(first.step), [0, 1, 2])
+        self.assertEqual(list(first.time), [100.0, 101.0, 102.0])
+        self.assertEqual(list(second.step), [3])
+        self.assertTrue(math.isnan(second.loss[0]))
+        self.assertEqual(len(self.ring.read()), 0)
+
+    def test_overwritten_samples_are_dropped(self):
+        # Arrange
+        for step in range(20):
+            self.ring.write(step=step)
+
+        # Act
+        samples = self.ring.read()
+
+        # Assert
+        self.assertEqual(list(samples.step), list(range(12, 20)))
+        self.assertEqual(self.ring.dropped, 12)
+        self.assertEqual(self.ring.written, 20)
+
+    def test_reads_across_processes(self):
+        # Arrange
+        reader = ring_buffer.MetricsRing.attach(self.ring.name)
+
+        # Act
+        writer = multiprocessing.Process(target=write_samples, args=(self.ring.name, 5))
+        writer.start()
+        writer.join()
+        samples = reader.read()
+        reader.close()
+
+        # Assert
+        self.assertEqual(reader.fields, ring_buffer.FIELDS)
+        self.assertEqual(list(samples.step), [0, 1, 2, 3, 4])
+        np.testing.assert_allclose(samples.loss, [1.0, 0.5, 1.0 / 3, 0.25, 0.2])
+        # The original buffer reads independently of the other reader
+        self.assertEqual(len(self.ring.read()), 5)
+
+    def test_find_buffers(self):
+        # Act
+        names = ring_buffer.find_buffers()
+
+        # Assert
+        self.assertIn(self.ring.name, names)
+
+    def test_file_memory_fallback(self):
+        # Arrange
+        with mock.patch.object(ring_buffer, 'shared_memory', None):
+            ring = ring_buffer.MetricsRing.create(capacity=8)
+            reader = ring_buffer.MetricsRing.attach(ring.name)
+
+            # Act
+            writer = multiprocessing.Process(target=write_samples, args=(ring.name, 3))
+            writer.start()
+            writer.join()
+            samples = reader.read()
+            names = ring_buffer.find_buffers()
+            reader.close()
+            ring.unlink()
+
+        # Assert
+        self.assertEqual(list(samples.step), [0, 1, 2])
+        self.assertIn(ring.name, names)
+        self.assertNotIn(ring.name, ring_buffer.find_buffers())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend import progress, scheduler, threads, worker
+
+NETWORK_SCRIPT = '''
+def train_neural_network(train_data, test_data, **kwargs):
+    next(train_data)
+    return 0.5
+'''
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        data_path = os.path.join(self.directory, 'data.csv')
+        data = np.hstack((np.arange(100).reshape(-1, 1) % 10, np.arange(300).reshape(100, 3)))
+        pd.DataFrame(data, columns=['label', 'a', 'b', 'c']).to_csv(data_path, index=False)
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(NETWORK_SCRIPT)
+        self.properties = {
+            'canvas_name': 'test',
+            'project_directory': self.directory,
+            'data_path': data_path,
+            'training_size': 0.8,
+            'streaming': True,
+            'prefetch_depth': 2,
+            'prefetch_workers': 1,
+            'checkpoint_epochs': 0,
+            'checkpoint_minutes': 0,
+            'script': os.path.join(self.directory, 'test_network.py'),
+        }
+        cache_dir = os.path.join(self.directory, 'cache')
+        self.scheduler = scheduler.JobScheduler(num_slots=2, num_cores=4,
+                                                worker_factory=lambda: worker.TrainingWorker([], cache_dir))
+
+    def tearDown(self):
+        self.scheduler.stop()
+        shutil.rmtree(self.directory)
+
+    def wait_for_jobs(self, timeout=10.0):
+        messages = []
+        deadline = time.time() + timeout
+        while self.scheduler.active and time.time() < deadline:
+            messages.extend(self.scheduler.poll())
+            time.sleep(0.05)
+        return ''.join(progress.format_message(message) or '' for message in messages)
+
+    def test_thread_counts(self):
+        # Assert
+        self.assertEqual(scheduler.thread_counts(16, 1), (16, 2))
+        self.assertEqual(scheduler.thread_counts(16, 4), (4, 2))
+        self.assertEqual(scheduler.thread_counts(4, 2), (2, 1))
+        self.assertEqual(scheduler.thread_counts(2, 4), (1, 1))
+        self.assertEqual(scheduler.default_slots(2), 1)
+        self.assertEqual(scheduler.default_slots(16), 4)
+
+    def test_job_threads(self):
+        # Assert
+        self.assertEqual(scheduler.job_threads({}, 16, 4), (4, 2, None))
+        self.assertEqual(scheduler.job_threads({'cpu_affinity': '0-1'}, 16, 4), (2, 1, [0, 1]))
+        self.assertEqual(scheduler.job_threads({'intra_op_threads': 3, 'inter_op_threads': 0}, 16, 4), (3, 2, None))
+
+    def test_starts_workers_when_needed(self):
+        # Arrange
+        workers = []
+        cache_dir = os.path.join(self.directory, 'cache')
+        self.scheduler = scheduler.JobScheduler(num_slots=2, num_cores=4, worker_factory=lambda: workers.append(
+            worker.TrainingWorker([], cache_dir)) or workers[-1])
+
+        # Act
+        self.scheduler.start()
+        started = [training_worker.is_alive() for training_worker in workers]
+        self.scheduler.submit(self.properties)
+        self.wait_for_jobs()
+        after_one_job = [training_worker.is_alive() for training_worker in workers]
+
+        # Assert
+        self.assertEqual(started, [True, False])
+        self.assertEqual(after_one_job, [True, False])
+
+    def test_runs_jobs_concurrently(self):
+        # Act
+        jobs = [self.scheduler.submit(self.properties, name='job{0}'.format(index)) for index in range(3)]
+        states = [job.state for job in jobs]
+        messages = self.wait_for_jobs()
+
+        # Assert
+        self.assertEqual(states, [scheduler.RUNNING, scheduler.RUNNING, scheduler.QUEUED])
+        self.assertEqual([job.state for job in jobs], [scheduler.DONE] * 3)
+        self.assertEqual([job.score for job in jobs], [0.5] * 3)
+        self.assertIn('[Job 1: job0] running with 4 threads', messages)
+        self.assertIn('[Job 2: job1] running with 2 threads', messages)
+        self.assertIn('[Job 2: job1] Model accuracy: 0.5', messages)
+        self.assertIn('[Job 3: job2] done', messages)
+
+    def test_wait_for_messages(self):
+        # Arrange
+        idle = self.scheduler.wait(0.1)
+
+        # Act
+        self.scheduler.submit(self.properties)
+        waiting = self.scheduler.wait(10.0)
+        messages = self.wait_for_jobs()
+
+        # Assert
+        self.assertFalse(idle)
+        self.assertTrue(waiting)
+        self.assertIn('Reading data...', messages)
+
+    def test_cancel_queued_job(self):
+        # Arrange
+        jobs = [self.scheduler.submit(self.properties) for _ in range(3)]
+
+        # Act
+        self.scheduler.cancel(jobs[2].id)
+        self.wait_for_jobs()
+
+        # Assert
+        self.assertEqual([job.state for job in jobs], [scheduler.DONE, scheduler.DONE, scheduler.CANCELED])
+
+    def test_failed_job(self):
+        # Arrange
+        os.remove(os.path.join(self.directory, 'test_network.py'))
+
+        # Act
+        job = self.scheduler.submit(self.properties)
+        messages = self.wait_for_jobs()
+
+        # Assert
+        self.assertEqual(job.state, scheduler.FAILED)
+        self.assertIn('Cannot train without a network', messages)
+
+    def test_restarts_worker_that_ignores_cancel(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'stuck_network.py'), 'w') as fd:
+            fd.write('import time\n\ndef train_neural_network(train_data, test_data, **kwargs):\n'
+                     '    time.sleep(60)\n')
+        self.scheduler.cancel_timeout = 0.5
+        stuck = self.scheduler.submit(dict(self.properties, canvas_name='stuck',
+                                                 script=os.path.join(self.directory, 'stuck_network.py')))
+        time.sleep(0.5)
+
+        # Act
+        self.scheduler.cancel(stuck.id)
+        messages = self.wait_for_jobs()
+        job = self.scheduler.submit(self.properties)
+        self.wait_for_jobs()
+
+        # Assert
+        self.assertEqual(stuck.state, scheduler.CANCELED)
+        self.assertIn('[Job 1: stuck] Did not stop within 0.5 s, training worker restarted', messages)
+        self.assertEqual(job.state, scheduler.DONE)
+
+    def test_job_overrides(self):
+        # Arrange
+        cpu = threads.available_cpus()[0]
+
+        # Act
+        job = self.scheduler.submit(self.properties, overrides={'cpu_affinity': str(cpu), 'intra_op_threads': 1})
+        messages = self.wait_for_jobs()
+
+        # Assert
+        self.assertEqual(job.state, scheduler.DONE)
+        self.assertNotIn('cpu_affinity', self.properties)
+        self.assertIn('[Job 1: test] running with 1 threads on CPUs {0}'.format(cpu), messages)
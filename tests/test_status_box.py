@@ -0,0 +1,119 @@
+import unittest
+import tkinter as tk
+from unittest import mock
+
+from interface import status_box
+
+
+class FakeText(object):
+    """
+    Text widget holding its contents as a string, with the subset of the tkinter.Text interface used by the status box.
+    Hidden lines are the lines covered by the status box's HIDDEN_TAG.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.content = ''
+        self.num_hidden = 0
+
+    def config(self, *args, **kwargs):
+        pass
+
+    grid = tag_configure = see = xview = yview = xview_moveto = yview_moveto = config
+
+    def insert(self, index, text):
+        self.content += text
+
+    def index(self, index):
+        # Only 'end-1c', the position after the last character
+        lines = self.content.split('\n')
+        return '{0}.{1}'.format(len(lines), len(lines[-1]))
+
+    def delete(self, start, end):
+        if end == tk.END:
+            self.content = ''
+        else:
+            self.content = '\n'.join(self.content.split('\n')[int(end.split('.')[0]) - 1:])
+
+    def tag_add(self, tag, start, end):
+        self.num_hidden = int(end.split('.')[0]) - 1
+
+    def tag_remove(self, tag, start, end):
+        self.num_hidden = 0
+
+    def lines(self):
+        return self.content.splitlines()
+
+    def visible_lines(self):
+        return self.lines()[self.num_hidden:]
+
+
+class FakeVariable(object):
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class TestStatusBox(unittest.TestCase):
+
+    def setUp(self):
+        scroll_bar = mock.MagicMock(**{'return_value.get.return_value': (0.0, 1.0)})
+        patcher = mock.patch.multiple(tk, Frame=mock.MagicMock(), Label=mock.MagicMock(), Checkbutton=mock.MagicMock(),
+                                      Scrollbar=scroll_bar, BooleanVar=FakeVariable, Text=FakeText)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_buffers_text_until_flush(self):
+        # Arrange
+        box = status_box.StatusBox(None)
+        box.flush()
+
+        # Act
+        for i in range(3):
+            box.add_text('line {0}\n'.format(i))
+        before_flush = box.text.lines()
+        box.flush()
+
+        # Assert
+        self.assertEqual(before_flush, ['Welcome to Neuromatic'])
+        self.assertEqual(box.text.lines(), ['Welcome to Neuromatic', 'line 0', 'line 1', 'line 2'])
+        self.assertEqual(box.frame.after.call_count, 2)
+        self.assertEqual(box.pending, [])
+
+    def test_removes_lines_over_max_lines(self):
+        # Arrange
+        box = status_box.StatusBox(None, max_lines=5)
+
+        # Act
+        box.add_text(''.join('line {0}\n'.format(i) for i in range(10)))
+        box.add_text('partial')
+        box.flush()
+
+        # Assert
+        self.assertEqual(box.text.lines(), ['line 6', 'line 7', 'line 8', 'line 9', 'partial'])
+
+    def test_tail_only_hides_lines(self):
+        # Arrange
+        box = status_box.StatusBox(None, max_lines=status_box.TAIL_LINES * 2)
+        box.add_text(''.join('line {0}\n'.format(i) for i in range(status_box.TAIL_LINES + 50)))
+
+        # Act
+        box.tail_only = True
+        tail = box.text.visible_lines()
+        box.tail_only = False
+        every_line = box.text.visible_lines()
+
+        # Assert
+        self.assertEqual(len(tail), status_box.TAIL_LINES)
+        self.assertEqual(tail[-1], 'line {0}'.format(status_box.TAIL_LINES + 49))
+        self.assertEqual(len(every_line), status_box.TAIL_LINES + 51)
+        self.assertEqual(every_line[0], 'Welcome to Neuromatic')
+
+
+if __name__ == '__main__':
+    unittest.main()
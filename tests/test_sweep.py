@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from backend import scheduler, sweep
+
+
+class FakeScheduler(object):
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, properties, name=None):
+        job = scheduler.Job(len(self.jobs) + 1, name, properties)
+        self.jobs.append(job)
+        return job
+
+    def cancel(self, job_id=None):
+        for job in self.jobs:
+            if job.id == job_id:
+                job.state = scheduler.CANCELED
+
+    def finish(self, score):
+        for job in self.jobs:
+            if job.active:
+                job.state = scheduler.DONE
+                job.score = score(job.properties)
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.properties = {
+            'canvas_name': 'test',
+            'project_directory': self.directory,
+            'epochs': 9,
+            'optimizer': 'sgd',
+            'layers': [
+                {'type': 'input', 'dimensions': 3},
+                {'type': 'hidden', 'size': 10, 'activation': 'relu'},
+                {'type': 'output', 'size': 10, 'activation': 'softmax'},
+            ],
+        }
+        self.scheduler = FakeScheduler()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_parse_values(self):
+        # Assert
+        self.assertEqual(sweep.parse_values('sgd, adam'), ['sgd', 'adam'])
+        self.assertEqual(sweep.parse_values('50:200:50'), [50, 100, 150, 200])
+        self.assertEqual(sweep.parse_values('1:3'), [1, 2, 3])
+        self.assertEqual(sweep.parse_values('0.1:0.3:0.1'), [0.1, 0.2, 0.30000000000000004])
+        self.assertEqual(sweep.parse_values(' '), [])
+        with self.assertRaises(ValueError):
+            sweep.parse_values('a:b')
+
+    def test_expand_grid(self):
+        # Act
+        configs = sweep.expand_grid({'optimizer': ['sgd', 'adam'], 'layers.1.size': [10, 20, 30]})
+
+        # Assert
+        self.assertEqual(len(configs), 6)
+        self.assertEqual(configs[0], {'optimizer': 'sgd', 'layers.1.size': 10})
+
+    def test_rung_epochs(self):
+        # Assert
+        self.assertEqual(sweep.rung_epochs(9, 3, 3), [1, 3, 9])
+        self.assertEqual(sweep.rung_epochs(2, 3, 3), [1, 1, 2])
+
+    def test_successive_halving(self):
+        # Arrange
+        grid = {'optimizer': ['sgd', 'adam', 'rmsprop'], 'layers.1.size': [10, 20, 30]}
+        new_sweep = sweep.Sweep(self.properties, grid, self.scheduler)
+
+        def score(properties):
+            # Larger layers and adam score best
+            return properties['layers'][1]['size'] / 100.0 + (0.5 if properties['optimizer'] == 'adam' else 0.0)
+
+        # Act
+        new_sweep.start()
+        rungs = []
+        while not new_sweep.finished:
+            rungs.append(sorted(job.properties['epochs'] for job in self.scheduler.jobs if job.active))
+            self.scheduler.finish(score)
+            new_sweep.poll()
+
+        # Assert
+        self.assertEqual(rungs, [[1] * 9, [3] * 3, [9]])
+        best = new_sweep.ranked()[0]
+        self.assertEqual(best.params, {'optimizer': 'adam', 'layers.1.size': 30})
+        self.assertEqual(len(self.scheduler.jobs), 13)
+        self.assertEqual(self.scheduler.jobs[0].properties['canvas_name'], 'test_trial1')
+        self.assertEqual(self.scheduler.jobs[0].properties['split_name'], 'test')
+        self.assertEqual([bool(job.properties.get('warm_start')) for job in self.scheduler.jobs],
+                         [False] * 9 + [True] * 4)
+        self.assertEqual(self.properties['layers'][1]['size'], 10)
+
+        results = pd.read_csv(os.path.join(self.directory, 'test_sweep.csv'))
+        self.assertEqual(len(results), 9)
+        self.assertEqual(list(results['rank']), list(range(1, 10)))
+        self.assertEqual(results['trial'][0], best.id)
+        self.assertEqual(results['epochs'][0], 9)
+
+    def test_rungs_train_further(self):
+        # Act
+        new_sweep = sweep.Sweep(dict(self.properties, epochs=2), {'layers.1.size': list(range(9))}, self.scheduler)
+
+        # Assert
+        self.assertEqual(new_sweep.epochs, [1, 2])
+
+    def test_epochs_cannot_be_swept(self):
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            sweep.Sweep(self.properties, {'epochs': [5, 10]}, self.scheduler)
+
+    def test_invalid_property(self):
+        # Act/Assert
+        with self.assertRaises(IndexError):
+            sweep.Sweep(self.properties, {'layers.5.size': [10]}, self.scheduler)
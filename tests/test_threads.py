@@ -0,0 +1,34 @@
+import unittest
+
+from backend import threads
+
+
+class TestThreads(unittest.TestCase):
+
+    def test_parse_cpus(self):
+        # Assert
+        self.assertEqual(threads.parse_cpus('0-3, 8,2'), [0, 1, 2, 3, 8])
+        self.assertEqual(threads.parse_cpus(' '), [])
+        with self.assertRaises(ValueError):
+            threads.parse_cpus('3-1')
+        with self.assertRaises(ValueError):
+            threads.parse_cpus('a')
+
+    def test_format_cpus(self):
+        # Assert
+        self.assertEqual(threads.format_cpus([8, 0, 1, 2, 3, 5]), '0-3,5,8')
+        self.assertEqual(threads.format_cpus([]), '')
+        self.assertEqual(threads.parse_cpus(threads.format_cpus([1, 2, 4])), [1, 2, 4])
+
+    def test_candidate_settings(self):
+        # Assert
+        self.assertEqual(threads.candidate_settings(1), [(1, 1), (1, 2)])
+        self.assertEqual([intra for intra, _ in threads.candidate_settings(6)], [1, 1, 2, 2, 4, 4, 6, 6])
+
+    def test_available_cpus(self):
+        # Act
+        cpus = threads.available_cpus()
+
+        # Assert
+        self.assertTrue(cpus)
+        self.assertEqual(cpus, sorted(set(cpus)))
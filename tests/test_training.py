@@ -0,0 +1,289 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from backend import builder, cache, checkpoint, progress, threads, training
+
+NETWORK_SCRIPT = '''
+import json
+
+def train_neural_network(train_data, test_data, callbacks=None, resume_path=None, initial_epoch=0):
+    next(train_data)
+    with open({arguments_path!r}, 'w') as fd:
+        json.dump([len(callbacks), resume_path, initial_epoch], fd)
+    return 0.5
+'''
+
+AUTO_NETWORK_SCRIPT = '''
+import json
+
+
+class Layer(object):
+    output_shape = (None, 10)
+
+
+class Model(object):
+    layers = [Layer()]
+    output_shape = (None, 10)
+    loss = 'sparse_categorical_crossentropy'
+
+    def train_on_batch(self, features, labels):
+        pass
+
+
+def build_model():
+    return Model()
+
+
+def train_neural_network(train_data, test_data, **kwargs):
+    features, labels = next(train_data)
+    with open({arguments_path!r}, 'w') as fd:
+        json.dump(len(labels), fd)
+    return 0.5
+'''
+
+WARM_START_NETWORK_SCRIPT = '''
+import json
+
+architecture = 'abc'
+
+
+def train_neural_network(train_data, test_data, callbacks=None, **kwargs):
+    next(train_data)
+    with open({arguments_path!r}, 'w') as fd:
+        json.dump(kwargs, fd)
+    return 0.5
+'''
+
+CACHED_NETWORK_SCRIPT = '''
+def train_neural_network(train_data, test_data, **kwargs):
+    next(train_data)
+    for path in {artifact_paths!r}:
+        with open(path, 'w') as fd:
+            fd.write('trained')
+    with open({arguments_path!r}, 'a') as fd:
+        fd.write('trained\\n')
+    return 0.75
+'''
+
+
+class TestTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        data_path = os.path.join(self.directory, 'data.csv')
+        self.arguments_path = os.path.join(self.directory, 'arguments.json')
+        data = np.hstack((np.arange(100).reshape(-1, 1) % 10, np.arange(300).reshape(100, 3)))
+        pd.DataFrame(data, columns=['label', 'a', 'b', 'c']).to_csv(data_path, index=False)
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(NETWORK_SCRIPT.format(arguments_path=self.arguments_path))
+        self.properties = {
+            'canvas_name': 'test',
+            'project_directory': self.directory,
+            'data_path': data_path,
+            'training_size': 0.8,
+            'feature_dtype': 'auto',
+            'prefetch_depth': 2,
+            'prefetch_workers': 1,
+            'checkpoint_epochs': 0,
+            'checkpoint_minutes': 0,
+            'script': os.path.join(self.directory, 'test_network.py'),
+        }
+        self.dataset_cache = cache.DatasetCache(os.path.join(self.directory, 'cache'))
+        self.messages = []
+        self.send = lambda message: self.messages.append(progress.format_message(message))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_train(self):
+        # Arrange
+        reports = []
+
+        # Act
+        score = training.train(self.properties, self.dataset_cache, self.send, report=reports.append)
+
+        # Assert
+        self.assertEqual(score, 0.5)
+        self.assertEqual(reports, [{'accuracy': 0.5}])
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'test_split.npz')))
+        self.assertIn('Training network...\n', self.messages)
+
+    def test_train_checks_design_before_reading_data(self):
+        # Arrange
+        properties = dict(self.properties, layers=[
+            {'type': 'input', 'dimensions': 5},
+            {'type': 'hidden', 'size': 10, 'activation': 'sigmoid'},
+            {'type': 'output', 'size': 10, 'activation': 'softmax'}
+        ])
+        del properties['script']
+
+        # Act
+        with self.assertRaises(ValueError) as context:
+            training.train(properties, self.dataset_cache, self.send)
+
+        # Assert
+        self.assertIn('Input layer dimensions (5)', str(context.exception))
+        self.assertNotIn('Reading data...\n', self.messages)
+        self.assertFalse(os.path.isfile(os.path.join(self.directory, 'test_split.npz')))
+
+    def test_train_restores_cached_model(self):
+        # Arrange
+        with open(self.properties['script'], 'w') as fd:
+            fd.write(CACHED_NETWORK_SCRIPT.format(artifact_paths=builder.artifact_paths(self.properties),
+                                                  arguments_path=self.arguments_path))
+        artifact_cache = cache.ArtifactCache(os.path.join(self.directory, 'artifacts'))
+        properties = dict(self.properties, use_artifact_cache=True, epochs=5)
+        training.train(properties, self.dataset_cache, self.send, artifact_cache=artifact_cache)
+        os.remove(builder.artifact_paths(self.properties)[0])
+
+        # Act
+        cached_score = training.train(properties, self.dataset_cache, self.send, artifact_cache=artifact_cache)
+        training.train(dict(properties, epochs=6), self.dataset_cache, self.send, artifact_cache=artifact_cache)
+
+        # Assert
+        self.assertEqual(cached_score, 0.75)
+        self.assertIn('Network unchanged since it was trained, restored the trained model (cached)\n', self.messages)
+        self.assertTrue(os.path.isfile(builder.artifact_paths(self.properties)[0]))
+        with open(self.arguments_path) as fd:
+            self.assertEqual(fd.read(), 'trained\ntrained\n')
+
+    def test_cached_model_restored_without_reading_data(self):
+        # Arrange
+        with open(self.properties['script'], 'w') as fd:
+            fd.write(CACHED_NETWORK_SCRIPT.format(artifact_paths=builder.artifact_paths(self.properties),
+                                                  arguments_path=self.arguments_path))
+        artifact_cache = cache.ArtifactCache(os.path.join(self.directory, 'artifacts'))
+        properties = dict(self.properties, use_artifact_cache=True)
+        training.train(properties, self.dataset_cache, self.send, artifact_cache=artifact_cache)
+        del self.messages[:]
+
+        # Act
+        with mock.patch.object(training, 'open_batches', side_effect=AssertionError('Data read')):
+            cached_score = training.train(properties, self.dataset_cache, self.send, artifact_cache=artifact_cache)
+
+        # Assert
+        self.assertEqual(cached_score, 0.75)
+        self.assertNotIn('Reading data...\n', self.messages)
+
+    def test_train_fold(self):
+        # Act
+        score = training.train(dict(self.properties, fold=1, num_folds=4), self.dataset_cache, self.send)
+
+        # Assert
+        self.assertEqual(score, 0.5)
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'test_folds.npz')))
+        self.assertFalse(os.path.isfile(os.path.join(self.directory, 'test_split.npz')))
+
+    def test_resume_from_checkpoint(self):
+        # Arrange
+        directory = checkpoint.checkpoint_dir(self.properties)
+        path = checkpoint.save(lambda temp_path: open(temp_path, 'w').close(), directory, 7, training_size=0.8)
+
+        # Act
+        score = training.train(dict(self.properties, resume=True), self.dataset_cache, self.send)
+
+        # Assert
+        self.assertEqual(score, 0.5)
+        with open(self.arguments_path) as fd:
+            self.assertEqual(json.load(fd), [0, path, 7])
+        self.assertIn('Resuming from epoch 7\n', self.messages)
+        self.assertIsNone(checkpoint.latest(directory))
+
+    def test_resume_without_checkpoint(self):
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            training.train(dict(self.properties, resume=True), self.dataset_cache, self.send)
+
+    def test_resume_with_changed_training_size(self):
+        # Arrange
+        checkpoint.save(lambda temp_path: open(temp_path, 'w').close(), checkpoint.checkpoint_dir(self.properties), 3,
+                        training_size=0.5)
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            training.train(dict(self.properties, resume=True), self.dataset_cache, self.send)
+
+    def test_warm_start(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(WARM_START_NETWORK_SCRIPT.format(arguments_path=self.arguments_path))
+        model_path = builder.artifact_paths(self.properties)[0]
+        open(model_path, 'w').close()
+        builder.save_state(self.properties, epoch=5, architecture='abc', optimizer='sgd', loss='mse', training_size=0.8)
+        properties = dict(self.properties, warm_start=True, epochs=8, optimizer='sgd', loss='mse')
+
+        # Act
+        training.train(properties, self.dataset_cache, self.send)
+
+        # Assert
+        with open(self.arguments_path) as fd:
+            self.assertEqual(json.load(fd), {'resume_path': model_path, 'initial_epoch': 5})
+        self.assertIn('Continuing from epoch 5\n', self.messages)
+        self.assertEqual(builder.load_state(self.properties)['epoch'], 8)
+
+    def test_warm_start_changed_architecture(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(WARM_START_NETWORK_SCRIPT.format(arguments_path=self.arguments_path))
+        model_path = builder.artifact_paths(self.properties)[0]
+        open(model_path, 'w').close()
+        builder.save_state(self.properties, epoch=5, architecture='old', optimizer='sgd', loss='mse', training_size=0.8)
+        properties = dict(self.properties, warm_start=True, epochs=8, optimizer='sgd', loss='mse')
+
+        # Act
+        training.train(properties, self.dataset_cache, self.send)
+
+        # Assert
+        with open(self.arguments_path) as fd:
+            self.assertEqual(json.load(fd), {'warm_start_path': model_path, 'initial_epoch': 5})
+        self.assertIn('Continuing from epoch 5 with a changed network\n', self.messages)
+
+    def test_warm_start_without_extra_epochs(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(WARM_START_NETWORK_SCRIPT.format(arguments_path=self.arguments_path))
+        open(builder.artifact_paths(self.properties)[0], 'w').close()
+        builder.save_state(self.properties, epoch=5, architecture='abc', optimizer='sgd', loss='mse', training_size=0.8)
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            training.train(dict(self.properties, warm_start=True, epochs=5, optimizer='sgd', loss='mse'),
+                           self.dataset_cache, self.send)
+
+    def test_auto_batch_size(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(AUTO_NETWORK_SCRIPT.format(arguments_path=self.arguments_path))
+
+        # Act
+        training.train(dict(self.properties, batch_size='auto'), self.dataset_cache, self.send)
+        with open(self.arguments_path, 'r') as fd:
+            batch_length = json.load(fd)
+
+        # Assert
+        probe = [message for message in self.messages if message.startswith('Batch size probe')][0]
+        self.assertIn('128: skipped', probe)
+        self.assertIn(batch_length, (16, 32, 64))
+        self.assertIn('Batch size: {0}\n'.format(batch_length), self.messages)
+
+    def test_calibrate(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(AUTO_NETWORK_SCRIPT.format(arguments_path=self.arguments_path))
+
+        # Act
+        intra_op_threads, inter_op_threads = training.calibrate(self.properties, self.dataset_cache,
+                                                                self.send)
+
+        # Assert
+        self.assertIn((intra_op_threads, inter_op_threads), threads.candidate_settings(len(threads.available_cpus())))
+        self.assertIn('Suggested threads: {0} intra-op, {1} inter-op\n'.format(intra_op_threads, inter_op_threads),
+                      self.messages)
+        self.assertFalse(os.path.exists(self.arguments_path))
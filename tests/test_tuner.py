@@ -0,0 +1,83 @@
+import time
+import unittest
+
+import numpy as np
+
+from backend import tuner
+
+
+class TestTuner(unittest.TestCase):
+
+    def setUp(self):
+        self.features = np.zeros((256, 4), dtype=np.float32)
+        self.labels = np.zeros(256)
+
+    def test_parse_batch_size(self):
+        # Assert
+        self.assertEqual(tuner.parse_batch_size('64'), 64)
+        self.assertEqual(tuner.parse_batch_size(128), 128)
+        self.assertEqual(tuner.parse_batch_size(' Auto '), tuner.AUTO)
+        with self.assertRaises(ValueError):
+            tuner.parse_batch_size('0')
+        with self.assertRaises(ValueError):
+            tuner.parse_batch_size('big')
+
+    def test_bytes_per_sample(self):
+        # Assert
+        self.assertEqual(tuner.bytes_per_sample(10, [20, 5], prefetch_depth=1), 4 * (20 + 50))
+
+    def test_probe_picks_fastest_batch_size(self):
+        # Arrange
+        batch_sizes = []
+
+        def train_step(features, labels):
+            # Fixed cost per step, so larger batches are faster per sample
+            batch_sizes.append(len(labels))
+            time.sleep(0.001)
+
+        # Act
+        results = tuner.probe(train_step, self.features, self.labels, candidates=[128, 16, 64, 512], steps=3)
+
+        # Assert
+        self.assertEqual([result['batch_size'] for result in results], [16, 64, 128, 512])
+        self.assertIsNone(results[-1]['samples_per_second'])
+        self.assertEqual(batch_sizes, [16] * 4 + [64] * 4 + [128] * 4)
+        self.assertEqual(tuner.best(results), 128)
+
+    def test_probe_skips_batches_over_memory_limit(self):
+        # Act
+        results = tuner.probe(lambda features, labels: None, self.features, self.labels, candidates=[16, 32, 64],
+                              sample_bytes=1000, memory_limit=40000, steps=1)
+
+        # Assert
+        self.assertEqual([result['memory'] for result in results], [16000, 32000, 64000])
+        self.assertEqual([result['samples_per_second'] is None for result in results], [False, False, True])
+        self.assertIn(tuner.best(results), (16, 32))
+
+    def test_best_without_results(self):
+        # Assert
+        self.assertIsNone(tuner.best([{'batch_size': 16, 'memory': 0, 'samples_per_second': None}]))
+
+    def test_calibrate_threads(self):
+        # Arrange
+        sessions = []
+
+        class Model(object):
+            layers = []
+            output_shape = (None, 1)
+            loss = 'sparse_categorical_crossentropy'
+
+            def train_on_batch(self, features, labels):
+                # Fewer intra-op threads are slower
+                time.sleep(0.004 / sessions[-1][0])
+
+        # Act
+        results = tuner.calibrate_threads(Model, self.features, self.labels, 128, [(1, 1), (2, 1), (4, 2)],
+                                          configure=lambda intra, inter: sessions.append((intra, inter)),
+                                          clear=lambda: sessions.append(None))
+
+        # Assert
+        self.assertEqual(sessions, [(1, 1), None, (2, 1), None, (4, 2), None])
+        self.assertEqual([(result['intra_op_threads'], result['inter_op_threads']) for result in results],
+                         [(1, 1), (2, 1), (4, 2)])
+        self.assertEqual(tuner.best_threads(results), (4, 2))
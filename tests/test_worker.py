@@ -0,0 +1,209 @@
+import os
+import time
+import shutil
+import tempfile
+import logging
+import unittest
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from backend import log_config, progress, ring_buffer, worker
+
+NETWORK_SCRIPT = '''
+def train_neural_network(train_data, test_data, **kwargs):
+    for _ in range({steps}):
+        next(train_data)
+    return 0.5
+'''
+
+
+def start_worker_and_crash(cache_dir, pids):
+    training_worker = worker.TrainingWorker(preload=[], cache_dir=cache_dir)
+    training_worker.start()
+    pids.put(training_worker.pid)
+    pids.close()
+    pids.join_thread()
+    # Exit without stopping the worker, as a crashed application would
+    os._exit(1)
+
+
+def process_running(pid):
+    try:
+        with open('/proc/{0}/stat'.format(pid)) as fd:
+            # Zombies are not reaped by every container's init process
+            return fd.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+class TestTrainingWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        data_path = os.path.join(self.directory, 'data.csv')
+        data = np.hstack((np.arange(100).reshape(-1, 1) % 10, np.arange(300).reshape(100, 3)))
+        pd.DataFrame(data, columns=['label', 'a', 'b', 'c']).to_csv(data_path, index=False)
+        self.properties = {
+            'canvas_name': 'test',
+            'project_directory': self.directory,
+            'data_path': data_path,
+            'training_size': 0.8,
+            'streaming': True,
+            'prefetch_depth': 2,
+            'prefetch_workers': 1,
+            'checkpoint_epochs': 0,
+            'checkpoint_minutes': 0,
+            'script': os.path.join(self.directory, 'test_network.py'),
+        }
+        self.worker = worker.TrainingWorker(preload=[], cache_dir=os.path.join(self.directory, 'cache'))
+
+    def tearDown(self):
+        self.worker.stop()
+        shutil.rmtree(self.directory)
+
+    def write_network(self, steps):
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write(NETWORK_SCRIPT.format(steps=steps))
+
+    def wait_for_messages(self, timeout=10.0):
+        messages = []
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.worker.connection.poll(0.05):
+                messages.append(self.worker.connection.recv())
+            elif not self.worker.busy:
+                break
+        return ''.join(progress.format_message(message) or '' for message in messages)
+
+    def test_runs_jobs_in_one_process(self):
+        # Arrange
+        self.write_network(steps=3)
+
+        # Act
+        self.worker.submit(self.properties)
+        first = self.wait_for_messages()
+        self.worker.submit(self.properties)
+        second = self.wait_for_messages()
+
+        # Assert
+        for messages in (first, second):
+            self.assertIn('First batch after', messages)
+            self.assertIn('Model accuracy: 0.5', messages)
+        self.assertTrue(self.worker.is_alive())
+
+    def test_metrics_buffer_lifetime(self):
+        # Act
+        self.worker.start()
+        name = self.worker.metrics.name
+        self.worker.restart()
+        restarted_name = self.worker.metrics.name
+        self.worker.stop()
+
+        # Assert
+        self.assertEqual(restarted_name, name)
+        self.assertIsNone(self.worker.metrics)
+        self.assertNotIn(name, ring_buffer.find_buffers())
+
+    def test_logs_to_queue_configured_after_creation(self):
+        # Arrange
+        root = logging.getLogger()
+        root_handlers, root_level = list(root.handlers), root.level
+        log_dir = os.path.join(self.directory, 'logs')
+        log_config.configure(level='debug', log_dir=log_dir)
+
+        # Act
+        try:
+            self.worker.start()
+            queue = log_config.log_queue()
+            self.worker.stop()
+        finally:
+            log_config.shutdown()
+            root.handlers[:] = root_handlers
+            root.setLevel(root_level)
+        with open(os.path.join(log_dir, log_config.LOG_FILE)) as fd:
+            log = fd.read()
+
+        # Assert
+        self.assertIs(self.worker.log_queue, queue)
+        self.assertIn('Worker ready', log)
+
+    @unittest.skipUnless(os.path.isdir('/proc'), 'Needs /proc to find processes')
+    def test_exits_when_application_exits(self):
+        # Arrange
+        pids = multiprocessing.Queue()
+        application = multiprocessing.Process(target=start_worker_and_crash,
+                                              args=(os.path.join(self.directory, 'cache'), pids))
+
+        # Act
+        application.start()
+        pid = pids.get(timeout=10)
+        application.join()
+        deadline = time.time() + 10 * worker.PARENT_POLL_INTERVAL
+        while process_running(pid) and time.time() < deadline:
+            time.sleep(0.1)
+
+        # Assert
+        self.assertFalse(process_running(pid))
+
+    def test_unexpected_error_fails_job(self):
+        # Arrange
+        with open(os.path.join(self.directory, 'test_network.py'), 'w') as fd:
+            fd.write('import missing_module\n')
+
+        # Act
+        self.worker.submit(self.properties, job_id=7)
+        failed = self.wait_for_messages()
+        result = None
+        deadline = time.time() + 5.0
+        while result is None and time.time() < deadline:
+            result = self.worker.poll_result()
+        self.write_network(steps=1)
+        self.worker.submit(self.properties)
+        retrained = self.wait_for_messages()
+
+        # Assert
+        self.assertEqual(result, {'id': 7, 'state': worker.FAILED, 'score': None, 'metrics': None})
+        self.assertIn("ModuleNotFoundError: No module named 'missing_module'", failed)
+        self.assertTrue(self.worker.is_alive())
+        self.assertIn('Model accuracy: 0.5', retrained)
+
+    def test_profile_job(self):
+        # Arrange
+        properties = dict(self.properties, profile=True, layers=[
+            {'type': 'input', 'dimensions': 4},
+            {'type': 'output', 'size': 10, 'activation': 'softmax'},
+        ])
+
+        # Act
+        self.worker.submit(properties, job_id=3)
+        messages = self.wait_for_messages()
+        result = None
+        deadline = time.time() + 5.0
+        while result is None and time.time() < deadline:
+            result = self.worker.poll_result()
+
+        # Assert
+        self.assertEqual(result, {'id': 3, 'state': worker.DONE, 'score': None, 'metrics': None})
+        self.assertIn('Profiling data...', messages)
+        self.assertIn('Input layer dimensions (4) do not match the number of features in the data (3)', messages)
+        self.assertNotIn('Model accuracy', messages)
+
+    def test_cancel_keeps_worker(self):
+        # Arrange
+        self.write_network(steps=10 ** 9)
+        self.worker.submit(self.properties)
+        time.sleep(0.5)
+
+        # Act
+        self.worker.cancel()
+        canceled = self.wait_for_messages()
+        self.write_network(steps=1)
+        self.worker.submit(self.properties)
+        retrained = self.wait_for_messages()
+
+        # Assert
+        self.assertIn('Training canceled', canceled)
+        self.assertTrue(self.worker.is_alive())
+        self.assertIn('Model accuracy: 0.5', retrained)